@@ -6,22 +6,98 @@ para o usuário.
 
 Requisitos:
 - Python 3.x
-- Bibliotecas: pandas, openpyxl, tabulate (já instaladas)
+- Bibliotecas: pandas, openpyxl (já instaladas)
 - Tkinter (já vem com o Python)
 """
 
 import pandas as pd
 import os
+import queue
+import threading
 import tkinter as tk
-from tkinter import filedialog, scrolledtext, messagebox
+from tkinter import filedialog, scrolledtext, messagebox, ttk
+
+# Linhas lidas por bloco de CSV/Excel; entre blocos a análise informa o progresso e checa o cancelamento
+TAMANHO_BLOCO_LEITURA = 50000
+# Linhas de texto inseridas no relatório a cada ciclo do loop do Tk
+LINHAS_POR_LOTE_TEXTO = 200
+# Linhas exibidas na tabela de detalhes antes de a janela informar a altura disponível
+LINHAS_VISIVEIS_TABELA = 20
+# Medidas (px) usadas para calcular quantas linhas cabem na tabela
+ALTURA_LINHA_TABELA = 20
+ALTURA_CABECALHO_TABELA = 25
+
+class AnaliseCancelada(Exception):
+    """Levantada quando o usuário cancela a análise em andamento."""
 
 # --- FUNÇÕES DE ANÁLISE (DO SEU SCRIPT EXISTENTE) ---
 
-def analisar_planilha_financeira(caminho_arquivo):
+def _ler_csv_em_blocos(caminho_arquivo, etapa, **kwargs):
+    """
+    Lê o CSV em blocos para poder informar o progresso e interromper a leitura.
+    """
+    blocos = []
+    linhas_lidas = 0
+    for bloco in pd.read_csv(caminho_arquivo, chunksize=TAMANHO_BLOCO_LEITURA, **kwargs):
+        blocos.append(bloco)
+        linhas_lidas += len(bloco)
+        etapa(f"Lendo CSV... {linhas_lidas:,} linhas", 0.05)
+    return pd.concat(blocos, ignore_index=True)
+
+def _ler_xlsx_em_blocos(caminho_arquivo, etapa):
+    """
+    Lê a primeira aba do .xlsx linha a linha (openpyxl em modo read_only), montando o
+    DataFrame em blocos para poder informar o progresso e interromper a leitura.
+    """
+    from openpyxl import load_workbook
+
+    planilha = load_workbook(caminho_arquivo, read_only=True, data_only=True)
+    try:
+        linhas = planilha.worksheets[0].iter_rows(values_only=True)
+        cabecalho = next(linhas, None)
+        if cabecalho is None:
+            return pd.DataFrame()
+        colunas = [str(c) if c is not None else f"Unnamed: {i}" for i, c in enumerate(cabecalho)]
+        blocos, bloco, linhas_lidas = [], [], 0
+
+        def fechar_bloco():
+            nonlocal linhas_lidas
+            blocos.append(pd.DataFrame(bloco, columns=colunas))
+            linhas_lidas += len(bloco)
+            bloco.clear()
+            etapa(f"Lendo planilha... {linhas_lidas:,} linhas", 0.05)
+
+        for linha in linhas:
+            if all(valor is None for valor in linha): # Linhas em branco (como no pd.read_excel)
+                continue
+            # Linhas mais curtas/longas que o cabeçalho são completadas/cortadas
+            bloco.append((tuple(linha) + (None,) * len(colunas))[:len(colunas)])
+            if len(bloco) >= TAMANHO_BLOCO_LEITURA:
+                fechar_bloco()
+        if bloco or not blocos:
+            fechar_bloco()
+        return pd.concat(blocos, ignore_index=True)
+    finally:
+        planilha.close()
+
+def analisar_planilha_financeira(caminho_arquivo, progresso=None, cancelamento=None):
     """
     Lê uma planilha de transações financeiras, categoriza e agrupa os dados.
     (Conteúdo da sua função analisar_planilha_financeira atualizado)
+
+    Args:
+        caminho_arquivo (str): Caminho da planilha.
+        progresso (callable): Opcional. Recebe (mensagem, fração de 0 a 1) a cada etapa.
+        cancelamento (threading.Event): Opcional. Se for sinalizado, a análise é
+                                        interrompida na próxima etapa (ou no próximo
+                                        bloco de linhas, durante a leitura de .csv/.xlsx).
     """
+    def etapa(mensagem, fracao):
+        if cancelamento is not None and cancelamento.is_set():
+            raise AnaliseCancelada()
+        if progresso is not None:
+            progresso(mensagem, fracao)
+
     print(f"\nTentando ler o arquivo: {caminho_arquivo}")
 
     if not os.path.exists(caminho_arquivo):
@@ -29,16 +105,21 @@ def analisar_planilha_financeira(caminho_arquivo):
         return None
 
     try:
+        etapa("Lendo planilha...", 0.05)
         # Tenta ler o arquivo Excel ou CSV
-        if caminho_arquivo.endswith('.xlsx') or caminho_arquivo.endswith('.xls'):
+        if caminho_arquivo.endswith('.xlsx'):
+            df = _ler_xlsx_em_blocos(caminho_arquivo, etapa)
+        elif caminho_arquivo.endswith('.xls'): # Formato antigo: o openpyxl não lê, vai inteiro pelo pandas
             df = pd.read_excel(caminho_arquivo)
         elif caminho_arquivo.endswith('.csv'):
             try:
                 # Tenta ler com ';' como separador e inferir o decimal/milhar (como fizemos para corrigir)
-                df = pd.read_csv(caminho_arquivo, sep=';', encoding='utf-8', decimal=',', thousands='.')
+                df = _ler_csv_em_blocos(caminho_arquivo, etapa, sep=';', encoding='utf-8', decimal=',', thousands='.')
+            except AnaliseCancelada:
+                raise
             except Exception as e:
                 print(f"Aviso: Falha na leitura avançada do CSV: {e}. Tentando leitura básica...")
-                df = pd.read_csv(caminho_arquivo, sep=';', encoding='utf-8')
+                df = _ler_csv_em_blocos(caminho_arquivo, etapa, sep=';', encoding='utf-8')
         else:
             print("Erro: Formato de arquivo não suportado. Por favor, use .xlsx, .xls ou .csv.")
             return None
@@ -48,6 +129,7 @@ def analisar_planilha_financeira(caminho_arquivo):
         # print("\nPrimeiras 5 linhas da planilha:")
         # print(df.head().to_markdown(index=False))
 
+        etapa("Normalizando colunas...", 0.35)
         # Normaliza os nomes das colunas
         df.columns = df.columns.str.lower().str.replace(' ', '_').str.normalize('NFKD').str.encode('ascii', errors='ignore').str.decode('utf-8')
 
@@ -70,6 +152,7 @@ def analisar_planilha_financeira(caminho_arquivo):
 
         df = df.rename(columns={v: k for k, v in colunas_encontradas.items()})
 
+        etapa("Convertendo valores...", 0.45)
         # Processamento da coluna 'valor'
         if 'valor' in df.columns:
             df['valor'] = df['valor'].astype(str)
@@ -83,6 +166,7 @@ def analisar_planilha_financeira(caminho_arquivo):
             print("Erro: Coluna 'valor' não encontrada ou inválida após normalização.")
             return None
 
+        etapa("Convertendo datas...", 0.6)
         # Processamento da coluna 'data'
         if 'data' in df.columns:
             df['data'] = pd.to_datetime(df['data'], format='%d/%m/%Y', errors='coerce')
@@ -91,6 +175,7 @@ def analisar_planilha_financeira(caminho_arquivo):
             print("Erro: Coluna 'data' não encontrada ou inválida após normalização.")
             return None
 
+        etapa("Categorizando transações...", 0.7)
         # Padroniza a coluna 'tipo' ou infere
         if 'tipo' in df.columns:
             df['tipo_original'] = df['tipo'].astype(str).str.lower().str.strip()
@@ -102,12 +187,13 @@ def analisar_planilha_financeira(caminho_arquivo):
             }
             df['tipo_categorizado'] = df['tipo_original'].map(mapeamento_tipo).fillna('Outros')
             
-            # Correção final: Se o valor for negativo, force como Despesa
-            df['tipo'] = df.apply(lambda row: 'Despesa' if row['valor'] < 0 else row['tipo_categorizado'], axis=1)
+            # Correção final: Se o valor for negativo, force como Despesa (operação de coluna, sem laço por linha)
+            df['tipo'] = df['tipo_categorizado'].where(df['valor'] >= 0, 'Despesa')
             
         else:
             print("Aviso: Coluna 'tipo' não encontrada. Inferindo tipo pelo sinal do 'valor'.")
-            df['tipo'] = df['valor'].apply(lambda x: 'Receita' if x >= 0 else 'Despesa')
+            df['tipo'] = 'Receita'
+            df.loc[df['valor'] < 0, 'tipo'] = 'Despesa'
 
         if 'tipo_original' in df.columns:
             df.drop(columns=['tipo_original'], inplace=True)
@@ -117,6 +203,7 @@ def analisar_planilha_financeira(caminho_arquivo):
         transacoes_receitas = df[df['tipo'] == 'Receita'].copy()
         transacoes_despesas = df[df['tipo'] == 'Despesa'].copy()
 
+        etapa("Calculando totais e agrupamentos...", 0.85)
         resultados = {}
 
         total_receber = transacoes_receitas['valor'].sum()
@@ -136,10 +223,9 @@ def analisar_planilha_financeira(caminho_arquivo):
         else:
             resultados['Saldo por Conta Bancária'] = "Coluna 'conta_bancaria' não encontrada para agrupamento."
 
-        resultados['Detalhes das Transações (Receitas - Primeiras 10)'] = \
-            transacoes_receitas.head(10).to_markdown(index=False)
-        resultados['Detalhes das Transações (Despesas - Primeiras 10)'] = \
-            transacoes_despesas.head(10).to_markdown(index=False)
+        # Os detalhes seguem como DataFrames completos; a GUI os exibe em tabelas virtuais
+        resultados['Detalhes das Transações (Receitas)'] = transacoes_receitas.reset_index(drop=True)
+        resultados['Detalhes das Transações (Despesas)'] = transacoes_despesas.reset_index(drop=True)
 
         if 'data' in df.columns:
             df['mes_ano'] = df['data'].dt.to_period('M')
@@ -147,14 +233,117 @@ def analisar_planilha_financeira(caminho_arquivo):
         else:
             resultados['Transações por Mês'] = "Coluna 'data' não encontrada para agrupamento mensal."
 
+        etapa("Análise concluída.", 1.0)
         return resultados
 
+    except AnaliseCancelada:
+        print("Análise cancelada pelo usuário.")
+        raise
     except Exception as e:
         print(f"Ocorreu um erro ao processar a planilha: {e}")
         return None
 
 # --- FUNÇÃO DA INTERFACE GRÁFICA ---
 
+class TabelaVirtual(tk.Frame):
+    """
+    Tabela (ttk.Treeview) virtualizada: a Treeview tem só as linhas que cabem na área
+    visível, e a rolagem preenche essas mesmas linhas com outra fatia do DataFrame.
+    A barra de rolagem é dimensionada pelo DataFrame inteiro (len(df)), então abrir ou
+    rolar um DataFrame de qualquer tamanho custa o mesmo que exibir uma tela.
+    """
+
+    def __init__(self, master, **kwargs):
+        super().__init__(master, **kwargs)
+        self.df = None
+        self.inicio = 0 # Posição no DataFrame da primeira linha exibida
+        self.linhas_visiveis = LINHAS_VISIVEIS_TABELA
+
+        self.tree = ttk.Treeview(self, show='headings', height=LINHAS_VISIVEIS_TABELA)
+        # A barra vertical controla a posição no DataFrame, não a rolagem interna da Treeview
+        barra_vertical = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._rolar)
+        barra_horizontal = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.tree.xview)
+        self.barra_vertical = barra_vertical
+        self.tree.configure(xscrollcommand=barra_horizontal.set)
+
+        self.tree.bind('<Configure>', self._ao_redimensionar)
+        self.tree.bind('<MouseWheel>', lambda e: self._rolar('scroll', -1 if e.delta > 0 else 1, 'units'))
+        self.tree.bind('<Button-4>', lambda e: self._rolar('scroll', -1, 'units')) # Roda do mouse no X11
+        self.tree.bind('<Button-5>', lambda e: self._rolar('scroll', 1, 'units'))
+        self.tree.bind('<Up>', lambda e: self._rolar('scroll', -1, 'units'))
+        self.tree.bind('<Down>', lambda e: self._rolar('scroll', 1, 'units'))
+        self.tree.bind('<Prior>', lambda e: self._rolar('scroll', -1, 'pages'))
+        self.tree.bind('<Next>', lambda e: self._rolar('scroll', 1, 'pages'))
+
+        self.tree.grid(row=0, column=0, sticky='nsew')
+        barra_vertical.grid(row=0, column=1, sticky='ns')
+        barra_horizontal.grid(row=1, column=0, sticky='ew')
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+    def carregar(self, df):
+        """
+        Substitui o conteúdo da tabela. Apenas as linhas visíveis são criadas.
+        """
+        self.limpar()
+        self.df = df
+        colunas = [str(c) for c in df.columns]
+        self.tree['columns'] = colunas
+        for coluna in colunas:
+            self.tree.heading(coluna, text=coluna)
+            self.tree.column(coluna, width=120, stretch=True)
+        self._preencher()
+
+    def limpar(self):
+        self.tree.delete(*self.tree.get_children())
+        self.tree['columns'] = ()
+        self.df = None
+        self.inicio = 0
+        self.barra_vertical.set(0, 1)
+
+    def _rolar(self, acao, valor, unidade=None):
+        """
+        Comando da barra de rolagem ('moveto', fração) ou ('scroll', n, 'units'|'pages').
+        """
+        if self.df is None:
+            return 'break'
+        if acao == 'moveto':
+            inicio = int(float(valor) * len(self.df))
+        else:
+            inicio = self.inicio + int(valor) * (self.linhas_visiveis if unidade == 'pages' else 1)
+        inicio = max(0, min(inicio, len(self.df) - self.linhas_visiveis))
+        if inicio != self.inicio:
+            self.inicio = inicio
+            self._preencher()
+        return 'break' # Impede a rolagem interna da Treeview
+
+    def _preencher(self):
+        # Converte para texto só a fatia exibida e reaproveita as linhas já criadas na Treeview
+        fatia = self.df.iloc[self.inicio:self.inicio + self.linhas_visiveis].astype(str).values.tolist()
+        itens = self.tree.get_children()
+        for i, valores in enumerate(fatia):
+            if i < len(itens):
+                self.tree.item(itens[i], values=valores)
+            else:
+                self.tree.insert('', tk.END, values=valores)
+        if len(itens) > len(fatia):
+            self.tree.delete(*itens[len(fatia):])
+        total = len(self.df)
+        if total:
+            self.barra_vertical.set(self.inicio / total, (self.inicio + len(fatia)) / total)
+        else:
+            self.barra_vertical.set(0, 1)
+
+    def _ao_redimensionar(self, evento):
+        # Quantas linhas cabem na altura atual (descontando o cabeçalho)
+        altura_linha = int(ttk.Style().lookup('Treeview', 'rowheight') or ALTURA_LINHA_TABELA)
+        linhas = max(1, (evento.height - ALTURA_CABECALHO_TABELA) // altura_linha)
+        if linhas != self.linhas_visiveis:
+            self.linhas_visiveis = linhas
+            if self.df is not None:
+                self.inicio = max(0, min(self.inicio, len(self.df) - linhas))
+                self._preencher()
+
 def criar_gui():
     def selecionar_arquivo():
         filepath = filedialog.askopenfilename(
@@ -165,44 +354,132 @@ def criar_gui():
             entrada_caminho_arquivo.delete(0, tk.END)
             entrada_caminho_arquivo.insert(0, filepath)
 
+    # A análise roda numa thread de trabalho; a thread só se comunica com a interface
+    # pela fila abaixo, que é consumida no loop do Tk via root.after
+    fila_mensagens = queue.Queue()
+    estado = {'cancelamento': None, 'geracao_relatorio': 0}
+
+    def trabalhador(caminho_arquivo, cancelamento):
+        def progresso(mensagem, fracao):
+            fila_mensagens.put(("progresso", mensagem, fracao))
+        try:
+            dados = analisar_planilha_financeira(caminho_arquivo, progresso=progresso, cancelamento=cancelamento)
+            fila_mensagens.put(("resultado", dados))
+        except AnaliseCancelada:
+            fila_mensagens.put(("cancelado",))
+        except Exception as e: # Garante que a interface sempre saia do estado "analisando"
+            print(f"Erro inesperado na thread de análise: {e}")
+            fila_mensagens.put(("resultado", None))
+
+    def finalizar_execucao():
+        estado['cancelamento'] = None
+        botao_analisar.config(state=tk.NORMAL)
+        botao_cancelar.config(state=tk.DISABLED)
+
+    def verificar_fila():
+        try:
+            while True:
+                mensagem = fila_mensagens.get_nowait()
+                if mensagem[0] == "progresso":
+                    _, texto, fracao = mensagem
+                    status_var.set(texto)
+                    barra_progresso['value'] = fracao * 100
+                elif mensagem[0] == "cancelado":
+                    finalizar_execucao()
+                    status_var.set("Análise cancelada.")
+                    barra_progresso['value'] = 0
+                    resultados_text.insert(tk.END, "Análise cancelada pelo usuário.\n")
+                    return
+                elif mensagem[0] == "resultado":
+                    finalizar_execucao()
+                    exibir_resultado(mensagem[1])
+                    return
+        except queue.Empty:
+            pass
+        root.after(100, verificar_fila)
+
+    def exibir_resultado(dados_analisados):
+        if dados_analisados:
+            # Tabelas de detalhes: apenas as linhas visíveis são criadas
+            tabela_receitas.carregar(dados_analisados['Detalhes das Transações (Receitas)'])
+            tabela_despesas.carregar(dados_analisados['Detalhes das Transações (Despesas)'])
+            # Relatório em texto: inserido em lotes, seção por seção, sem travar a janela
+            inserir_relatorio_em_lotes(gerar_linhas_relatorio(dados_analisados))
+            status_var.set("Análise concluída.")
+            messagebox.showinfo("Sucesso", "Análise concluída com sucesso!")
+        else:
+            resultados_text.insert(tk.END, "Ocorreu um erro durante a análise. Verifique o console para mais detalhes.")
+            status_var.set("Falha na análise.")
+            barra_progresso['value'] = 0
+            messagebox.showerror("Erro", "Falha na análise da planilha. Verifique o console.")
+
     def analisar():
         caminho_arquivo = entrada_caminho_arquivo.get()
         if not caminho_arquivo:
             messagebox.showwarning("Aviso", "Por favor, selecione um arquivo de planilha.")
             return
+        if estado['cancelamento'] is not None: # Já existe uma análise em andamento
+            return
 
         resultados_text.delete(1.0, tk.END) # Limpa a área de texto anterior
         resultados_text.insert(tk.END, "Analisando planilha...\n")
-
-        dados_analisados = analisar_planilha_financeira(caminho_arquivo)
-
-        if dados_analisados:
-            relatorio_str = formatar_resultados_para_gui(dados_analisados)
-            resultados_text.insert(tk.END, relatorio_str)
-            messagebox.showinfo("Sucesso", "Análise concluída com sucesso!")
-        else:
-            resultados_text.insert(tk.END, "Ocorreu um erro durante a análise. Verifique o console para mais detalhes.")
-            messagebox.showerror("Erro", "Falha na análise da planilha. Verifique o console.")
-
-    def formatar_resultados_para_gui(resultados):
-        output = []
-        output.append("="*50)
-        output.append("           RELATÓRIO FINANCEIRO           ")
-        output.append("="*50)
+        tabela_receitas.limpar()
+        tabela_despesas.limpar()
+        estado['geracao_relatorio'] += 1 # Interrompe a inserção de um relatório anterior
+        status_var.set("Iniciando análise...")
+        barra_progresso['value'] = 0
+        botao_analisar.config(state=tk.DISABLED)
+        botao_cancelar.config(state=tk.NORMAL)
+
+        cancelamento = threading.Event()
+        estado['cancelamento'] = cancelamento
+        threading.Thread(target=trabalhador, args=(caminho_arquivo, cancelamento), daemon=True).start()
+        root.after(100, verificar_fila)
+
+    def cancelar():
+        if estado['cancelamento'] is not None:
+            estado['cancelamento'].set()
+            status_var.set("Cancelando...")
+            botao_cancelar.config(state=tk.DISABLED)
+
+    def gerar_linhas_relatorio(resultados):
+        """
+        Gera as linhas do relatório seção por seção. Tabelas de detalhes não entram
+        no texto; elas ficam nas abas com tabelas virtuais.
+        """
+        yield "="*50
+        yield "           RELATÓRIO FINANCEIRO           "
+        yield "="*50
 
         for titulo, conteudo in resultados.items():
-            output.append(f"\n--- {titulo} ---")
+            yield f"\n--- {titulo} ---"
             if isinstance(conteudo, dict):
                 for chave, valor in conteudo.items():
-                    output.append(f"- {chave}: {valor}")
-            elif isinstance(conteudo, str) and conteudo.startswith('|'): # Provavelmente um markdown table
-                output.append(conteudo)
+                    yield f"- {chave}: {valor}"
+            elif isinstance(conteudo, pd.DataFrame):
+                yield f"{len(conteudo):,} transações (veja a aba correspondente)."
             else:
-                output.append(str(conteudo)) # Converte para string para garantir
-        output.append("\n" + "="*50)
-        output.append("           Análise Concluída!           ")
-        output.append("="*50)
-        return "\n".join(output)
+                yield str(conteudo) # Converte para string para garantir
+        yield "\n" + "="*50
+        yield "           Análise Concluída!           "
+        yield "="*50
+
+    def inserir_relatorio_em_lotes(linhas):
+        geracao = estado['geracao_relatorio']
+
+        def inserir_lote():
+            if geracao != estado['geracao_relatorio']: # Uma nova análise começou
+                return
+            lote = []
+            for linha in linhas:
+                lote.append(linha)
+                if len(lote) >= LINHAS_POR_LOTE_TEXTO:
+                    break
+            if lote:
+                resultados_text.insert(tk.END, "\n".join(lote) + "\n")
+                root.after(1, inserir_lote)
+
+        inserir_lote()
 
     # Configuração da janela principal
     root = tk.Tk()
@@ -222,13 +499,36 @@ def criar_gui():
     botao_selecionar = tk.Button(frame_selecao, text="Selecionar Arquivo", command=selecionar_arquivo)
     botao_selecionar.pack(side=tk.LEFT)
 
-    # Botão de Análise
-    botao_analisar = tk.Button(root, text="Analisar Planilha", command=analisar, font=("Arial", 12, "bold"))
-    botao_analisar.pack(pady=10)
+    # Botões de Análise e Cancelamento
+    frame_botoes = tk.Frame(root)
+    frame_botoes.pack(pady=10)
+
+    botao_analisar = tk.Button(frame_botoes, text="Analisar Planilha", command=analisar, font=("Arial", 12, "bold"))
+    botao_analisar.pack(side=tk.LEFT, padx=5)
+
+    botao_cancelar = tk.Button(frame_botoes, text="Cancelar", command=cancelar, state=tk.DISABLED)
+    botao_cancelar.pack(side=tk.LEFT, padx=5)
+
+    # Progresso da análise em andamento
+    status_var = tk.StringVar(value="Selecione uma planilha para começar.")
+    label_status = tk.Label(root, textvariable=status_var)
+    label_status.pack()
+
+    barra_progresso = ttk.Progressbar(root, orient=tk.HORIZONTAL, length=400, mode='determinate', maximum=100)
+    barra_progresso.pack(pady=5)
+
+    # Área para exibir resultados: relatório em texto e tabelas de detalhes em abas
+    abas_resultados = ttk.Notebook(root)
+    abas_resultados.pack(pady=10, fill=tk.BOTH, expand=True)
+
+    resultados_text = scrolledtext.ScrolledText(abas_resultados, wrap=tk.WORD, width=90, height=25, font=("Courier New", 10))
+    abas_resultados.add(resultados_text, text="Relatório")
+
+    tabela_receitas = TabelaVirtual(abas_resultados)
+    abas_resultados.add(tabela_receitas, text="Receitas Detalhadas")
 
-    # Área para exibir resultados
-    resultados_text = scrolledtext.ScrolledText(root, wrap=tk.WORD, width=90, height=25, font=("Courier New", 10))
-    resultados_text.pack(pady=10)
+    tabela_despesas = TabelaVirtual(abas_resultados)
+    abas_resultados.add(tabela_despesas, text="Despesas Detalhadas")
 
     # Inicia o loop principal da interface
     root.mainloop()
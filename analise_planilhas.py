@@ -0,0 +1,451 @@
+# -*- coding: utf-8 -*-
+"""
+Funções de análise das planilhas financeiras (transações e orçamento mensal).
+
+Separadas da página Streamlit (pages/analisador_financeiro.py) para poderem ser
+usadas também fora do Streamlit, como no serviço HTTP de análise.
+"""
+
+import os
+import tempfile
+import pandas as pd
+import calendar # Para mapear nomes de meses para números
+
+from deduplicacao import remover_duplicadas
+from cambio import MOEDA_RELATORIO, CambioIndisponivel, converter_para_moeda_relatorio
+
+# Linhas por bloco na leitura de CSV; a cada bloco o progresso da leitura é informado
+TAMANHO_BLOCO_LEITURA = 50000
+
+def _contar_linhas(caminho_arquivo):
+    # Contagem rápida (em bytes, sem parsing) para estimar o progresso da leitura
+    linhas = 0
+    with open(caminho_arquivo, 'rb') as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b''):
+            linhas += bloco.count(b'\n')
+    return max(linhas, 1)
+
+def _ler_csv(caminho_arquivo, progresso, **kwargs):
+    if progresso is None:
+        return pd.read_csv(caminho_arquivo, **kwargs)
+    total_linhas = _contar_linhas(caminho_arquivo)
+    blocos = []
+    linhas_lidas = 0
+    for bloco in pd.read_csv(caminho_arquivo, chunksize=TAMANHO_BLOCO_LEITURA, **kwargs):
+        blocos.append(bloco)
+        linhas_lidas += len(bloco)
+        progresso(min(linhas_lidas / total_linhas, 1.0), f"Lendo CSV... {linhas_lidas:,} linhas",
+                  {'Transações lidas': linhas_lidas})
+    return pd.concat(blocos, ignore_index=True)
+
+# --- FUNÇÃO 1: Análise de Planilha de Transações (seu código atual, refatorado) ---
+# Leitura/normalização separada do resumo para permitir combinar vários arquivos
+# progresso (opcional): função chamada com (fração de 0 a 1, etapa, resultados parciais)
+def ler_planilha_transacoes(caminho_arquivo, progresso=None):
+    print(f"\nTentando ler arquivo de TRANSAÇÕES: {caminho_arquivo}")
+    try:
+        if caminho_arquivo.endswith('.xlsx') or caminho_arquivo.endswith('.xls'):
+            df = pd.read_excel(caminho_arquivo)
+        elif caminho_arquivo.endswith('.csv'):
+            try:
+                # Tentativa de leitura com separador e decimal específicos
+                df = _ler_csv(caminho_arquivo, progresso, sep=';', encoding='utf-8', decimal=',', thousands='.')
+            except Exception as e:
+                print(f"Aviso: Falha na leitura avançada do CSV: {e}. Tentando leitura básica...")
+                # Tentativa de leitura básica para CSV
+                df = _ler_csv(caminho_arquivo, progresso, sep=';', encoding='utf-8')
+        else:
+            return {"error": "Formato de arquivo não suportado. Por favor, use .xlsx, .xls ou .csv."}
+
+        print("Arquivo de transações lido com sucesso!")
+
+        # Normaliza os nomes das colunas
+        df.columns = df.columns.str.lower().str.replace(' ', '_').str.normalize('NFKD').str.encode('ascii', errors='ignore').str.decode('utf-8')
+
+        # --- AJUSTE: Adicionado 'descricao' como coluna esperada separada ---
+        colunas_esperadas = {
+            'valor': ['valor', 'quantia', 'montante'],
+            'data': ['data', 'data_transacao', 'data_pagamento', 'data_recebimento'],
+            'tipo': ['tipo', 'categoria', 'natureza'],
+            'conta_bancaria': ['conta', 'conta_bancaria', 'banco'],
+            'descricao': ['descricao', 'item', 'detalhe', 'observacao', 'finalidade'], # Mais nomes para descrição
+            'moeda': ['moeda', 'divisa', 'currency'] # Opcional; sem ela, tudo é considerado em BRL
+        }
+
+        colunas_encontradas = {}
+        for esperado, possiveis in colunas_esperadas.items():
+            for possivel in possiveis:
+                if possivel in df.columns:
+                    colunas_encontradas[esperado] = possivel
+                    break
+            if esperado not in colunas_encontradas:
+                print(f"Aviso: Não foi possível encontrar a coluna '{esperado}' (tentou: {', '.join(possiveis)}).")
+                if esperado in ['valor', 'data']: # Colunas essenciais
+                    return {"error": f"Coluna essencial '{esperado}' não encontrada. Verifique os nomes das colunas na sua planilha."}
+
+        df = df.rename(columns={v: k for k, v in colunas_encontradas.items()})
+
+        # Processamento da coluna 'valor'
+        if 'valor' in df.columns:
+            df['valor'] = df['valor'].astype(str)
+            df['valor'] = df['valor'].str.replace('R$', '', regex=False) \
+                                     .str.replace('.', '', regex=False) \
+                                     .str.replace(',', '.', regex=False) \
+                                     .str.strip()
+            df['valor'] = pd.to_numeric(df['valor'], errors='coerce')
+            df.dropna(subset=['valor'], inplace=True)
+        else:
+            return {"error": "Coluna 'valor' não encontrada ou inválida após normalização."}
+
+        # Processamento da coluna 'data'
+        if 'data' in df.columns:
+            df['data'] = pd.to_datetime(df['data'], format='%d/%m/%Y', errors='coerce')
+            df.dropna(subset=['data'], inplace=True)
+            df['data_br'] = df['data'].dt.strftime('%d/%m/%Y')
+        else:
+            return {"error": "Coluna 'data' não encontrada ou inválida após normalização."}
+
+        # Processamento da coluna 'moeda' (código ISO, ex.: BRL, USD, EUR)
+        if 'moeda' in df.columns:
+            df['moeda'] = df['moeda'].fillna(MOEDA_RELATORIO).astype(str).str.upper().str.strip() \
+                                     .replace({'': MOEDA_RELATORIO, 'R$': 'BRL', 'US$': 'USD', '€': 'EUR'})
+        else:
+            df['moeda'] = MOEDA_RELATORIO
+
+        # Processamento da coluna 'descricao' (garante que seja string e trata nulos)
+        if 'descricao' in df.columns:
+            df['descricao'] = df['descricao'].astype(str).fillna('').str.strip()
+        else:
+            # Se 'descricao' não for encontrada, cria uma coluna vazia para evitar erros posteriores
+            df['descricao'] = '' 
+
+        # Padroniza a coluna 'tipo' ou infere
+        if 'tipo' in df.columns:
+            # Guarda o texto original como categoria (usado no comparativo com o orçamento)
+            if 'categoria' not in df.columns:
+                df['categoria'] = df['tipo'].astype(str).str.strip()
+            df['tipo_original'] = df['tipo'].astype(str).str.lower().str.strip()
+            df['tipo_original'] = df['tipo_original'].str.replace(r'[^a-z\s]', '', regex=True).str.strip()
+
+            mapeamento_tipo = {
+                'receita': 'Receita', 'entrada': 'Receita', 'ganho': 'Receita',
+                'pagamento': 'Despesa', 'despesa': 'Despesa', 'saida': 'Despesa', 'gasto': 'Despesa'
+            }
+            df['tipo_categorizado'] = df['tipo_original'].map(mapeamento_tipo).fillna('Outros')
+            df['tipo'] = df.apply(lambda row: 'Despesa' if row['valor'] < 0 else row['tipo_categorizado'], axis=1)
+        else:
+            print("Aviso: Coluna 'tipo' não encontrada. Inferindo tipo pelo sinal do 'valor'.")
+            df['tipo'] = df['valor'].apply(lambda x: 'Receita' if x >= 0 else 'Despesa')
+
+        if 'tipo_original' in df.columns:
+            df.drop(columns=['tipo_original'], inplace=True)
+        if 'tipo_categorizado' in df.columns:
+            df.drop(columns=['tipo_categorizado'], inplace=True)
+
+        return df
+
+    except Exception as e:
+        erro_msg = f"Ocorreu um erro ao processar a planilha de transações: {e}"
+        print(erro_msg)
+        return {"error": erro_msg}
+
+def detalhar_transacoes(df):
+    """
+    Separa as receitas e as despesas com as colunas das tabelas de detalhes (data em dd/mm/aaaa).
+
+    Returns:
+        tuple: (DataFrame de receitas, DataFrame de despesas)
+    """
+    if 'data_br' not in df.columns: # Ex.: transações normalizadas carregadas de uma análise salva
+        # Formata cada data distinta uma única vez (strftime linha a linha é lento em tabelas grandes)
+        codigos, datas = pd.factorize(df['data'])
+        df = df.assign(data_br=pd.DatetimeIndex(datas).strftime('%d/%m/%Y').to_numpy()[codigos])
+    transacoes_receitas = df[df['tipo'] == 'Receita'].copy()
+    transacoes_despesas = df[df['tipo'] == 'Despesa'].copy()
+
+    # Selecionar e reordenar colunas para exibição, usando 'data_br'
+    colunas_exibicao = ['data_br', 'valor', 'tipo']
+    if 'conta_bancaria' in df.columns:
+        colunas_exibicao.append('conta_bancaria')
+    if 'descricao' in df.columns:
+        colunas_exibicao.append('descricao')
+    
+    # Garante que as colunas existam no dataframe antes de selecionar
+    colunas_exibicao_receitas = [col for col in colunas_exibicao if col in transacoes_receitas.columns]
+    colunas_exibicao_despesas = [col for col in colunas_exibicao if col in transacoes_despesas.columns]
+
+    transacoes_receitas = transacoes_receitas[colunas_exibicao_receitas].rename(columns={'data_br': 'data'})
+    transacoes_despesas = transacoes_despesas[colunas_exibicao_despesas].rename(columns={'data_br': 'data'})
+    return transacoes_receitas, transacoes_despesas
+
+def resumir_transacoes(df, num_transacoes_exibir=10):
+    try:
+        # Transações normalizadas completas, usadas na exportação
+        transacoes_normalizadas = df.drop(columns=['data_br'], errors='ignore')
+
+        transacoes_receitas, transacoes_despesas = detalhar_transacoes(df)
+
+        resultados = {}
+        total_receber = transacoes_receitas['valor'].sum()
+        total_pagar = transacoes_despesas['valor'].sum()
+        saldo_total = total_receber + total_pagar
+
+        resultados['Resumo Geral'] = {
+            'Total a Receber': f"R$ {total_receber:,.2f}",
+            'Total a Pagar': f"R$ {abs(total_pagar):,.2f}",
+            'Saldo Total': f"R$ {saldo_total:,.2f}"
+        }
+        resultados['Transações por Tipo'] = df.groupby('tipo')['valor'].sum().apply(lambda x: f"R$ {x:,.2f}").to_dict()
+        resultados['Transações Normalizadas'] = transacoes_normalizadas
+        
+        if 'conta_bancaria' in df.columns:
+            resultados['Saldo por Conta Bancária'] = df.groupby('conta_bancaria')['valor'].sum().apply(lambda x: f"R$ {x:,.2f}").to_dict()
+        else:
+            resultados['Saldo por Conta Bancária'] = "Coluna 'conta_bancaria' não encontrada para agrupamento."
+
+        # --- AJUSTE: Retorna DataFrame completo ou head(num_transacoes_exibir) ---
+        if num_transacoes_exibir == 0: # Se 0, exibe todas
+            resultados['Detalhes das Transações (Receitas)'] = transacoes_receitas
+            resultados['Detalhes das Transações (Despesas)'] = transacoes_despesas
+        else:
+            resultados['Detalhes das Transações (Receitas)'] = transacoes_receitas.head(num_transacoes_exibir)
+            resultados['Detalhes das Transações (Despesas)'] = transacoes_despesas.head(num_transacoes_exibir)
+
+        # --- NOVO: Agrupamento de Despesas por Descrição ---
+        if 'descricao' in df.columns and not transacoes_despesas.empty:
+            despesas_por_descricao = transacoes_despesas.groupby('descricao')['valor'].sum().abs().sort_values(ascending=False).reset_index()
+            despesas_por_descricao['valor'] = despesas_por_descricao['valor'].apply(lambda x: f"R$ {x:,.2f}")
+            resultados['Despesas Agrupadas por Descrição'] = despesas_por_descricao
+        else:
+            resultados['Despesas Agrupadas por Descrição'] = "Coluna 'descricao' não encontrada ou nenhuma despesa para agrupar."
+
+
+        if 'data' in df.columns:
+            df['mes_ano'] = df['data'].dt.to_period('M')
+            resultados['Transações por Mês'] = df.groupby('mes_ano')['valor'].sum().apply(lambda x: f"R$ {x:,.2f}").to_dict()
+        else:
+            resultados['Transações por Mês'] = "Coluna 'data' não encontrada para agrupamento mensal."
+
+        return resultados
+
+    except Exception as e:
+        erro_msg = f"Ocorreu um erro ao processar a planilha de transações: {e}"
+        print(erro_msg)
+        return {"error": erro_msg}
+
+# Adicionado num_transacoes_exibir como parâmetro
+def analisar_planilha_transacoes(caminho_arquivo, num_transacoes_exibir=10):
+    df = ler_planilha_transacoes(caminho_arquivo)
+    if isinstance(df, dict): # Erro de leitura
+        return df
+    return resumir_transacoes(df, num_transacoes_exibir)
+
+# --- NOVO: Combina vários extratos removendo transações duplicadas ---
+def analisar_extratos_transacoes(arquivos, num_transacoes_exibir=10, historico=None, tabela_cambio=None, progresso=None):
+    """
+    Lê um ou mais extratos, remove as transações repetidas entre eles (e, se houver
+    histórico, as já importadas antes) e gera o resumo sobre o conjunto consolidado.
+
+    Args:
+        arquivos (list): Lista de tuplas (caminho_arquivo, hash_do_conteudo).
+        num_transacoes_exibir (int): Número de transações detalhadas (0 = todas).
+        historico (HistoricoImpressoes): Histórico persistente de impressões (opcional).
+        tabela_cambio (TabelaCambio): Taxas locais para converter transações em outras moedas.
+        progresso (callable): Opcional. Recebe (fração de 0 a 1, etapa, resultados parciais)
+                              ao longo da análise; os parciais trazem os totais até o momento.
+    """
+    def informar(fracao, etapa, parciais=None):
+        if progresso is not None:
+            progresso(fracao, etapa, parciais)
+
+    # A leitura ocupa até 80% do progresso, dividida igualmente entre os arquivos
+    fatia_leitura = 0.8 / len(arquivos)
+    total_receber = 0.0
+    total_pagar = 0.0
+    linhas_lidas = 0
+    frames = []
+    for i, (caminho_arquivo, origem) in enumerate(arquivos):
+        def progresso_arquivo(fracao, etapa, parciais=None, i=i):
+            parciais = dict(parciais or {})
+            parciais['Transações lidas'] = linhas_lidas + parciais.get('Transações lidas', 0)
+            informar(fatia_leitura * (i + fracao), f"Arquivo {i + 1}/{len(arquivos)}: {etapa}", parciais)
+
+        df = ler_planilha_transacoes(caminho_arquivo, progresso=progresso_arquivo if progresso else None)
+        if isinstance(df, dict): # Erro de leitura
+            return df
+        df['origem'] = origem
+        frames.append(df)
+
+        linhas_lidas += len(df)
+        total_receber += df.loc[df['tipo'] == 'Receita', 'valor'].sum()
+        total_pagar += df.loc[df['tipo'] == 'Despesa', 'valor'].sum()
+        informar(fatia_leitura * (i + 1), f"Arquivo {i + 1}/{len(arquivos)} normalizado", {
+            'Transações lidas': linhas_lidas,
+            'Total a Receber (parcial)': f"R$ {total_receber:,.2f}",
+            'Total a Pagar (parcial)': f"R$ {abs(total_pagar):,.2f}",
+        })
+
+    df = pd.concat(frames, ignore_index=True)
+    informar(0.85, "Removendo transações duplicadas...")
+    df, removidas = remover_duplicadas(df, historico=historico, coluna_origem='origem')
+    print(f"Transações duplicadas removidas: {removidas}")
+    informar(0.9, "Convertendo moedas e calculando resumos...")
+
+    # Conversão para a moeda do relatório (depois da deduplicação, que usa o valor original)
+    if not df['moeda'].eq(MOEDA_RELATORIO).all():
+        if tabela_cambio is None:
+            return {"error": "A planilha contém transações em outras moedas, mas nenhuma tabela de câmbio foi informada."}
+        try:
+            df = converter_para_moeda_relatorio(df, tabela_cambio, MOEDA_RELATORIO)
+        except CambioIndisponivel as e:
+            return {"error": f"{e} Atualize as taxas de câmbio na seção 'Taxas de Câmbio'."}
+        print(f"Transações convertidas para {MOEDA_RELATORIO}: {int((df['moeda'] != MOEDA_RELATORIO).sum())}")
+
+    resultados = resumir_transacoes(df.drop(columns=['origem']), num_transacoes_exibir)
+    if "error" not in resultados:
+        resultados['Duplicatas Removidas'] = removidas
+    informar(1.0, "Análise concluída.")
+    return resultados
+
+# --- NOVO: Mesma análise a partir do conteúdo dos arquivos (usada pelos trabalhos em segundo plano) ---
+def analisar_conteudos_transacoes(conteudos, num_transacoes_exibir=0, historico=None, tabela_cambio=None, progresso=None):
+    """
+    Grava os arquivos enviados em arquivos temporários, analisa e os remove ao final.
+    Útil quando a análise roda fora do ciclo de vida do upload (ex.: numa thread de fundo).
+
+    Args:
+        conteudos (list): Lista de tuplas (nome_arquivo, bytes do arquivo, hash_do_conteudo).
+    """
+    arquivos = []
+    try:
+        for nome_arquivo, conteudo, origem in conteudos:
+            with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(nome_arquivo)[1]) as tmp_file:
+                tmp_file.write(conteudo)
+            arquivos.append((tmp_file.name, origem))
+        return analisar_extratos_transacoes(arquivos, num_transacoes_exibir=num_transacoes_exibir, historico=historico,
+                                            tabela_cambio=tabela_cambio, progresso=progresso)
+    finally:
+        for caminho_arquivo, _ in arquivos:
+            os.unlink(caminho_arquivo)
+
+# Nomes dos meses em português (a planilha de orçamento usa esses nomes nas colunas)
+MESES_PORTUGUES = {
+    'janeiro': 1, 'fevereiro': 2, 'marco': 3, 'março': 3, 'abril': 4, 'maio': 5, 'junho': 6,
+    'julho': 7, 'agosto': 8, 'setembro': 9, 'outubro': 10, 'novembro': 11, 'dezembro': 12
+}
+
+# --- FUNÇÃO 2: Análise de Planilha de Orçamento ---
+# Leitura separada do resumo para permitir o comparativo com as transações
+def ler_planilha_orcamento(caminho_arquivo, ano):
+    print(f"\nTentando ler arquivo de ORÇAMENTO ({ano}): {caminho_arquivo}")
+
+    if not (caminho_arquivo.endswith('.xlsx') or caminho_arquivo.endswith('.xls')):
+        return {"error": "A Planilha de Orçamento (Mensal) deve ser um arquivo Excel (.xlsx ou .xls). Arquivos CSV não são suportados para este tipo de planilha devido à sua estrutura complexa."}
+
+    try:
+        nome_para_numero_mes = {name.lower(): num for num, name in enumerate(calendar.month_name) if num}
+        nome_para_numero_mes.update(MESES_PORTUGUES)
+        
+        df_despesas_raw = pd.read_excel(caminho_arquivo, header=1, skiprows=[0], usecols="A:M")
+        df_despesas_raw = df_despesas_raw.rename(columns={df_despesas_raw.columns[0]: 'categoria'})
+        df_despesas_raw = df_despesas_raw.dropna(subset=['categoria'])
+        df_despesas_raw = df_despesas_raw[~df_despesas_raw['categoria'].str.contains('Total', na=False, case=False)]
+
+        meses_colunas_despesas = df_despesas_raw.columns[1:13].tolist()
+
+        for col in meses_colunas_despesas:
+            temp_series = df_despesas_raw[col].astype(str)
+            temp_series = temp_series.str.replace('R$', '', regex=False) \
+                                     .str.replace('.', '', regex=False) \
+                                     .str.replace(',', '.', regex=False) \
+                                     .str.strip()
+            df_despesas_raw[col] = pd.to_numeric(temp_series, errors='coerce').fillna(0)
+
+        df_despesas_melted = df_despesas_raw.melt(
+            id_vars=['categoria'],
+            value_vars=meses_colunas_despesas,
+            var_name='mes',
+            value_name='valor'
+        )
+        df_despesas_melted['tipo'] = 'Despesa'
+        df_despesas_melted['valor'] = df_despesas_melted['valor'] * -1 
+
+        df_receitas_raw = pd.read_excel(caminho_arquivo, header=17, skiprows=range(17), usecols="A:M")
+        df_receitas_raw = df_receitas_raw.rename(columns={df_receitas_raw.columns[0]: 'categoria'})
+        df_receitas_raw = df_receitas_raw.dropna(subset=['categoria'])
+        df_receitas_raw = df_receitas_raw[~df_receitas_raw['categoria'].str.contains('Total', na=False, case=False)]
+        
+        meses_colunas_receitas = df_receitas_raw.columns[1:13].tolist()
+
+        for col in meses_colunas_receitas:
+            temp_series = df_receitas_raw[col].astype(str)
+            temp_series = temp_series.str.replace('R$', '', regex=False) \
+                                     .str.replace('.', '', regex=False) \
+                                     .str.replace(',', '.', regex=False) \
+                                     .str.strip()
+            df_receitas_raw[col] = pd.to_numeric(temp_series, errors='coerce').fillna(0)
+
+        df_receitas_melted = df_receitas_raw.melt(
+            id_vars=['categoria'],
+            value_vars=meses_colunas_receitas,
+            var_name='mes',
+            value_name='valor'
+        )
+        df_receitas_melted['tipo'] = 'Receita'
+
+        df_final = pd.concat([df_despesas_melted, df_receitas_melted], ignore_index=True)
+        df_final.dropna(subset=['valor'], inplace=True) 
+
+        df_final['num_mes'] = df_final['mes'].str.lower().map(nome_para_numero_mes)
+        df_final = df_final.dropna(subset=['num_mes'])
+        df_final['data'] = pd.to_datetime(df_final['num_mes'].astype(int).astype(str) + f'/1/{int(ano)}', format='%m/%d/%Y')
+        df_final['data_br'] = df_final['data'].dt.strftime('%d/%m/%Y')
+        df_final['mes_ano'] = df_final['data'].dt.to_period('M')
+
+        return df_final
+
+    except Exception as e:
+        erro_msg = f"Ocorreu um erro ao processar a planilha de orçamento: {e}"
+        print(erro_msg)
+        return {"error": erro_msg}
+
+def analisar_planilha_orcamento(caminho_arquivo, ano=2025):
+    df_final = ler_planilha_orcamento(caminho_arquivo, ano)
+    if isinstance(df_final, dict): # Erro de leitura
+        return df_final
+
+    try:
+        transacoes_receitas = df_final[df_final['tipo'] == 'Receita'].copy()
+        transacoes_despesas = df_final[df_final['tipo'] == 'Despesa'].copy()
+
+        colunas_exibicao_orcamento = ['data_br', 'categoria', 'valor', 'tipo']
+        
+        transacoes_receitas_display = transacoes_receitas[colunas_exibicao_orcamento].rename(columns={'data_br': 'data'})
+        transacoes_despesas_display = transacoes_despesas[colunas_exibicao_orcamento].rename(columns={'data_br': 'data'})
+
+        resultados = {}
+        total_receber = transacoes_receitas['valor'].sum()
+        total_pagar = transacoes_despesas['valor'].sum()
+        saldo_total = total_receber + total_pagar
+
+        resultados['Resumo Geral'] = {
+            'Total a Receber': f"R$ {total_receber:,.2f}",
+            'Total a Pagar': f"R$ {abs(total_pagar):,.2f}",
+            'Saldo Total': f"R$ {saldo_total:,.2f}"
+        }
+        
+        resultados['Transações por Tipo'] = df_final.groupby('tipo')['valor'].sum().apply(lambda x: f"R$ {x:,.2f}").to_dict()
+
+        resultados['Saldo por Conta Bancária'] = "Não aplicável para Planilha de Orçamento (sem coluna 'conta_bancaria')."
+
+        resultados['Detalhes das Transações (Receitas)'] = transacoes_receitas_display.head(10) # Manter 10 para o orçamento por ser uma "simulação"
+        resultados['Detalhes das Transações (Despesas)'] = transacoes_despesas_display.head(10)
+        
+        resultados['Transações por Mês'] = df_final.groupby('mes_ano')['valor'].sum().apply(lambda x: f"R$ {x:,.2f}").to_dict()
+        
+        return resultados
+
+    except Exception as e:
+        erro_msg = f"Ocorreu um erro ao processar a planilha de orçamento: {e}"
+        print(erro_msg)
+        return {"error": erro_msg}
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Análises de transações salvas por usuário.
+
+Ao terminar uma análise, o resultado do usuário logado é gravado em disco,
+identificado pela mesma chave do trabalho (hash do conteúdo dos arquivos e das
+opções). Na volta, o painel abre direto da cópia salva, sem reler nem
+normalizar as planilhas; só um arquivo novo dispara a leitura.
+
+Cada análise fica numa pasta própria:
+- transacoes.parquet: transações normalizadas (colunar, compressão zstd);
+- despesas_descricao.parquet: despesas agrupadas por descrição, quando houver;
+- resumo.json.gz: demais agrupamentos (por tipo, conta e mês), totais e
+  informações da análise (arquivos, data, número de transações).
+
+As tabelas de detalhes (receitas/despesas) são refeitas das transações
+normalizadas ao carregar, para não gravar os mesmos dados duas vezes.
+"""
+
+import os
+import json
+import gzip
+import time
+import shutil
+import hashlib
+import threading
+
+import pandas as pd
+
+from analise_planilhas import detalhar_transacoes
+from configuracao import DIRETORIO_DADOS
+
+DIRETORIO_ANALISES = os.path.join(DIRETORIO_DADOS, "analises")
+# Acima deste número, as análises mais antigas do usuário são removidas
+MAXIMO_ANALISES_POR_USUARIO = 10
+
+# Entradas do resultado guardadas no resumo JSON (valores já formatados ou mensagens)
+CHAVES_RESUMO = (
+    'Resumo Geral', 'Transações por Tipo', 'Saldo por Conta Bancária',
+    'Transações por Mês', 'Despesas Agrupadas por Descrição', 'Duplicatas Removidas',
+)
+
+
+def _para_parquet(df, caminho):
+    # Colunas de texto com tipos misturados (ex.: números e textos vindos da planilha) viram texto
+    misturadas = [c for c in df.columns
+                  if df[c].dtype == object and pd.api.types.infer_dtype(df[c], skipna=True).startswith('mixed')]
+    if misturadas:
+        df = df.astype({c: str for c in misturadas})
+    df.to_parquet(caminho, compression='zstd')
+
+
+class AnalisesSalvas:
+    """
+    Análises salvas em `diretorio`, uma subpasta por usuário.
+    """
+
+    def __init__(self, diretorio=DIRETORIO_ANALISES, maximo_por_usuario=MAXIMO_ANALISES_POR_USUARIO):
+        self.diretorio = diretorio
+        self.maximo_por_usuario = maximo_por_usuario
+        self._lock = threading.Lock()
+
+    def _pasta_usuario(self, usuario):
+        # O nome do usuário vira hash para não aparecer no caminho (como em deduplicacao.caminho_historico)
+        return os.path.join(self.diretorio, hashlib.sha256(usuario.encode('utf-8')).hexdigest()[:16])
+
+    def _pasta(self, usuario, chave):
+        return os.path.join(self._pasta_usuario(usuario), chave)
+
+    def existe(self, usuario, chave):
+        return os.path.exists(os.path.join(self._pasta(usuario, chave), "resumo.json.gz"))
+
+    def salvar(self, usuario, chave, resultados, arquivos=()):
+        """
+        Grava a análise (sem erro) do usuário. Se a chave já estiver salva, não faz nada.
+
+        Args:
+            resultados (dict): Saída de analisar_conteudos_transacoes (com todas as transações).
+            arquivos (iterable): Nomes dos arquivos analisados, exibidos na lista de análises salvas.
+        """
+        if self.existe(usuario, chave):
+            return
+        destino = self._pasta(usuario, chave)
+        temporario = f"{destino}.tmp{threading.get_ident()}"
+        os.makedirs(temporario, exist_ok=True)
+        try:
+            transacoes = resultados['Transações Normalizadas']
+            _para_parquet(transacoes, os.path.join(temporario, "transacoes.parquet"))
+            resumo = {}
+            for nome in CHAVES_RESUMO:
+                valor = resultados.get(nome)
+                if isinstance(valor, pd.DataFrame):
+                    _para_parquet(valor, os.path.join(temporario, "despesas_descricao.parquet"))
+                elif isinstance(valor, dict):
+                    resumo[nome] = {str(k): v for k, v in valor.items()} # Períodos (mês) viram "AAAA-MM"
+                elif valor is not None:
+                    resumo[nome] = valor
+            informacoes = {'arquivos': list(arquivos), 'salvo_em': time.time(), 'transacoes': len(transacoes)}
+            with gzip.open(os.path.join(temporario, "resumo.json.gz"), 'wt', encoding='utf-8') as f:
+                json.dump({'resumo': resumo, 'informacoes': informacoes}, f, ensure_ascii=False, default=str)
+            with self._lock:
+                if os.path.exists(destino):
+                    return
+                os.replace(temporario, destino)
+                self._descartar_antigas(usuario)
+        finally:
+            shutil.rmtree(temporario, ignore_errors=True)
+
+    def _ler_informacoes(self, pasta):
+        with gzip.open(os.path.join(pasta, "resumo.json.gz"), 'rt', encoding='utf-8') as f:
+            return json.load(f)
+
+    def listar(self, usuario):
+        """
+        Returns:
+            list: Dicts (chave, arquivos, salvo_em, transacoes) das análises do usuário, da mais recente à mais antiga.
+        """
+        pasta_usuario = self._pasta_usuario(usuario)
+        if not os.path.isdir(pasta_usuario):
+            return []
+        analises = []
+        for chave in os.listdir(pasta_usuario):
+            pasta = os.path.join(pasta_usuario, chave)
+            if '.tmp' in chave or not os.path.exists(os.path.join(pasta, "resumo.json.gz")):
+                continue
+            analises.append({'chave': chave, **self._ler_informacoes(pasta)['informacoes']})
+        return sorted(analises, key=lambda a: a['salvo_em'], reverse=True)
+
+    def _descartar_antigas(self, usuario):
+        for analise in self.listar(usuario)[self.maximo_por_usuario:]:
+            shutil.rmtree(self._pasta(usuario, analise['chave']), ignore_errors=True)
+
+    def carregar(self, usuario, chave):
+        """
+        Returns:
+            dict ou None: Resultados no mesmo formato da análise original, ou None se não houver cópia salva.
+        """
+        pasta = self._pasta(usuario, chave)
+        if not self.existe(usuario, chave):
+            return None
+        resultados = dict(self._ler_informacoes(pasta)['resumo'])
+        if isinstance(resultados.get('Transações por Mês'), dict):
+            resultados['Transações por Mês'] = {pd.Period(mes, freq='M'): valor
+                                                for mes, valor in resultados['Transações por Mês'].items()}
+        caminho_despesas = os.path.join(pasta, "despesas_descricao.parquet")
+        if os.path.exists(caminho_despesas):
+            resultados['Despesas Agrupadas por Descrição'] = pd.read_parquet(caminho_despesas)
+        transacoes = pd.read_parquet(os.path.join(pasta, "transacoes.parquet"))
+        resultados['Transações Normalizadas'] = transacoes
+        resultados['Detalhes das Transações (Receitas)'], resultados['Detalhes das Transações (Despesas)'] = \
+            detalhar_transacoes(transacoes)
+        return resultados
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark das consultas da ferramenta de APIs com respostas gravadas.
+
+Simula vários usuários simultâneos executando as mesmas ações dos botões da
+página (clima, painel de cidades, conversor, busca de filmes, conteúdo
+aleatório) e mede a latência de cada ação (p50/p95/p99), os erros, as
+requisições que chegaram ao "upstream" e a taxa de acerto do cache persistente.
+
+Primeiro grave as fixtures com as chaves reais do env.py (uma passada por todas
+as entradas do benchmark):
+    python benchmark_consultas.py --fixtures fixtures/http --gravar
+
+Depois rode offline, quantas vezes quiser, com latência/erros simulados:
+    python benchmark_consultas.py --fixtures fixtures/http --usuarios 16 --acoes 50 --latencia 0.05 0.4 --taxa-erro 0.02
+"""
+
+import os
+import time
+import random
+import argparse
+import tempfile
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from cache_respostas import CacheRespostas, usar_cache
+from cambio import matriz_cambio, obter_taxas_atuais
+from cliente_http import ErroConsulta
+from clima import buscar_clima, buscar_clima_cidades
+from conteudo_aleatorio import TIPOS_CONTEUDO, obter_reserva
+from filmes import IndiceFilmes, buscar_titulo, pesquisar
+from gravacao_http import ativar_transporte
+from metricas import obter_metricas, percentil
+
+# Chave usada na reprodução; é substituída pelo mesmo marcador das chaves reais gravadas
+CHAVE_REPRODUCAO = "chave-benchmark"
+
+CIDADES = ["São Paulo", "Rio de Janeiro", "Curitiba", "Belo Horizonte", "Porto Alegre", "Lisboa", "Buenos Aires"]
+MOEDAS = ["USD", "EUR", "BRL", "GBP", "JPY", "CAD", "AUD", "CHF", "CNY", "ARS", "MXN"]
+TITULOS = ["Inception", "The Matrix", "Interstellar", "Cidade de Deus"]
+TERMOS_BUSCA = ["matrix", "star wars", "batman"]
+
+
+def criar_acoes(chaves, indice):
+    """
+    Ações da página, cada uma com a lista de entradas possíveis.
+    """
+    return {
+        'clima': (CIDADES, lambda cidade: buscar_clima(cidade, chaves['openweather'])),
+        'painel_clima': ([CIDADES[:4], CIDADES[2:]], lambda cidades: buscar_clima_cidades(cidades, chaves['openweather'])),
+        'conversor': ([None], lambda _: matriz_cambio(obter_taxas_atuais(chaves['exchangerate']), MOEDAS)),
+        'filme_titulo': (TITULOS, lambda titulo: buscar_titulo(titulo, chaves['omdb'])),
+        'filme_busca': (TERMOS_BUSCA, lambda termo: pesquisar(termo, chaves['omdb'], indice, paginas=1, detalhar=5)),
+        'aleatorio': (list(TIPOS_CONTEUDO), lambda tipo: obter_reserva(tipo).obter()),
+    }
+
+
+def gravar(acoes):
+    """
+    Executa cada ação com cada entrada uma vez (com o transporte de gravação ativo).
+    """
+    for nome, (entradas, executar) in acoes.items():
+        for entrada in entradas:
+            try:
+                executar(entrada)
+                print(f"Gravado: {nome} {entrada if entrada is not None else ''}")
+            except ErroConsulta as e:
+                print(f"Falha ao gravar {nome} {entrada}: {e.mensagem}")
+
+
+def simular_usuario(acoes, num_acoes, semente, latencias, erros, lock):
+    aleatorio = random.Random(semente)
+    nomes = list(acoes)
+    for _ in range(num_acoes):
+        nome = aleatorio.choice(nomes)
+        entradas, executar = acoes[nome]
+        entrada = aleatorio.choice(entradas)
+        inicio = time.perf_counter()
+        try:
+            executar(entrada)
+            falhou = False
+        except ErroConsulta:
+            falhou = True
+        duracao = time.perf_counter() - inicio
+        with lock:
+            latencias[nome].append(duracao * 1000)
+            if falhou:
+                erros[nome] += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das consultas com respostas gravadas.")
+    parser.add_argument("--fixtures", required=True, help="Pasta das fixtures HTTP.")
+    parser.add_argument("--gravar", action="store_true", help="Grava as fixtures com as APIs reais (chaves do env.py).")
+    parser.add_argument("--usuarios", type=int, default=8)
+    parser.add_argument("--acoes", type=int, default=25, help="Ações por usuário.")
+    parser.add_argument("--latencia", type=float, nargs=2, default=(0.05, 0.3), metavar=("MIN", "MAX"),
+                        help="Latência simulada do upstream (s).")
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="Fração de requisições com falha simulada.")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--cache-persistente", action="store_true",
+                        help="Usa o cache de respostas real (por padrão o benchmark começa com um cache vazio).")
+    args = parser.parse_args()
+
+    temporario = tempfile.mkdtemp(prefix="benchmark_consultas_")
+    if not args.cache_persistente:
+        usar_cache(CacheRespostas(os.path.join(temporario, "cache.sqlite")))
+    indice = IndiceFilmes(os.path.join(temporario, "filmes.sqlite"))
+
+    if args.gravar:
+        import env
+        chaves = {
+            'openweather': getattr(env, 'OPENWEATHER_API_KEY', ""),
+            'exchangerate': getattr(env, 'EXCHANGERATE_API_KEY', ""),
+            'omdb': getattr(env, 'OMDB_API_KEY', ""),
+        }
+        ativar_transporte("gravar", args.fixtures, segredos=list(chaves.values()))
+        gravar(criar_acoes(chaves, indice))
+        return
+
+    chaves = dict.fromkeys(('openweather', 'exchangerate', 'omdb'), CHAVE_REPRODUCAO)
+    transporte = ativar_transporte("reproduzir", args.fixtures, segredos=[CHAVE_REPRODUCAO],
+                                   latencia=tuple(args.latencia), taxa_erro=args.taxa_erro, semente=args.semente)
+    acoes = criar_acoes(chaves, indice)
+
+    latencias, erros, lock = defaultdict(list), Counter(), threading.Lock()
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.usuarios) as executor:
+        futuros = [executor.submit(simular_usuario, acoes, args.acoes, args.semente + usuario, latencias, erros, lock)
+                   for usuario in range(args.usuarios)]
+    for futuro in futuros:
+        futuro.result() # Uma exceção inesperada num usuário simulado interrompe o benchmark em vez de sumir
+    duracao = time.perf_counter() - inicio
+
+    total = sum(len(v) for v in latencias.values())
+    print(f"Usuários: {args.usuarios} | Ações: {total} | Duração: {duracao:.2f}s | "
+          f"Vazão: {total / duracao:.1f} ações/s")
+    print(f"Latência simulada: {args.latencia[0]:.2f}-{args.latencia[1]:.2f}s | Taxa de erro: {args.taxa_erro:.1%}")
+    print(f"\n{'Ação':<14}{'n':>6}{'erros':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for nome in acoes:
+        valores = sorted(latencias.get(nome, []))
+        print(f"{nome:<14}{len(valores):>6}{erros[nome]:>7}{percentil(valores, 50):>10.1f}"
+              f"{percentil(valores, 95):>10.1f}{percentil(valores, 99):>10.1f}")
+
+    print(f"\nRequisições ao upstream (reproduzidas): {transporte.requisicoes} "
+          f"({transporte.ausentes} sem fixture)")
+    print(f"\n{'Cache':<14}{'fresco':>8}{'vencido':>9}{'ausente':>9}{'acerto':>9}")
+    for linha in obter_metricas().resumo_cache():
+        print(f"{linha['servico']:<14}{linha['fresco']:>8}{linha['vencido']:>9}{linha['ausente']:>9}"
+              f"{linha['taxa_acerto']:>9.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark das operações de usuário no MongoDB: padrão antigo x usuarios.py.
+
+Antigo: cadastro com find_one + insert_one, sem índice único, e login buscando o
+documento inteiro. Novo (UsuariosMongo): índice único, cadastro com um insert só
+e login com projeção do hash. Cada chamada à coleção conta como uma ida ao banco
+e recebe a latência simulada (`--latencia`), imitando um servidor remoto.
+
+Parte dos cadastros disputa o mesmo nome ao mesmo tempo, para mostrar as
+duplicatas que o padrão antigo deixa passar.
+
+Por padrão usa o mongomock (pip install mongomock) como banco local; com --uri
+usa um servidor MongoDB de verdade (ex.: mongodb://localhost:27017/).
+
+Uso:
+    python benchmark_usuarios.py --usuarios 200 --concorrencia 16 --latencia 20
+"""
+
+import time
+import argparse
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from metricas import percentil
+from usuarios import UsuariosMongo, criar_cliente_mongo
+
+HASH_EXEMPLO = b"$2b$12$" + b"x" * 53 # Mesmo tamanho de um hash bcrypt
+
+
+class ColecaoMedida:
+    """
+    Envolve uma coleção contando idas ao banco e bytes lidos, com latência simulada por ida.
+    """
+
+    def __init__(self, colecao, latencia):
+        self.colecao = colecao
+        self.latencia = latencia
+        self.idas = 0
+        self.bytes_lidos = 0
+        self._lock = threading.Lock()
+
+    def _ida(self, metodo, *args, **kwargs):
+        time.sleep(self.latencia)
+        with self._lock: # o mongomock não é seguro para várias threads
+            self.idas += 1
+            return getattr(self.colecao, metodo)(*args, **kwargs)
+
+    def create_index(self, *args, **kwargs):
+        return self._ida('create_index', *args, **kwargs)
+
+    def insert_one(self, *args, **kwargs):
+        return self._ida('insert_one', *args, **kwargs)
+
+    def update_one(self, *args, **kwargs):
+        return self._ida('update_one', *args, **kwargs)
+
+    def find_one(self, *args, **kwargs):
+        import bson
+        documento = self._ida('find_one', *args, **kwargs)
+        if documento:
+            with self._lock:
+                self.bytes_lidos += len(bson.encode(documento))
+        return documento
+
+
+class UsuariosAntigo:
+    """
+    Padrão anterior do app: verificação prévia com find_one e documento inteiro no login.
+    """
+
+    def __init__(self, colecao):
+        self.colecao = colecao
+
+    def preparar(self):
+        pass
+
+    def cadastrar(self, usuario, hash_senha):
+        if self.colecao.find_one({"username": usuario}):
+            return False
+        self.colecao.insert_one({"username": usuario, "password": hash_senha})
+        return True
+
+    def hash_senha(self, usuario):
+        documento = self.colecao.find_one({"username": usuario})
+        return documento["password"] if documento else None
+
+
+def obter_colecao(uri, nome):
+    if uri:
+        colecao = criar_cliente_mongo(uri)["benchmark_usuarios"][nome]
+    else:
+        import mongomock
+        colecao = mongomock.MongoClient()["benchmark_usuarios"][nome]
+    colecao.drop()
+    return colecao
+
+
+def medir(store, medida, nomes, concorrencia):
+    latencias = defaultdict(list)
+    lock = threading.Lock()
+
+    def executar(operacao, funcao, *args):
+        inicio = time.perf_counter()
+        funcao(*args)
+        with lock:
+            latencias[operacao].append((time.perf_counter() - inicio) * 1000)
+
+    idas_antes = medida.idas
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        list(executor.map(lambda nome: executar('cadastro', store.cadastrar, nome, HASH_EXEMPLO), nomes))
+    idas_cadastro = medida.idas - idas_antes
+    bytes_antes, idas_antes = medida.bytes_lidos, medida.idas
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        list(executor.map(lambda nome: executar('login', store.hash_senha, nome), sorted(set(nomes))))
+    idas_login = medida.idas - idas_antes
+    bytes_login = medida.bytes_lidos - bytes_antes
+
+    duplicados = sum(n - 1 for n in Counter(d['username'] for d in medida.colecao.find({}, {'username': 1})).values() if n > 1)
+    return {
+        'cadastro': (len(nomes), idas_cadastro, latencias['cadastro']),
+        'login': (len(set(nomes)), idas_login, latencias['login']),
+        'bytes_login': bytes_login,
+        'duplicados': duplicados,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das operações de usuário no MongoDB.")
+    parser.add_argument("--uri", help="MongoDB real (padrão: mongomock em memória).")
+    parser.add_argument("--usuarios", type=int, default=200)
+    parser.add_argument("--concorrencia", type=int, default=16)
+    parser.add_argument("--latencia", type=float, default=20.0, help="Latência simulada por ida ao banco (ms).")
+    parser.add_argument("--disputados", type=float, default=0.2,
+                        help="Fração dos nomes cadastrada duas vezes ao mesmo tempo.")
+    args = parser.parse_args()
+
+    nomes = [f"usuario{i}" for i in range(args.usuarios)]
+    repetidos = set(nomes[:int(args.usuarios * args.disputados)])
+    # Cada nome disputado aparece duas vezes seguidas, para cair em threads simultâneas
+    tentativas = [n for nome in nomes for n in ([nome, nome] if nome in repetidos else [nome])]
+
+    print(f"Cadastros: {len(tentativas)} ({len(repetidos)} nomes disputados) | Concorrência: {args.concorrencia} | "
+          f"Latência por ida: {args.latencia:.0f} ms | Banco: {args.uri or 'mongomock'}")
+    print(f"\n{'Padrão':<8}{'Operação':<10}{'n':>6}{'idas/op':>9}{'p50 ms':>9}{'p95 ms':>9}")
+    for nome_padrao, classe in (("antigo", UsuariosAntigo), ("novo", UsuariosMongo)):
+        medida = ColecaoMedida(obter_colecao(args.uri, f"usuarios_{nome_padrao}"), args.latencia / 1000)
+        store = classe(medida)
+        store.preparar()
+        medida.idas = 0
+        resultado = medir(store, medida, tentativas, args.concorrencia)
+        for operacao in ('cadastro', 'login'):
+            n, idas, latencias = resultado[operacao]
+            latencias = sorted(latencias)
+            print(f"{nome_padrao:<8}{operacao:<10}{n:>6}{idas / n:>9.2f}{percentil(latencias, 50):>9.1f}"
+                  f"{percentil(latencias, 95):>9.1f}")
+        print(f"{'':<8}bytes lidos por login: {resultado['bytes_login'] / resultado['login'][0]:.0f} | "
+              f"usuários duplicados: {resultado['duplicados']}")
+
+
+if __name__ == "__main__":
+    main()
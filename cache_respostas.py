@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Cache persistente (SQLite) das respostas de APIs externas.
+
+Diferente do `@st.cache_data`, que vive na memória de cada processo, este cache
+sobrevive a reinícios/deploys e é compartilhado por todos os processos que usam a
+mesma pasta de dados. Assim, uma instância recém-iniciada não dispara uma rajada
+de requisições para OpenWeather, ExchangeRate e OMDb.
+
+- TTL por serviço (os mesmos de antes: clima e câmbio 1h, filmes 24h). As cotações
+  (yfinance) não passam por aqui: ficam no histórico local de historico_precos.py.
+- Tamanho limitado: acima de MAXIMO_ENTRADAS, as entradas acessadas há mais tempo
+  são removidas (LRU).
+- Stale-while-revalidate: uma entrada vencida, mas ainda dentro da janela de
+  tolerância do serviço, é devolvida na hora e atualizada em segundo plano.
+- Sem estouro de requisições: faltas simultâneas da mesma chave compartilham uma
+  única busca (SingleFlight, ver controle_requisicoes.py).
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from configuracao import DIRETORIO_DADOS
+from controle_requisicoes import SingleFlight
+from metricas import obter_metricas
+
+CAMINHO_CACHE = os.path.join(DIRETORIO_DADOS, "cache_respostas.sqlite")
+
+# Tempo (s) em que uma resposta é considerada fresca
+TTL_POR_SERVICO = {
+    'openweather': 3600,
+    'exchangerate': 3600,
+    'omdb': 86400,
+}
+TTL_PADRAO = 3600
+# Tempo (s) além do TTL em que a resposta ainda pode ser servida enquanto é atualizada
+JANELA_STALE_POR_SERVICO = {
+    'openweather': 6 * 3600,
+    'exchangerate': 24 * 3600,
+    'omdb': 7 * 86400,
+}
+JANELA_STALE_PADRAO = 3600
+
+MAXIMO_ENTRADAS = 5000
+
+
+def chave_requisicao(url, params=None):
+    """
+    Chave estável para (url, parâmetros). Em hash, para não gravar chaves de API em texto puro.
+    """
+    bruto = json.dumps([url, sorted((params or {}).items())], ensure_ascii=False, default=str)
+    return hashlib.sha256(bruto.encode('utf-8')).hexdigest()
+
+
+class CacheRespostas:
+    """
+    Cache chave -> valor JSON em SQLite, com TTL, LRU e stale-while-revalidate.
+    """
+
+    def __init__(self, caminho=CAMINHO_CACHE, maximo_entradas=MAXIMO_ENTRADAS):
+        self.caminho = caminho
+        self.maximo_entradas = maximo_entradas
+        self._local = threading.local()
+        self._atualizando = set()
+        self._atualizando_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="revalidacao")
+        self._singleflight = SingleFlight()
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        conn = self._conexao()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS respostas ("
+                " chave TEXT PRIMARY KEY, servico TEXT NOT NULL, valor TEXT NOT NULL,"
+                " gravado_em REAL NOT NULL, acessado_em REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_respostas_acesso ON respostas (acessado_em)")
+
+    def _conexao(self):
+        # Uma conexão por thread (conexões SQLite não devem ser compartilhadas entre threads)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.caminho, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def ler(self, chave):
+        """
+        Returns:
+            tuple: (valor, gravado_em) ou None se a chave não estiver no cache.
+        """
+        conn = self._conexao()
+        linha = conn.execute("SELECT valor, gravado_em FROM respostas WHERE chave = ?", (chave,)).fetchone()
+        if linha is None:
+            return None
+        with conn:
+            conn.execute("UPDATE respostas SET acessado_em = ? WHERE chave = ?", (time.time(), chave))
+        return json.loads(linha[0]), linha[1]
+
+    def gravar(self, chave, servico, valor):
+        agora = time.time()
+        conn = self._conexao()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO respostas (chave, servico, valor, gravado_em, acessado_em) VALUES (?, ?, ?, ?, ?)",
+                (chave, servico, json.dumps(valor, ensure_ascii=False, default=str), agora, agora)
+            )
+            excesso = conn.execute("SELECT COUNT(*) FROM respostas").fetchone()[0] - self.maximo_entradas
+            if excesso > 0:
+                conn.execute(
+                    "DELETE FROM respostas WHERE chave IN ("
+                    " SELECT chave FROM respostas ORDER BY acessado_em LIMIT ?)", (excesso,)
+                )
+
+    def buscar(self, servico, chave, calcular):
+        """
+        Retorna o valor em cache ou o calcula.
+
+        - Fresco: devolvido direto do cache.
+        - Vencido, dentro da janela de tolerância: devolvido na hora; `calcular` roda em segundo plano.
+        - Ausente ou vencido além da janela: `calcular` roda agora e o resultado é gravado.
+
+        Args:
+            servico (str): Define o TTL e a janela de tolerância.
+            chave (str): Chave da entrada (ver chave_requisicao).
+            calcular (callable): Função sem argumentos que busca o valor (serializável em JSON).
+                                 Exceções não são gravadas no cache.
+        """
+        ttl = TTL_POR_SERVICO.get(servico, TTL_PADRAO)
+        janela = JANELA_STALE_POR_SERVICO.get(servico, JANELA_STALE_PADRAO)
+
+        encontrado = self.ler(chave)
+        if encontrado is not None:
+            valor, gravado_em = encontrado
+            idade = time.time() - gravado_em
+            if idade <= ttl:
+                obter_metricas().registrar_cache(servico, 'fresco')
+                return valor
+            if idade <= ttl + janela:
+                obter_metricas().registrar_cache(servico, 'vencido')
+                self._revalidar(servico, chave, calcular)
+                return valor
+
+        obter_metricas().registrar_cache(servico, 'ausente')
+        return self._singleflight.executar(chave, lambda: self._calcular_e_gravar(servico, chave, calcular))
+
+    def _calcular_e_gravar(self, servico, chave, calcular):
+        valor = calcular()
+        self.gravar(chave, servico, valor)
+        return valor
+
+    def _revalidar(self, servico, chave, calcular):
+        with self._atualizando_lock:
+            if chave in self._atualizando: # Já existe uma atualização em andamento
+                return
+            self._atualizando.add(chave)
+
+        def tarefa():
+            try:
+                self._singleflight.executar(chave, lambda: self._calcular_e_gravar(servico, chave, calcular))
+            except Exception as e:
+                # Falhou a atualização: a entrada antiga continua servindo até o fim da janela
+                print(f"Aviso: falha ao atualizar o cache de '{servico}': {e}")
+            finally:
+                with self._atualizando_lock:
+                    self._atualizando.discard(chave)
+
+        self._executor.submit(tarefa)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def obter_cache():
+    """
+    Retorna o cache persistente do processo (criado na primeira chamada).
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CacheRespostas()
+        return _cache
+
+
+def usar_cache(cache):
+    """
+    Define o cache do processo (ex.: um cache temporário no benchmark das consultas).
+    """
+    global _cache
+    with _cache_lock:
+        _cache = cache
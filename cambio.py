@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Tabela local de taxas de câmbio e conversão de transações para a moeda do relatório.
+
+As taxas ficam num SQLite local, datadas, sempre em relação a uma moeda base
+(1 unidade da base = `taxa` unidades da moeda). A tabela é preenchida em lote:
+uma chamada ao endpoint `latest/{base}` da ExchangeRate-API traz todas as moedas
+do dia, ou um arquivo CSV com o histórico é importado de uma vez.
+
+A conversão das transações é feita com um as-of join vetorizado (pd.merge_asof)
+por data e moeda; nunca há uma chamada de API por linha.
+
+Para o conversor da ferramenta de consultas, `matriz_cambio` deriva todas as
+taxas cruzadas (de qualquer moeda para qualquer outra) de uma única tabela
+`latest/{base}`, em vez de uma chamada ao endpoint `pair/{de}/{para}` por par.
+"""
+
+import os
+import sqlite3
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from cliente_http import obter_json, obter_json_cacheado
+from configuracao import DIRETORIO_DADOS
+
+CAMINHO_TABELA_CAMBIO = os.path.join(DIRETORIO_DADOS, "taxas_cambio.sqlite")
+MOEDA_BASE = "BRL"
+MOEDA_RELATORIO = "BRL"
+# Base da tabela usada pelo conversor (qualquer moeda serve: as taxas cruzadas não dependem dela)
+MOEDA_BASE_CONVERSOR = "USD"
+
+
+class CambioIndisponivel(Exception):
+    """Não há taxa registrada para alguma moeda presente nas transações."""
+
+
+class TabelaCambio:
+    """
+    Taxas de câmbio datadas gravadas em SQLite.
+    """
+
+    def __init__(self, caminho=CAMINHO_TABELA_CAMBIO, base=MOEDA_BASE):
+        self.caminho = caminho
+        self.base = base
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with self._conectar() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS taxas ("
+                " data TEXT NOT NULL, base TEXT NOT NULL, moeda TEXT NOT NULL, taxa REAL NOT NULL,"
+                " PRIMARY KEY (base, moeda, data))"
+            )
+
+    def _conectar(self):
+        return sqlite3.connect(self.caminho)
+
+    def gravar(self, df_taxas):
+        """
+        Grava (ou substitui) taxas em lote.
+
+        Args:
+            df_taxas (pd.DataFrame): Colunas 'data', 'moeda' e 'taxa' (1 base = taxa moeda).
+
+        Returns:
+            int: Número de taxas gravadas.
+        """
+        registros = pd.DataFrame({
+            'data': pd.to_datetime(df_taxas['data']).dt.strftime('%Y-%m-%d'),
+            'base': self.base,
+            'moeda': df_taxas['moeda'].astype(str).str.upper().str.strip(),
+            'taxa': pd.to_numeric(df_taxas['taxa'], errors='coerce'),
+        }).dropna(subset=['taxa'])
+        with self._conectar() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO taxas (data, base, moeda, taxa) VALUES (?, ?, ?, ?)",
+                registros.itertuples(index=False, name=None)
+            )
+        return len(registros)
+
+    def importar_arquivo(self, caminho_arquivo):
+        """
+        Importa um CSV (separador ';') com as colunas data, moeda e taxa, relativas à moeda base.
+        """
+        df = pd.read_csv(caminho_arquivo, sep=';', decimal=',')
+        df.columns = df.columns.str.lower().str.strip()
+        return self.gravar(df)
+
+    def atualizar_da_api(self, api_key):
+        """
+        Busca todas as taxas do dia na ExchangeRate-API (endpoint latest/{base}) com uma única chamada.
+        """
+        api_url = f"https://v6.exchangerate-api.com/v6/{api_key}/latest/{self.base}"
+        data = obter_json('exchangerate', api_url)
+        if data.get("result") != "success":
+            raise ValueError(f"Erro na API de Câmbio: {data.get('error-type', 'Erro desconhecido')}")
+        hoje = datetime.date.today().isoformat()
+        taxas = pd.DataFrame(list(data["conversion_rates"].items()), columns=['moeda', 'taxa'])
+        taxas['data'] = hoje
+        return self.gravar(taxas)
+
+    def versao(self):
+        """
+        Identifica o conteúdo atual da tabela (muda quando taxas são gravadas ou substituídas).
+        Usada na chave das análises, para uma análise não ser reaproveitada depois de novas taxas.
+        """
+        with self._conectar() as conn:
+            linha = conn.execute("SELECT COUNT(*), MAX(data), SUM(taxa) FROM taxas WHERE base = ?",
+                                 (self.base,)).fetchone()
+        return "-".join(str(v) for v in linha)
+
+    def carregar(self, moedas=None):
+        """
+        Retorna as taxas registradas como DataFrame ('data', 'moeda', 'taxa').
+        """
+        consulta = "SELECT data, moeda, taxa FROM taxas WHERE base = ?"
+        parametros = [self.base]
+        if moedas:
+            moedas = list(moedas)
+            consulta += f" AND moeda IN ({', '.join('?' * len(moedas))})"
+            parametros += moedas
+        with self._conectar() as conn:
+            df = pd.read_sql_query(consulta, conn, params=parametros)
+        df['data'] = pd.to_datetime(df['data'])
+        return df
+
+
+def _taxas_na_data(chaves, taxas):
+    """
+    As-of join: para cada (data, moeda) em `chaves`, a taxa mais recente até aquela data.
+    Sem taxa anterior, a taxa fica NaN (uma taxa posterior, como a do dia, não vale para o passado).
+    """
+    chaves = chaves.assign(_linha=chaves.index).sort_values('data', kind='stable')
+    taxas = taxas.sort_values('data')
+    resultado = pd.merge_asof(chaves, taxas, on='data', by='moeda', direction='backward')
+    return resultado.set_index('_linha')['taxa']
+
+
+def converter_para_moeda_relatorio(df, tabela, moeda_relatorio=MOEDA_RELATORIO):
+    """
+    Converte a coluna 'valor' para a moeda do relatório usando as taxas da tabela local.
+    O valor original é mantido em 'valor_original'.
+
+    Args:
+        df (pd.DataFrame): Transações normalizadas, com as colunas 'data', 'valor' e 'moeda'.
+        tabela (TabelaCambio): Tabela local de taxas.
+        moeda_relatorio (str): Moeda em que os totais serão apresentados.
+
+    Returns:
+        pd.DataFrame: Cópia de `df` com 'valor' convertido.
+
+    Raises:
+        CambioIndisponivel: Se alguma moeda não tiver taxa registrada até a data de alguma transação.
+    """
+    df = df.copy()
+    df['valor_original'] = df['valor']
+    moedas = set(df['moeda'].unique()) | {moeda_relatorio}
+    moedas.discard(tabela.base)
+    if df['moeda'].eq(moeda_relatorio).all():
+        return df
+
+    taxas = tabela.carregar(moedas)
+    # A moeda base tem taxa 1 em qualquer data
+    base = pd.DataFrame({'data': [pd.Timestamp('1900-01-01')], 'moeda': [tabela.base], 'taxa': [1.0]})
+    taxas = pd.concat([base, taxas], ignore_index=True) if not taxas.empty else base
+
+    sem_taxa = sorted((set(df['moeda']) | {moeda_relatorio}) - set(taxas['moeda']))
+    if sem_taxa:
+        raise CambioIndisponivel(f"Sem taxa de câmbio registrada para: {', '.join(sem_taxa)}.")
+
+    datas = df['data'].dt.normalize()
+    # valor na base = valor / taxa(moeda); valor no relatório = valor na base * taxa(relatório)
+    taxa_origem = _taxas_na_data(pd.DataFrame({'data': datas, 'moeda': df['moeda']}), taxas)
+    taxa_destino = _taxas_na_data(pd.DataFrame({'data': datas, 'moeda': moeda_relatorio}), taxas)
+    taxa_origem, taxa_destino = taxa_origem.reindex(df.index), taxa_destino.reindex(df.index)
+
+    sem_taxa_na_data = taxa_origem.isna() | taxa_destino.isna()
+    if sem_taxa_na_data.any():
+        # Moeda -> primeira data sem taxa anterior (a da transação ou a da moeda do relatório)
+        faltantes = df.loc[sem_taxa_na_data].assign(
+            moeda=np.where(taxa_origem[sem_taxa_na_data].isna(), df.loc[sem_taxa_na_data, 'moeda'], moeda_relatorio)
+        ).groupby('moeda')['data'].min()
+        detalhes = ", ".join(f"{moeda} (desde {data:%d/%m/%Y})" for moeda, data in faltantes.items())
+        raise CambioIndisponivel(
+            f"{int(sem_taxa_na_data.sum())} transação(ões) sem taxa de câmbio registrada até a data: {detalhes}. "
+            f"Importe o histórico de taxas que cubra essas datas."
+        )
+    df['valor'] = df['valor'] / taxa_origem * taxa_destino
+    return df
+
+
+def obter_taxas_atuais(api_key, base=MOEDA_BASE_CONVERSOR):
+    """
+    Todas as taxas do dia em relação a `base`, numa única chamada (latest/{base})
+    que passa pelo cache persistente de respostas.
+
+    Returns:
+        pd.Series: moeda -> taxa (1 base = taxa moeda).
+
+    Raises:
+        ErroConsulta: Falha na requisição.
+        ValueError: A API respondeu com erro.
+    """
+    api_url = f"https://v6.exchangerate-api.com/v6/{api_key}/latest/{base}"
+    data = obter_json_cacheado('exchangerate', api_url)
+    if data.get("result") != "success":
+        raise ValueError(f"Erro na API de Câmbio: {data.get('error-type', 'Erro desconhecido')}")
+    return pd.Series(data["conversion_rates"], dtype='float64')
+
+
+def taxas_mais_recentes(tabela):
+    """
+    Última taxa registrada de cada moeda na tabela local, no mesmo formato de obter_taxas_atuais
+    (moeda -> taxa em relação à base da tabela, com a própria base valendo 1).
+    """
+    taxas = tabela.carregar().sort_values('data').drop_duplicates('moeda', keep='last')
+    taxas = pd.concat([pd.Series({tabela.base: 1.0}), taxas.set_index('moeda')['taxa'].astype('float64')])
+    return taxas[~taxas.index.duplicated(keep='first')]
+
+
+def matriz_cambio(taxas, moedas=None):
+    """
+    Matriz de taxas cruzadas: matriz.loc[de, para] = unidades de `para` por 1 unidade de `de`.
+
+    Args:
+        taxas (pd.Series): moeda -> taxa em relação a uma base comum (ver obter_taxas_atuais).
+        moedas (list): Moedas da matriz, na ordem desejada (por padrão, todas).
+    """
+    if moedas is not None:
+        taxas = taxas.reindex(moedas)
+    valores = taxas.to_numpy()
+    return pd.DataFrame(np.outer(1 / valores, valores), index=taxas.index, columns=taxas.index)
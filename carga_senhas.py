@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Teste de carga do hash/verificação de senhas (senhas.py).
+
+Simula uma rajada de logins concorrentes contra o pool de bcrypt e mede a vazão
+(logins/s e logins/s por núcleo), os percentis de latência e quantas tentativas
+foram recusadas por fila cheia.
+
+Uso:
+    python carga_senhas.py --logins 200 --concorrencia 32 --custo 12 --workers 4 --fila 16
+"""
+
+import os
+import time
+import argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from metricas import percentil
+from senhas import CUSTO_PADRAO, PoolSenhas, SistemaOcupado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do pool de senhas (bcrypt).")
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concorrencia", type=int, default=16, help="Logins simultâneos (sessões).")
+    parser.add_argument("--custo", type=int, default=CUSTO_PADRAO, help="Custo do bcrypt.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Threads do pool de senhas.")
+    parser.add_argument("--fila", type=int, default=32, help="Verificações aguardando além das em execução.")
+    parser.add_argument("--rehash", action="store_true",
+                        help="Grava os hashes com custo menor, para medir o login com rehash.")
+    args = parser.parse_args()
+
+    nucleos = os.cpu_count() or 1
+    senha = "senha-de-teste-123"
+    custo_gravado = max(4, args.custo - 1) if args.rehash else args.custo
+    hash_gravado = bcrypt.hashpw(senha.encode('utf-8'), bcrypt.gensalt(rounds=custo_gravado))
+    pool = PoolSenhas(workers=args.workers, tamanho_fila=args.fila, custo=args.custo)
+
+    def login(_):
+        inicio = time.perf_counter()
+        try:
+            correta, _novo_hash = pool.verificar(senha, hash_gravado)
+            status = "ok" if correta else "senha_incorreta"
+        except SistemaOcupado:
+            status = "recusado"
+        return status, time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concorrencia) as executor:
+        resultados = list(executor.map(login, range(args.logins)))
+    duracao = time.perf_counter() - inicio
+    pool.encerrar()
+
+    status = Counter(s for s, _ in resultados)
+    latencias = sorted(t * 1000 for s, t in resultados if s == "ok")
+    vazao = len(latencias) / duracao
+
+    print(f"Custo bcrypt: {args.custo} (gravado: {custo_gravado}) | Workers: {args.workers} | "
+          f"Fila: {args.fila} | Núcleos: {nucleos}")
+    print(f"Logins: {args.logins} | Concorrência: {args.concorrencia} | Duração: {duracao:.2f}s")
+    print(f"Status: {dict(status)}")
+    print(f"Vazão: {vazao:.1f} logins/s ({vazao / nucleos:.1f} logins/s por núcleo)")
+    if latencias:
+        print(f"Latência (ms): p50={percentil(latencias, 50):.1f} p95={percentil(latencias, 95):.1f} "
+              f"p99={percentil(latencias, 99):.1f} máx={latencias[-1]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Teste de carga do serviço de análise (servico_analise.py).
+
+Envia a mesma planilha várias vezes com uploads concorrentes e mede a vazão
+(requisições/s) e os percentis de latência (p50/p95/p99) das respostas.
+
+Uso (com o serviço rodando):
+    python carga_servico_analise.py extrato.csv --requisicoes 200 --concorrencia 16
+"""
+
+import os
+import time
+import argparse
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from metricas import percentil
+
+
+def enviar(url, conteudo, timeout):
+    requisicao = urllib.request.Request(url, data=conteudo, method="POST",
+                                        headers={"Content-Type": "application/octet-stream"})
+    inicio = time.perf_counter()
+    try:
+        with urllib.request.urlopen(requisicao, timeout=timeout) as resposta:
+            resposta.read()
+            status = resposta.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status = e.code
+    except (urllib.error.URLError, TimeoutError):
+        status = "falha"
+    return status, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do serviço de análise.")
+    parser.add_argument("arquivo", help="Planilha enviada em todas as requisições.")
+    parser.add_argument("--url", default="http://127.0.0.1:8600/analisar")
+    parser.add_argument("--requisicoes", type=int, default=100)
+    parser.add_argument("--concorrencia", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=180.0)
+    args = parser.parse_args()
+
+    with open(args.arquivo, 'rb') as f:
+        conteudo = f.read()
+    url = f"{args.url}?{urllib.parse.urlencode({'nome': os.path.basename(args.arquivo), 'num': 10})}"
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concorrencia) as executor:
+        respostas = list(executor.map(lambda _: enviar(url, conteudo, args.timeout), range(args.requisicoes)))
+    duracao = time.perf_counter() - inicio
+
+    status = Counter(s for s, _ in respostas)
+    latencias_ok = sorted(t * 1000 for s, t in respostas if s == 200)
+
+    print(f"Arquivo: {args.arquivo} ({len(conteudo) / 1024:.1f} KiB)")
+    print(f"Requisições: {args.requisicoes} | Concorrência: {args.concorrencia} | Duração: {duracao:.2f}s")
+    print(f"Status: {dict(status)}")
+    print(f"Vazão (respostas 200): {len(latencias_ok) / duracao:.2f} req/s")
+    if latencias_ok:
+        print(f"Latência (ms): p50={percentil(latencias_ok, 50):.1f} "
+              f"p95={percentil(latencias_ok, 95):.1f} p99={percentil(latencias_ok, 99):.1f} "
+              f"máx={latencias_ok[-1]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
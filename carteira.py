@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+Avaliação de uma carteira de investimentos a partir de um arquivo de posições.
+
+O arquivo traz uma linha por posição (símbolo, quantidade, custo médio e,
+opcionalmente, a moeda do custo). O preço é convertido pela moeda da própria
+cotação (cotacoes.moeda_cotacao); a moeda do arquivo vale para o custo médio e,
+quando diverge da cotação, a posição é apontada para conferência.
+
+Todas as cotações vêm de um único download em lote (cotacoes.py) e a conversão
+para a moeda da carteira usa uma única tabela de câmbio (cambio.py); valor de
+mercado, resultado, pesos e variação do dia são calculados com operações de
+coluna sobre a tabela inteira, sem laço por posição.
+
+Quantidades e custos podem vir no formato brasileiro ("1.234,56") ou americano
+("1,234.56"). O separador decimal pode ser informado; no modo automático, um
+valor que serve aos dois formatos ("1.500": 1,5 ou 1.500?) é recusado com a
+lista das células ambíguas, em vez de ser adivinhado.
+"""
+
+import os
+import re
+
+import pandas as pd
+
+from cambio import matriz_cambio
+from cotacoes import buscar_cotacoes
+
+MOEDA_CARTEIRA = "BRL"
+# Separadores decimais aceitos em ler_carteira (None: automático)
+SEPARADORES_DECIMAIS = (',', '.')
+# Células ambíguas listadas no erro do modo automático
+MAXIMO_AMBIGUOS_RELATADOS = 5
+
+# Nomes aceitos para cada coluna do arquivo de posições
+ALIASES_COLUNAS = {
+    'simbolo': ('simbolo', 'símbolo', 'ticker', 'ativo', 'symbol'),
+    'quantidade': ('quantidade', 'qtd', 'quantity'),
+    'custo_medio': ('custo_medio', 'custo médio', 'preco_medio', 'preço médio', 'average_cost', 'average cost'),
+    'moeda': ('moeda', 'currency'),
+}
+
+
+def _normalizar_numero(texto, separador_decimal=None):
+    """
+    Converte o texto de um número para o formato com ponto decimal e sem separador de milhar.
+
+    Args:
+        separador_decimal (str): ',' ou '.'; o outro é o separador de milhar. Com None, é
+            deduzido: havendo os dois, o último é o decimal; um separador repetido é de milhar;
+            um único separador é decimal, a menos que o valor seja ambíguo.
+
+    Returns:
+        str ou None: Texto normalizado, ou None se o valor for ambíguo no modo automático
+                     (um único separador seguido de exatamente três dígitos, sem zero à
+                     esquerda: "1.500", "12,345").
+    """
+    texto = texto.strip().replace(' ', '')
+    if separador_decimal is None:
+        virgulas, pontos = texto.count(','), texto.count('.')
+        if virgulas and pontos:
+            separador_decimal = ',' if texto.rfind(',') > texto.rfind('.') else '.'
+        elif virgulas + pontos == 0:
+            return texto
+        elif virgulas > 1 or pontos > 1:
+            separador_decimal = '.' if virgulas else ',' # O separador repetido é o de milhar
+        elif re.fullmatch(r"-?[1-9]\d{0,2}[.,]\d{3}", texto):
+            return None
+        else:
+            separador_decimal = ',' if virgulas else '.'
+    milhar = '.' if separador_decimal == ',' else ','
+    return texto.replace(milhar, '').replace(separador_decimal, '.')
+
+
+def _converter_numeros(coluna, separador_decimal=None):
+    """
+    Converte quantidades e preços lidos como texto (ver _normalizar_numero). Números já
+    numéricos (células do Excel) são mantidos.
+
+    Returns:
+        tuple: (pd.Series numérica, list de textos ambíguos no modo automático)
+    """
+    ambiguos = []
+
+    def converter(valor):
+        if isinstance(valor, (int, float)) or pd.isna(valor):
+            return valor
+        normalizado = _normalizar_numero(str(valor), separador_decimal)
+        if normalizado is None:
+            ambiguos.append(str(valor).strip())
+        return normalizado
+    return pd.to_numeric(coluna.map(converter), errors='coerce'), ambiguos
+
+
+def ler_carteira(arquivo, nome_arquivo=None, separador_decimal=None):
+    """
+    Lê o arquivo de posições (CSV ou Excel) e padroniza as colunas.
+    Posições repetidas do mesmo símbolo são somadas, com custo médio ponderado.
+
+    Args:
+        arquivo: Caminho ou arquivo aberto (ex.: upload do Streamlit).
+        nome_arquivo (str): Nome usado para identificar o formato quando `arquivo` não é um caminho.
+        separador_decimal (str): ',' ou '.' nos números do arquivo; None para deduzir (ver _normalizar_numero).
+
+    Returns:
+        pd.DataFrame: Colunas simbolo, quantidade, custo_medio e moeda (vazia quando o arquivo não informa).
+
+    Raises:
+        ValueError: Se faltar alguma coluna obrigatória ou houver valores inválidos ou ambíguos.
+    """
+    if separador_decimal not in (None,) + SEPARADORES_DECIMAIS:
+        raise ValueError(f"Separador decimal inválido: {separador_decimal!r} (use ',' ou '.').")
+    nome = nome_arquivo or (arquivo if isinstance(arquivo, str) else getattr(arquivo, 'name', ''))
+    if os.path.splitext(nome)[1].lower() in ('.xlsx', '.xls'):
+        df = pd.read_excel(arquivo)
+    else:
+        df = pd.read_csv(arquivo, sep=None, engine='python', dtype=str) # Texto: "1.000" não vira 1.0
+
+    colunas = {c: str(c).strip().lower() for c in df.columns}
+    renomear = {}
+    for padrao, aliases in ALIASES_COLUNAS.items():
+        encontrada = next((c for c, normal in colunas.items() if normal in aliases), None)
+        if encontrada is not None:
+            renomear[encontrada] = padrao
+    df = df.rename(columns=renomear)
+    faltantes = [c for c in ('simbolo', 'quantidade', 'custo_medio') if c not in df.columns]
+    if faltantes:
+        raise ValueError(f"Colunas obrigatórias ausentes no arquivo de posições: {', '.join(faltantes)}.")
+    if 'moeda' not in df.columns:
+        df['moeda'] = None # Sem moeda no arquivo: vale a moeda da cotação
+
+    df = df[['simbolo', 'quantidade', 'custo_medio', 'moeda']].copy()
+    df['simbolo'] = df['simbolo'].astype(str).str.strip().str.upper()
+    df['moeda'] = df['moeda'].astype('string').str.strip().str.upper().replace('', pd.NA)
+    ambiguos = []
+    for coluna in ('quantidade', 'custo_medio'):
+        df[coluna], ambiguos_coluna = _converter_numeros(df[coluna], separador_decimal)
+        ambiguos += ambiguos_coluna
+    if ambiguos:
+        raise ValueError(
+            f"{len(ambiguos)} valor(es) ambíguo(s) no arquivo, que podem ter ponto/vírgula como separador decimal "
+            f"ou de milhar: {', '.join(ambiguos[:MAXIMO_AMBIGUOS_RELATADOS])}. Informe o separador decimal do arquivo."
+        )
+    invalidas = df['simbolo'].eq('') | df['quantidade'].isna() | df['custo_medio'].isna()
+    if invalidas.any():
+        raise ValueError(f"{int(invalidas.sum())} linha(s) com símbolo, quantidade ou custo médio inválido.")
+
+    df['custo_total'] = df['quantidade'] * df['custo_medio']
+    df = df.groupby(['simbolo', 'moeda'], as_index=False, sort=False, dropna=False)[['quantidade', 'custo_total']].sum()
+    df['custo_medio'] = df['custo_total'] / df['quantidade']
+    return df[['simbolo', 'quantidade', 'custo_medio', 'moeda']]
+
+
+def avaliar_carteira(carteira, cotacoes, taxas, moeda_carteira=MOEDA_CARTEIRA):
+    """
+    Avalia todas as posições de uma vez.
+
+    O custo é convertido pela taxa atual (a mesma do valor de mercado), então o resultado
+    mostra o desempenho do ativo na moeda dele, já expresso na moeda da carteira.
+
+    O preço é convertido pela moeda da cotação (coluna 'moeda' de `cotacoes`) e o custo pela
+    moeda do arquivo; sem moeda no arquivo, o custo está na moeda da cotação, e sem nenhuma
+    das duas, na moeda da carteira.
+
+    Args:
+        carteira (pd.DataFrame): Saída de ler_carteira.
+        cotacoes (pd.DataFrame): Tabela de buscar_cotacoes (simbolo, moeda, preco, fechamento_anterior...).
+        taxas (pd.Series): moeda -> taxa em relação a uma base comum (ver cambio.obter_taxas_atuais).
+        moeda_carteira (str): Moeda em que os valores são apresentados.
+
+    Returns:
+        tuple: (DataFrame de posições avaliadas, dict de totais, list de moedas sem taxa,
+                list de textos "SÍMBOLO (arquivo X, cotação Y)" com moedas divergentes)
+    """
+    if 'moeda' not in cotacoes.columns:
+        cotacoes = cotacoes.assign(moeda=None)
+    posicoes = carteira.merge(cotacoes[['simbolo', 'moeda', 'preco', 'fechamento_anterior']]
+                              .rename(columns={'moeda': 'moeda_cotacao'}), on='simbolo', how='left')
+    posicoes['moeda_cotacao'] = posicoes['moeda_cotacao'].astype('string')
+    posicoes['moeda'] = posicoes['moeda'].astype('string')
+    divergentes = posicoes['moeda'].notna() & posicoes['moeda_cotacao'].notna() \
+        & posicoes['moeda'].ne(posicoes['moeda_cotacao'])
+    moedas_divergentes = [f"{linha.simbolo} (arquivo {linha.moeda}, cotação {linha.moeda_cotacao})"
+                          for linha in posicoes[divergentes].itertuples()]
+    posicoes['moeda_cotacao'] = posicoes['moeda_cotacao'].fillna(posicoes['moeda']).fillna(moeda_carteira)
+    posicoes['moeda'] = posicoes['moeda'].fillna(posicoes['moeda_cotacao'])
+
+    moedas = sorted(set(posicoes['moeda']) | set(posicoes['moeda_cotacao']) | {moeda_carteira})
+    fatores = matriz_cambio(taxas, moedas)[moeda_carteira] # 1 unidade da moeda -> moeda da carteira
+    sem_taxa = sorted(fatores[fatores.isna()].index)
+
+    fator = posicoes['moeda_cotacao'].map(fatores).astype('float64')
+    fator_custo = posicoes['moeda'].map(fatores).astype('float64')
+    posicoes['valor_mercado'] = posicoes['quantidade'] * posicoes['preco'] * fator
+    posicoes['custo_total'] = posicoes['quantidade'] * posicoes['custo_medio'] * fator_custo
+    posicoes['resultado'] = posicoes['valor_mercado'] - posicoes['custo_total']
+    posicoes['resultado_percentual'] = posicoes['resultado'] / posicoes['custo_total'] * 100
+    anterior = posicoes['quantidade'] * posicoes['fechamento_anterior'] * fator
+    posicoes['variacao_dia'] = posicoes['valor_mercado'] - anterior
+    posicoes['variacao_dia_percentual'] = posicoes['variacao_dia'] / anterior * 100
+    total_mercado = posicoes['valor_mercado'].sum()
+    posicoes['peso'] = posicoes['valor_mercado'] / total_mercado * 100 if total_mercado else float('nan')
+
+    avaliadas = posicoes['valor_mercado'].notna()
+    custo_avaliado = posicoes.loc[avaliadas, 'custo_total'].sum()
+    anterior_total = anterior[avaliadas & anterior.notna()].sum()
+    variacao_total = posicoes.loc[avaliadas, 'variacao_dia'].sum()
+    totais = {
+        'valor_mercado': total_mercado,
+        'custo_total': custo_avaliado,
+        'resultado': total_mercado - custo_avaliado,
+        'resultado_percentual': (total_mercado - custo_avaliado) / custo_avaliado * 100 if custo_avaliado else None,
+        'variacao_dia': variacao_total,
+        'variacao_dia_percentual': variacao_total / anterior_total * 100 if anterior_total else None,
+        'posicoes': len(posicoes),
+        'posicoes_sem_cotacao': int(posicoes['preco'].isna().sum()),
+    }
+    posicoes = posicoes.sort_values('valor_mercado', ascending=False, na_position='last')
+    return posicoes, totais, sem_taxa, moedas_divergentes
+
+
+def avaliar_arquivo_carteira(arquivo, taxas, nome_arquivo=None, historico=None, moeda_carteira=MOEDA_CARTEIRA,
+                             separador_decimal=None):
+    """
+    Lê o arquivo de posições, busca todas as cotações num único lote e avalia a carteira.
+    `separador_decimal` é repassado a ler_carteira.
+
+    Returns:
+        tuple: (posições avaliadas, totais, símbolos sem cotação, moedas sem taxa, moedas divergentes)
+    """
+    carteira = ler_carteira(arquivo, nome_arquivo, separador_decimal)
+    cotacoes, _historicos, nao_encontrados = buscar_cotacoes(carteira['simbolo'].tolist(), historico=historico)
+    if cotacoes.empty:
+        cotacoes = pd.DataFrame(columns=['simbolo', 'moeda', 'preco', 'fechamento_anterior'])
+    posicoes, totais, sem_taxa, moedas_divergentes = avaliar_carteira(carteira, cotacoes, taxas, moeda_carteira)
+    return posicoes, totais, nao_encontrados, sem_taxa, moedas_divergentes
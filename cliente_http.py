@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Cliente HTTP compartilhado para as consultas a APIs externas.
+
+- Uma única `requests.Session` por processo, com pool de conexões e keep-alive
+  (evita abrir uma nova conexão TCP/TLS a cada consulta).
+- Timeouts de conexão e de leitura configurados por serviço: um upstream lento
+  não prende mais a sessão do Streamlit indefinidamente.
+- Novas tentativas com backoff exponencial e jitter para respostas 5xx, 429,
+  timeouts e falhas de conexão.
+- Limite de taxa por serviço (token bucket, ver controle_requisicoes.py), para
+  não estourar a cota das APIs sob carga.
+- Um único tipo de erro (`ErroConsulta`) com uma mensagem pronta para o usuário,
+  no lugar dos vários `except requests.exceptions...` espalhados pelas páginas.
+"""
+
+import time
+import random
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from controle_requisicoes import obter_balde
+from metricas import endpoint_da_url, obter_metricas
+
+# Configuração por serviço: timeouts (conexão, leitura) em segundos e tentativas
+SERVICOS = {
+    'openweather': {'nome': "OpenWeatherMap", 'timeout': (3.05, 8), 'tentativas': 3},
+    'exchangerate': {'nome': "ExchangeRate-API", 'timeout': (3.05, 8), 'tentativas': 3},
+    'omdb': {'nome': "OMDb", 'timeout': (3.05, 10), 'tentativas': 3},
+    'numbersapi': {'nome': "Numbers API", 'timeout': (3.05, 5), 'tentativas': 2},
+    'quotable': {'nome': "Quotable", 'timeout': (3.05, 5), 'tentativas': 2},
+    'jokeapi': {'nome': "JokeAPI", 'timeout': (3.05, 5), 'tentativas': 2},
+    'posteres': {'nome': "servidor de pôsteres", 'timeout': (3.05, 10), 'tentativas': 2},
+}
+SERVICO_PADRAO = {'nome': "serviço externo", 'timeout': (3.05, 10), 'tentativas': 2}
+
+# Backoff: espera aleatória entre 0 e min(MAXIMO, BASE * 2^tentativa) ("full jitter")
+BACKOFF_BASE = 0.3
+BACKOFF_MAXIMO = 4.0
+STATUS_REPETIVEIS = {429, 500, 502, 503, 504}
+
+TAMANHO_POOL = 20
+
+
+class ErroConsulta(Exception):
+    """
+    Falha numa consulta externa.
+
+    Atributos:
+        servico (str): Chave do serviço (ex.: 'openweather').
+        tipo (str): 'timeout', 'conexao', 'http', 'limite' ou 'resposta_invalida'.
+        status (int): Código HTTP, quando houver resposta.
+        mensagem (str): Texto para exibir ao usuário.
+    """
+
+    def __init__(self, servico, tipo, mensagem, status=None):
+        super().__init__(mensagem)
+        self.servico = servico
+        self.tipo = tipo
+        self.status = status
+        self.mensagem = mensagem
+
+
+_sessao = None
+_sessao_lock = threading.Lock()
+
+
+def obter_sessao():
+    """
+    Retorna a sessão HTTP do processo (criada na primeira chamada).
+    """
+    global _sessao
+    with _sessao_lock:
+        if _sessao is None:
+            sessao = requests.Session()
+            adaptador = HTTPAdapter(pool_connections=TAMANHO_POOL, pool_maxsize=TAMANHO_POOL, max_retries=0)
+            sessao.mount("http://", adaptador)
+            sessao.mount("https://", adaptador)
+            _sessao = sessao
+        return _sessao
+
+
+_transporte = None
+
+
+def definir_transporte(transporte):
+    """
+    Substitui o envio real por outro transporte com o método `get(url, params=, timeout=)`
+    (ex.: gravação/reprodução de respostas, ver gravacao_http.py). None volta à sessão HTTP.
+    """
+    global _transporte
+    _transporte = transporte
+
+
+def _espera_backoff(tentativa):
+    return random.uniform(0, min(BACKOFF_MAXIMO, BACKOFF_BASE * (2 ** tentativa)))
+
+
+def requisitar(servico, url, params=None):
+    """
+    Faz um GET com timeouts e novas tentativas conforme a configuração do serviço.
+    Cada tentativa entra nas métricas (latência, status, bytes) e cada falha final nos erros.
+
+    Returns:
+        requests.Response: Resposta com status 2xx.
+
+    Raises:
+        ErroConsulta: Em timeout, falha de conexão ou status HTTP de erro (após as tentativas).
+    """
+    try:
+        return _requisitar_com_tentativas(servico, url, params)
+    except ErroConsulta as e:
+        obter_metricas().registrar_erro(servico, e.tipo)
+        raise
+
+
+def _requisitar_com_tentativas(servico, url, params):
+    config = SERVICOS.get(servico, SERVICO_PADRAO)
+    nome = config['nome']
+    sessao = _transporte or obter_sessao()
+    balde = obter_balde(servico)
+    metricas = obter_metricas()
+    endpoint = endpoint_da_url(url)
+    for tentativa in range(config['tentativas']):
+        ultima = tentativa == config['tentativas'] - 1
+        if not balde.adquirir():
+            raise ErroConsulta(servico, 'limite', f"Limite de requisições a {nome} atingido. Tente novamente em instantes.")
+        inicio = time.perf_counter()
+        try:
+            response = sessao.get(url, params=params, timeout=config['timeout'])
+        except requests.exceptions.Timeout:
+            metricas.registrar_requisicao(servico, endpoint, time.perf_counter() - inicio, 'timeout')
+            if ultima:
+                raise ErroConsulta(servico, 'timeout', f"Tempo limite excedido ao consultar {nome}. Tente novamente.")
+        except requests.exceptions.ConnectionError:
+            metricas.registrar_requisicao(servico, endpoint, time.perf_counter() - inicio, 'conexao')
+            if ultima:
+                raise ErroConsulta(servico, 'conexao', f"Não foi possível conectar a {nome}. Verifique sua conexão com a internet ou tente novamente mais tarde.")
+        except requests.exceptions.RequestException as e:
+            metricas.registrar_requisicao(servico, endpoint, time.perf_counter() - inicio, 'conexao')
+            raise ErroConsulta(servico, 'conexao', f"Ocorreu um erro na requisição a {nome}: {e}")
+        else:
+            metricas.registrar_requisicao(servico, endpoint, time.perf_counter() - inicio,
+                                          response.status_code, len(response.content))
+            if response.ok:
+                return response
+            if response.status_code not in STATUS_REPETIVEIS or ultima:
+                raise ErroConsulta(servico, 'http', f"Erro HTTP {response.status_code} ao consultar {nome}.",
+                                   status=response.status_code)
+        time.sleep(_espera_backoff(tentativa))
+
+
+def obter_json(servico, url, params=None):
+    """
+    GET que retorna o corpo da resposta já decodificado de JSON.
+    """
+    response = requisitar(servico, url, params)
+    try:
+        return response.json()
+    except ValueError:
+        nome = SERVICOS.get(servico, SERVICO_PADRAO)['nome']
+        raise ErroConsulta(servico, 'resposta_invalida', f"Resposta inválida recebida de {nome}.",
+                           status=response.status_code)
+
+
+def obter_texto(servico, url, params=None):
+    """
+    GET que retorna o corpo da resposta como texto.
+    """
+    return requisitar(servico, url, params).text
+
+
+def obter_json_cacheado(servico, url, params=None):
+    """
+    Como obter_json, mas passando pelo cache persistente (cache_respostas.py),
+    com o TTL do serviço e stale-while-revalidate. Erros não são gravados no cache.
+    """
+    from cache_respostas import chave_requisicao, obter_cache
+    return obter_cache().buscar(servico, chave_requisicao(url, params),
+                                lambda: obter_json(servico, url, params))
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Consultas de clima ao OpenWeatherMap, inclusive de várias cidades ao mesmo tempo.
+
+O painel de cidades dispara as consultas em paralelo num pool limitado de
+threads (respeitando o limite de requisições do plano gratuito), de modo que o
+tempo total fica próximo ao da cidade mais lenta e não à soma de todas. Pedidos
+repetidos da mesma cidade, na mesma lista ou vindos de outras sessões enquanto a
+consulta ainda está em andamento, compartilham a mesma requisição.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from cliente_http import ErroConsulta, obter_json_cacheado
+
+URL_CLIMA = "http://api.openweathermap.org/data/2.5/weather"
+# Consultas simultâneas ao OpenWeatherMap (o plano gratuito aceita 60 por minuto)
+MAXIMO_CONSULTAS_SIMULTANEAS = 5
+
+_executor = ThreadPoolExecutor(max_workers=MAXIMO_CONSULTAS_SIMULTANEAS, thread_name_prefix="clima")
+_em_andamento = {}
+_em_andamento_lock = threading.Lock()
+
+
+def _chave_cidade(cidade):
+    return " ".join(cidade.split()).casefold()
+
+
+def mensagem_erro_clima(erro, cidade):
+    """
+    Mensagem para o usuário a partir de um ErroConsulta do OpenWeatherMap.
+    """
+    if erro.status == 401:
+        return "Erro na API: Chave de API OpenWeatherMap inválida ou ausente."
+    if erro.status == 404:
+        return f"Erro: Cidade '{cidade}' não encontrada."
+    return erro.mensagem
+
+
+def buscar_clima(cidade, api_key):
+    """
+    Clima atual de uma cidade (resposta JSON do OpenWeatherMap), via cache persistente de 1 hora.
+
+    Raises:
+        ErroConsulta: Falha na consulta (cidade não encontrada, chave inválida, timeout...).
+    """
+    params = {
+        "q": cidade,
+        "appid": api_key,
+        "units": "metric", # Celsius
+        "lang": "pt_br"   # Português
+    }
+    return obter_json_cacheado('openweather', URL_CLIMA, params)
+
+
+def _consultar_compartilhado(cidade, api_key):
+    """
+    Devolve o futuro da consulta da cidade, reaproveitando uma consulta idêntica em andamento.
+    """
+    chave = (_chave_cidade(cidade), api_key)
+    with _em_andamento_lock:
+        futuro = _em_andamento.get(chave)
+        if futuro is None:
+            futuro = _executor.submit(buscar_clima, cidade, api_key)
+            _em_andamento[chave] = futuro
+            futuro.add_done_callback(lambda _f: _remover_em_andamento(chave))
+        return futuro
+
+
+def _remover_em_andamento(chave):
+    with _em_andamento_lock:
+        _em_andamento.pop(chave, None)
+
+
+def buscar_clima_cidades(cidades, api_key):
+    """
+    Consulta várias cidades em paralelo.
+
+    Returns:
+        list: (cidade, dados ou None, mensagem de erro ou None), na ordem informada e sem repetições.
+    """
+    unicas = {}
+    for cidade in cidades:
+        cidade = cidade.strip()
+        if cidade and _chave_cidade(cidade) not in unicas:
+            unicas[_chave_cidade(cidade)] = cidade
+
+    futuros = [(cidade, _consultar_compartilhado(cidade, api_key)) for cidade in unicas.values()]
+    resultados = []
+    for cidade, futuro in futuros:
+        try:
+            resultados.append((cidade, futuro.result(), None))
+        except ErroConsulta as e:
+            resultados.append((cidade, None, mensagem_erro_clima(e, cidade)))
+    return resultados
+
+
+def tabela_comparativa_clima(resultados):
+    """
+    Uma linha por cidade encontrada, para comparação lado a lado.
+    """
+    linhas = []
+    for _cidade, dados, _erro in resultados:
+        if dados is None:
+            continue
+        linhas.append({
+            "Cidade": dados['name'],
+            "País": dados['sys'].get('country'),
+            "Temperatura (°C)": dados['main']['temp'],
+            "Sensação Térmica (°C)": dados['main']['feels_like'],
+            "Mínima (°C)": dados['main'].get('temp_min'),
+            "Máxima (°C)": dados['main'].get('temp_max'),
+            "Umidade (%)": dados['main']['humidity'],
+            "Vento (m/s)": dados['wind']['speed'],
+            "Condição": dados['weather'][0]['description'].capitalize(),
+        })
+    return pd.DataFrame(linhas)
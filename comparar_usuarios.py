@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Latência dos backends de usuários (usuarios.py).
+
+Mede a latência de cadastro e de busca do hash em cada backend, com usuários
+simultâneos. A conformidade dos dois com o mesmo contrato (preparar/cadastrar/
+hash_senha/atualizar_hash) é verificada em tests/test_usuarios.py (pytest).
+
+O MongoDB é o mongomock (pip install mongomock) com latência de rede simulada
+por ida ao banco (`--latencia-mongo`), ou um servidor real com --uri. O SQLite
+usa um arquivo temporário em modo WAL, como em produção.
+
+Uso:
+    python comparar_usuarios.py --usuarios 500 --concorrencia 8 --latencia-mongo 40
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmark_usuarios import ColecaoMedida, obter_colecao
+from metricas import percentil
+from usuarios import UsuariosMongo, UsuariosSQLite
+
+
+def medir_latencia(store, usuarios, concorrencia):
+    latencias = defaultdict(list)
+    lock = threading.Lock()
+
+    def executar(operacao, funcao, *args):
+        inicio = time.perf_counter()
+        funcao(*args)
+        with lock:
+            latencias[operacao].append((time.perf_counter() - inicio) * 1000)
+
+    nomes = [f"usuario{i}" for i in range(usuarios)]
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        list(executor.map(lambda nome: executar('cadastro', store.cadastrar, nome, b"x" * 60), nomes))
+        list(executor.map(lambda nome: executar('login', store.hash_senha, nome), nomes))
+    return latencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência dos backends de usuários.")
+    parser.add_argument("--uri", help="MongoDB real (padrão: mongomock com latência simulada).")
+    parser.add_argument("--latencia-mongo", type=float, default=40.0,
+                        help="Latência simulada por ida ao MongoDB (ms), ignorada com --uri.")
+    parser.add_argument("--usuarios", type=int, default=300)
+    parser.add_argument("--concorrencia", type=int, default=8)
+    args = parser.parse_args()
+
+    temporario = tempfile.mkdtemp(prefix="comparar_usuarios_")
+    latencia_mongo = 0 if args.uri else args.latencia_mongo / 1000
+    backends = {
+        'mongo': lambda nome: UsuariosMongo(ColecaoMedida(obter_colecao(args.uri, nome), latencia_mongo)),
+        'sqlite': lambda nome: UsuariosSQLite(os.path.join(temporario, f"{nome}.sqlite")),
+    }
+
+    print(f"Latência ({args.usuarios} usuários, concorrência {args.concorrencia}, "
+          f"MongoDB: {args.uri or f'mongomock + {args.latencia_mongo:.0f} ms por ida'}):")
+    print(f"{'Backend':<9}{'Operação':<10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for nome, criar in backends.items():
+        store = criar("latencia")
+        store.preparar()
+        latencias = medir_latencia(store, args.usuarios, args.concorrencia)
+        for operacao in ('cadastro', 'login'):
+            valores = sorted(latencias[operacao])
+            print(f"{nome:<9}{operacao:<10}{percentil(valores, 50):>9.2f}{percentil(valores, 95):>9.2f}"
+                  f"{percentil(valores, 99):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+"""
+Configuração compartilhada pelos módulos do projeto que não depende do env.py.
+
+- DIRETORIO_DADOS: pasta local onde ficam os dados gravados pelo app (históricos,
+  caches, tabelas SQLite, análises salvas etc.).
+"""
+
+import os
+
+DIRETORIO_DADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dados")
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Reserva de fatos, citações e piadas aleatórias buscados antecipadamente.
+
+Cada tipo de conteúdo tem uma reserva limitada de itens já buscados. Um clique
+consome um item da memória na hora e uma thread de fundo repõe a reserva. Se a
+API estiver fora do ar (ou a reserva vazia e a busca falhar), o item vem de um
+pequeno acervo offline embutido aqui, e novas tentativas de reposição só são
+feitas depois de um intervalo.
+"""
+
+import time
+import random
+import threading
+from collections import deque
+
+from cliente_http import ErroConsulta, obter_json, obter_texto
+
+TIPOS_CONTEUDO = ("Fato Aleatório", "Citação Aleatória", "Piada Aleatória")
+# Itens mantidos prontos por tipo
+TAMANHO_RESERVA = 5
+# Espera (s) antes de tentar repor a reserva de novo depois de uma falha na API
+ESPERA_APOS_FALHA = 30
+# Limite de buscas por reposição, em múltiplos do tamanho da reserva
+TENTATIVAS_POR_ITEM = 2
+# Itens repetidos seguidos que encerram a reposição (API com poucos itens ou sempre o mesmo)
+MAXIMO_REPETIDOS_SEGUIDOS = 3
+
+# Acervo usado quando a API não responde
+ACERVO_OFFLINE = {
+    "Fato Aleatório": [
+        "1 is the only number that is neither prime nor composite.",
+        "7 is the number of continents on Earth.",
+        "12 is the number of months in a year.",
+        "206 is the number of bones in the adult human body.",
+        "365 is the number of days in a common year.",
+        "1969 is the year humans first landed on the Moon.",
+    ],
+    "Citação Aleatória": [
+        "“A persistência é o caminho do êxito.” — Charles Chaplin",
+        "“O sucesso é ir de fracasso em fracasso sem perder o entusiasmo.” — Winston Churchill",
+        "“A simplicidade é o último grau de sofisticação.” — Leonardo da Vinci",
+        "“Conhecimento fala, mas sabedoria escuta.” — Jimi Hendrix",
+        "“Faça o que puder, com o que tiver, onde estiver.” — Theodore Roosevelt",
+    ],
+    "Piada Aleatória": [
+        "Por que o livro de matemática estava triste?\n\nPorque tinha muitos problemas.",
+        "O que o zero disse para o oito?\n\nBelo cinto!",
+        "Por que o computador foi ao médico?\n\nPorque estava com vírus.",
+        "Qual é o café mais perigoso do mundo?\n\nO ex-presso.",
+        "Por que a planilha foi à terapia?\n\nTinha células demais para lidar.",
+    ],
+}
+
+
+def buscar_fato():
+    return obter_texto('numbersapi', "http://numbersapi.com/random/trivia") # Texto puro (em inglês)
+
+
+def buscar_citacao():
+    data = obter_json('quotable', "https://api.quotable.io/random")
+    return f"“{data['content']}” — {data['author']}"
+
+
+def buscar_piada():
+    params = {"lang": "pt", "blacklistFlags": "nsfw,religious,political,racist,sexist,explicit"}
+    data = obter_json('jokeapi', "https://v2.jokeapi.dev/joke/Any", params)
+    if data.get("type") == "single":
+        return data["joke"]
+    if data.get("type") == "twopart":
+        return f"{data['setup']}\n\n{data['delivery']}"
+    raise ErroConsulta('jokeapi', 'resposta_invalida', "Não foi possível obter uma piada.")
+
+
+BUSCAS = {
+    "Fato Aleatório": buscar_fato,
+    "Citação Aleatória": buscar_citacao,
+    "Piada Aleatória": buscar_piada,
+}
+
+
+class ReservaConteudo:
+    """
+    Fila limitada de itens prontos de um tipo de conteúdo, reposta em segundo plano.
+    """
+
+    def __init__(self, tipo, buscar, tamanho=TAMANHO_RESERVA):
+        self.tipo = tipo
+        self.buscar = buscar
+        self.tamanho = tamanho
+        self._itens = deque(maxlen=tamanho)
+        self._lock = threading.Lock()
+        self._repondo = False
+        self._ultima_falha = 0.0
+
+    def __len__(self):
+        return len(self._itens)
+
+    def obter(self):
+        """
+        Returns:
+            tuple: (texto, origem), com origem 'reserva', 'api' ou 'offline'.
+        """
+        with self._lock:
+            item = self._itens.popleft() if self._itens else None
+        if item is not None:
+            origem = 'reserva'
+        else:
+            item, origem = self._buscar_ou_offline()
+        self.repor()
+        return item, origem
+
+    def _registrar_falha(self):
+        with self._lock:
+            self._ultima_falha = time.time()
+
+    def _buscar_ou_offline(self):
+        with self._lock:
+            pode_buscar = time.time() - self._ultima_falha >= ESPERA_APOS_FALHA
+        if pode_buscar:
+            try:
+                return self.buscar(), 'api'
+            except (ErroConsulta, KeyError, ValueError):
+                self._registrar_falha()
+        return random.choice(ACERVO_OFFLINE[self.tipo]), 'offline'
+
+    def repor(self):
+        """
+        Inicia a reposição em segundo plano (se ainda não estiver em andamento).
+        """
+        with self._lock:
+            if self._repondo or len(self._itens) >= self.tamanho:
+                return
+            if time.time() - self._ultima_falha < ESPERA_APOS_FALHA:
+                return
+            self._repondo = True
+        threading.Thread(target=self._repor, name=f"reserva-{self.tipo}", daemon=True).start()
+
+    def _repor(self):
+        # Número de buscas limitado: uma API que só devolve itens repetidos não prende a thread
+        repetidos_seguidos = 0
+        try:
+            for _ in range(TENTATIVAS_POR_ITEM * self.tamanho):
+                try:
+                    item = self.buscar()
+                except (ErroConsulta, KeyError, ValueError):
+                    self._registrar_falha()
+                    return
+                with self._lock:
+                    if item in self._itens:
+                        repetidos_seguidos += 1
+                    else:
+                        repetidos_seguidos = 0
+                        self._itens.append(item)
+                    if len(self._itens) >= self.tamanho or repetidos_seguidos >= MAXIMO_REPETIDOS_SEGUIDOS:
+                        return
+        finally:
+            with self._lock:
+                self._repondo = False
+
+
+_reservas = {}
+_reservas_lock = threading.Lock()
+
+
+def obter_reserva(tipo):
+    """
+    Retorna a reserva do processo para o tipo de conteúdo (criada e abastecida na primeira chamada).
+    """
+    with _reservas_lock:
+        reserva = _reservas.get(tipo)
+        if reserva is None:
+            reserva = _reservas[tipo] = ReservaConteudo(tipo, BUSCAS[tipo])
+            reserva.repor()
+        return reserva
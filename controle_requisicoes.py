@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Controle das requisições às APIs externas dentro do processo.
+
+- `SingleFlight`: chamadas idênticas simultâneas (mesma chave) compartilham uma
+  única execução. Com vários usuários pedindo "São Paulo" ou USD→BRL ao mesmo
+  tempo, só o primeiro vai ao upstream quando o cache está vazio; os demais
+  esperam e recebem o mesmo resultado (ou a mesma exceção).
+- `BaldeTokens`: limitador de taxa por serviço (token bucket). Cada requisição
+  consome um token; os tokens são repostos à taxa do plano contratado e o
+  balde permite uma rajada limitada. Sem token disponível a chamada espera, até
+  um limite, em vez de estourar a cota da API.
+"""
+
+import time
+import threading
+
+# Limites por serviço: taxa (requisições/s) e capacidade (rajada máxima).
+# Ajuste conforme o plano de cada API. Nas cotas diárias/mensais a taxa é a cota
+# dividida pelo período: a rajada cobre o uso normal, e um pico acima dela
+# falha na hora (a espera pelo próximo token passa de ESPERA_MAXIMA_TOKEN)
+# em vez de consumir a cota do período inteiro.
+SEGUNDOS_POR_DIA = 86400
+SEGUNDOS_POR_MES = 30 * SEGUNDOS_POR_DIA
+LIMITES_POR_SERVICO = {
+    'openweather': {'taxa': 1.0, 'capacidade': 60},   # Plano gratuito: 60 por minuto
+    'exchangerate': {'taxa': 1500 / SEGUNDOS_POR_MES, 'capacidade': 10},  # Plano gratuito: 1.500 por mês
+    'omdb': {'taxa': 1000 / SEGUNDOS_POR_DIA, 'capacidade': 20},          # Plano gratuito: 1.000 por dia
+    'yfinance': {'taxa': 2.0, 'capacidade': 5},
+    'numbersapi': {'taxa': 2.0, 'capacidade': 5},
+    'quotable': {'taxa': 2.0, 'capacidade': 5},
+    'jokeapi': {'taxa': 1.0, 'capacidade': 5},        # 120 por minuto
+    'posteres': {'taxa': 5.0, 'capacidade': 20},
+}
+LIMITE_PADRAO = {'taxa': 2.0, 'capacidade': 5}
+# Espera máxima (s) por um token antes de desistir da requisição
+ESPERA_MAXIMA_TOKEN = 10.0
+
+
+class _Chamada:
+    def __init__(self):
+        self.concluida = threading.Event()
+        self.resultado = None
+        self.erro = None
+
+
+class SingleFlight:
+    """
+    Agrupa chamadas simultâneas com a mesma chave numa única execução.
+    """
+
+    def __init__(self):
+        self._chamadas = {}
+        self._lock = threading.Lock()
+
+    def executar(self, chave, funcao):
+        """
+        Executa `funcao()`, ou espera a execução já em andamento para a mesma chave.
+
+        Returns:
+            O resultado de `funcao` (a exceção dela é relançada para todos que esperavam).
+        """
+        with self._lock:
+            chamada = self._chamadas.get(chave)
+            lider = chamada is None
+            if lider:
+                chamada = self._chamadas[chave] = _Chamada()
+
+        if not lider:
+            chamada.concluida.wait()
+        else:
+            try:
+                chamada.resultado = funcao()
+            except Exception as e:
+                chamada.erro = e
+            finally:
+                with self._lock:
+                    del self._chamadas[chave]
+                chamada.concluida.set()
+
+        if chamada.erro is not None:
+            raise chamada.erro
+        return chamada.resultado
+
+
+class BaldeTokens:
+    """
+    Token bucket: `taxa` tokens por segundo, até `capacidade` acumulados.
+    """
+
+    def __init__(self, taxa, capacidade):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self._tokens = float(capacidade)
+        self._atualizado_em = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _repor(self, agora):
+        self._tokens = min(self.capacidade, self._tokens + (agora - self._atualizado_em) * self.taxa)
+        self._atualizado_em = agora
+
+    def adquirir(self, espera_maxima=ESPERA_MAXIMA_TOKEN):
+        """
+        Consome um token, esperando a reposição se preciso.
+
+        Returns:
+            bool: False se o token não ficaria disponível dentro de `espera_maxima` segundos.
+        """
+        limite = time.monotonic() + espera_maxima
+        while True:
+            with self._lock:
+                agora = time.monotonic()
+                self._repor(agora)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                espera = (1 - self._tokens) / self.taxa
+            if agora + espera > limite:
+                return False
+            time.sleep(espera)
+
+
+_baldes = {}
+_baldes_lock = threading.Lock()
+
+
+def obter_balde(servico):
+    """
+    Retorna o limitador de taxa do serviço, compartilhado por todo o processo.
+    """
+    with _baldes_lock:
+        balde = _baldes.get(servico)
+        if balde is None:
+            limite = LIMITES_POR_SERVICO.get(servico, LIMITE_PADRAO)
+            balde = _baldes[servico] = BaldeTokens(limite['taxa'], limite['capacidade'])
+        return balde
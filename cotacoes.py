@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Cotações de vários símbolos (ações/criptomoedas) em uma única consulta.
+
+Antes cada símbolo custava duas requisições ao Yahoo Finance: `ticker.info`
+(pesada, só para ler alguns campos de preço) e `ticker.history`. Aqui uma lista
+de símbolos é baixada num único `yf.download` (que paraleliza internamente com
+um número limitado de threads) e os campos da cotação (preço, fechamento
+anterior, máxima/mínima do dia, volume) são derivados das próprias barras
+diárias, guardadas no histórico local (historico_precos.py): só os dias que
+faltam desde a última atualização entram no download.
+"""
+
+import re
+import time
+
+import pandas as pd
+
+from controle_requisicoes import obter_balde
+from metricas import obter_metricas
+
+PERIODO_HISTORICO_COTACAO = "7d"
+MAXIMO_THREADS_DOWNLOAD = 8
+COLUNAS_OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+# Moeda das cotações pelo sufixo de bolsa do Yahoo Finance (sem sufixo: bolsas dos EUA).
+# Bolsas cotadas em centavos (ex.: .L, em pence) ficam de fora: a moeda fica desconhecida.
+MOEDA_POR_SUFIXO = {
+    '.SA': 'BRL', '.TO': 'CAD', '.V': 'CAD', '.DE': 'EUR', '.F': 'EUR', '.PA': 'EUR', '.AS': 'EUR',
+    '.MI': 'EUR', '.MC': 'EUR', '.LS': 'EUR', '.SW': 'CHF', '.T': 'JPY', '.HK': 'HKD', '.AX': 'AUD',
+}
+
+
+def normalizar_simbolos(simbolos):
+    """
+    Aceita uma lista ou um texto separado por vírgulas/espaços e retorna os símbolos
+    em maiúsculas, sem repetição, na ordem informada.
+    """
+    if isinstance(simbolos, str):
+        simbolos = re.split(r"[,;\s]+", simbolos)
+    vistos = []
+    for simbolo in simbolos:
+        simbolo = str(simbolo).strip().upper()
+        if simbolo and simbolo not in vistos:
+            vistos.append(simbolo)
+    return vistos
+
+
+def moeda_cotacao(simbolo):
+    """
+    Moeda em que o Yahoo Finance cota o símbolo, pelo formato dele: PETR4.SA -> BRL,
+    BTC-USD -> USD, USDBRL=X -> BRL, AAPL -> USD.
+
+    Returns:
+        str ou None: Código da moeda, ou None se não for possível deduzir (ex.: índices ^BVSP).
+    """
+    simbolo = simbolo.upper()
+    if simbolo.startswith('^'):
+        return None
+    if simbolo.endswith('=X'): # Câmbio: a cotação é na segunda moeda do par
+        return simbolo[:-2][-3:] if len(simbolo) >= 5 else None
+    if re.fullmatch(r"[A-Z0-9]+-[A-Z]{3}", simbolo): # Criptomoedas: BTC-USD, ETH-BRL
+        return simbolo.rsplit('-', 1)[1]
+    if '.' in simbolo:
+        return MOEDA_POR_SUFIXO.get('.' + simbolo.rsplit('.', 1)[1])
+    return 'USD'
+
+
+def _separar_por_simbolo(dados, simbolos):
+    """
+    Divide o DataFrame do yf.download (colunas (símbolo, campo) ou só campo) por símbolo.
+    """
+    historicos = {}
+    if dados is None or dados.empty:
+        return historicos
+    if isinstance(dados.columns, pd.MultiIndex):
+        # Com group_by='ticker' o símbolo fica no primeiro nível; em versões antigas pode vir no segundo
+        nivel = 0 if set(simbolos) & set(dados.columns.get_level_values(0)) else 1
+        for simbolo in simbolos:
+            if simbolo in dados.columns.get_level_values(nivel):
+                historicos[simbolo] = dados.xs(simbolo, axis=1, level=nivel)
+    elif len(simbolos) == 1:
+        historicos[simbolos[0]] = dados
+
+    for simbolo, hist in list(historicos.items()):
+        hist = hist[[c for c in COLUNAS_OHLCV if c in hist.columns]].dropna(subset=['Close'])
+        if hist.empty:
+            del historicos[simbolo]
+        else:
+            historicos[simbolo] = hist
+    return historicos
+
+
+def baixar_historicos(simbolos, periodo=PERIODO_HISTORICO_COTACAO, inicio=None):
+    """
+    Baixa as barras diárias de todos os símbolos numa única chamada ao Yahoo Finance.
+
+    Returns:
+        dict: simbolo -> DataFrame (Open, High, Low, Close, Volume) indexado por data.
+              Símbolos sem dados ficam de fora.
+    """
+    import yfinance as yf
+
+    if not simbolos:
+        return {}
+    # O yfinance não passa pelo cliente_http: o limite de taxa do serviço é aplicado aqui
+    if not obter_balde('yfinance').adquirir():
+        raise RuntimeError("Limite de requisições ao Yahoo Finance atingido. Tente novamente em instantes.")
+    parametros = {'start': inicio} if inicio is not None else {'period': periodo}
+    inicio_download = time.perf_counter()
+    try:
+        dados = yf.download(
+            list(simbolos), interval="1d", group_by='ticker', auto_adjust=False,
+            threads=min(MAXIMO_THREADS_DOWNLOAD, len(simbolos)), progress=False, **parametros
+        )
+    except Exception:
+        obter_metricas().registrar_erro('yfinance', 'download')
+        raise
+    # Sem bytes: o yfinance não expõe o tamanho das respostas (o tamanho do DataFrame em memória não é o recebido)
+    obter_metricas().registrar_requisicao('yfinance', 'download', time.perf_counter() - inicio_download, 200)
+    return _separar_por_simbolo(dados, list(simbolos))
+
+
+def resumir_cotacao(simbolo, hist):
+    """
+    Campos da cotação a partir das barras diárias (a última barra é o pregão atual ou o mais recente).
+    """
+    ultima = hist.iloc[-1]
+    preco = float(ultima['Close'])
+    anterior = float(hist['Close'].iloc[-2]) if len(hist) > 1 else None
+    variacao = preco - anterior if anterior else None
+    return {
+        'simbolo': simbolo,
+        'moeda': moeda_cotacao(simbolo),
+        'preco': preco,
+        'fechamento_anterior': anterior,
+        'variacao': variacao,
+        'variacao_percentual': variacao / anterior * 100 if anterior else None,
+        'maxima_dia': float(ultima['High']) if 'High' in ultima else None,
+        'minima_dia': float(ultima['Low']) if 'Low' in ultima else None,
+        'volume': int(ultima['Volume']) if 'Volume' in ultima and pd.notna(ultima['Volume']) else None,
+        'data': pd.Timestamp(hist.index[-1]).date().isoformat(),
+    }
+
+
+def buscar_cotacoes(simbolos, historico=None, periodo='7D'):
+    """
+    Cotação e histórico de uma lista de símbolos.
+
+    Args:
+        simbolos (list | str): Símbolos (ver normalizar_simbolos).
+        historico (HistoricoPrecos): Histórico local; por padrão o do processo.
+        periodo (str): Período do histórico retornado ('7D', '1M', '1Y', '5Y').
+
+    Returns:
+        tuple: (DataFrame de cotações com uma linha por símbolo encontrado,
+                dict simbolo -> DataFrame do histórico no período,
+                list de símbolos não encontrados)
+    """
+    from historico_precos import obter_historico_precos
+
+    simbolos = normalizar_simbolos(simbolos)
+    historico = historico or obter_historico_precos()
+    nao_encontrados = historico.atualizar(simbolos)
+
+    cotacoes, historicos = [], {}
+    for simbolo in simbolos:
+        if simbolo in nao_encontrados:
+            continue
+        cotacoes.append(resumir_cotacao(simbolo, historico.intervalo(simbolo, '7D')))
+        historicos[simbolo] = historico.intervalo(simbolo, periodo)
+    return pd.DataFrame(cotacoes), historicos, nao_encontrados
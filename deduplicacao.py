@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Detecção de transações duplicadas entre uploads.
+
+Extratos exportados em períodos que se sobrepõem (ex.: dois downloads que incluem
+os dias 15 a 20 do mesmo mês) fariam as mesmas transações serem somadas duas vezes.
+Cada linha normalizada recebe uma impressão digital de 64 bits calculada a partir de
+(data, valor, conta, descrição normalizada, índice de ocorrência). O índice de
+ocorrência diferencia transações legítimas idênticas dentro do mesmo extrato
+(ex.: dois cafés de mesmo valor no mesmo dia), de forma que apenas a sobreposição
+entre extratos diferentes é descartada.
+
+As impressões já vistas ficam num histórico persistente (um conjunto em memória
+salvo em disco), então a verificação de um upload com n linhas custa O(n),
+independente do tamanho do histórico.
+"""
+
+import os
+import hashlib
+import threading
+
+import numpy as np
+import pandas as pd
+
+from configuracao import DIRETORIO_DADOS # Os históricos de impressões são gravados na pasta de dados
+
+
+def normalizar_descricao(serie):
+    """
+    Normaliza descrições para comparação: minúsculas, sem acentos e sem pontuação.
+    """
+    return serie.fillna('').astype(str).str.lower() \
+                .str.normalize('NFKD').str.encode('ascii', errors='ignore').str.decode('utf-8') \
+                .str.replace(r'[^a-z0-9]+', ' ', regex=True) \
+                .str.strip()
+
+
+def calcular_impressoes(df, coluna_origem=None):
+    """
+    Calcula a impressão digital (uint64) de cada transação normalizada.
+
+    Args:
+        df (pd.DataFrame): Transações já normalizadas (colunas 'data' e 'valor'; 'conta_bancaria'
+                           e 'descricao' são opcionais).
+        coluna_origem (str): Coluna que identifica o arquivo de origem. O índice de ocorrência
+                             é contado separadamente dentro de cada origem.
+
+    Returns:
+        pd.Series: Impressões digitais, com o mesmo índice de `df`.
+    """
+    chaves = pd.DataFrame(index=df.index)
+    chaves['data'] = df['data'].dt.normalize().astype('int64')
+    # Centavos inteiros evitam diferenças de arredondamento em ponto flutuante
+    chaves['valor'] = (df['valor'] * 100).round().astype('int64')
+    if 'conta_bancaria' in df.columns:
+        chaves['conta'] = df['conta_bancaria'].fillna('').astype(str).str.strip().str.lower()
+    else:
+        chaves['conta'] = ''
+    if 'descricao' in df.columns:
+        chaves['descricao'] = normalizar_descricao(df['descricao'])
+    else:
+        chaves['descricao'] = ''
+
+    agrupamento = ['data', 'valor', 'conta', 'descricao']
+    if coluna_origem and coluna_origem in df.columns:
+        chaves['ocorrencia'] = chaves.groupby(agrupamento + [df[coluna_origem]], sort=False).cumcount()
+    else:
+        chaves['ocorrencia'] = chaves.groupby(agrupamento, sort=False).cumcount()
+
+    return pd.util.hash_pandas_object(chaves, index=False)
+
+
+def hash_arquivo(conteudo):
+    """
+    Retorna o hash SHA-256 (hex) do conteúdo bruto de um arquivo enviado.
+    """
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+def caminho_historico(usuario=None):
+    """
+    Retorna o caminho do arquivo de histórico de impressões de um usuário.
+    O nome do usuário é transformado em hash para não aparecer no nome do arquivo.
+
+    Sem usuário retorna None: visitantes não logados não compartilham um histórico
+    gravado em disco (os uploads de um removeria linhas do relatório de outro).
+    """
+    if not usuario:
+        return None
+    chave = hashlib.sha256(usuario.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(DIRETORIO_DADOS, f"historico_impressoes_{chave}.npz")
+
+
+class HistoricoImpressoes:
+    """
+    Conjunto persistente de impressões digitais já importadas.
+
+    Cada impressão guarda o arquivo (hash do conteúdo) que a importou primeiro. Assim,
+    reenviar o mesmo arquivo não descarta as próprias linhas, enquanto um extrato
+    diferente que repete o período tem a sobreposição removida.
+
+    Com `caminho` None o histórico fica só em memória (ex.: um por sessão de visitante).
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._origem_por_impressao = {}
+        self._arquivos = []
+        self._id_por_arquivo = {}
+        self._carregar()
+
+    def __len__(self):
+        return len(self._origem_por_impressao)
+
+    def _carregar(self):
+        if self.caminho is None or not os.path.exists(self.caminho):
+            return
+        with np.load(self.caminho, allow_pickle=False) as dados:
+            impressoes = dados['impressoes'].tolist()
+            origens = dados['origens'].tolist()
+            self._arquivos = dados['arquivos'].tolist()
+        self._id_por_arquivo = {arquivo: i for i, arquivo in enumerate(self._arquivos)}
+        self._origem_por_impressao = dict(zip(impressoes, origens))
+
+    def salvar(self):
+        """
+        Grava o histórico em disco (escrita atômica via arquivo temporário).
+        Sem caminho (histórico em memória) não faz nada.
+        """
+        if self.caminho is None:
+            return
+        with self._lock:
+            os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+            impressoes = np.fromiter(self._origem_por_impressao.keys(), dtype=np.uint64,
+                                     count=len(self._origem_por_impressao))
+            origens = np.fromiter(self._origem_por_impressao.values(), dtype=np.int32,
+                                  count=len(self._origem_por_impressao))
+            temporario = self.caminho + ".tmp"
+            with open(temporario, 'wb') as f:
+                np.savez(f, impressoes=impressoes, origens=origens,
+                         arquivos=np.array(self._arquivos, dtype=str))
+            os.replace(temporario, self.caminho)
+
+    def registrar(self, impressoes, origens):
+        """
+        Confere as impressões contra o histórico e registra as novas.
+
+        Args:
+            impressoes (pd.Series): Impressões digitais das transações.
+            origens (pd.Series): Hash do arquivo de origem de cada transação.
+
+        Returns:
+            np.ndarray: Máscara booleana; True para as linhas que devem ser mantidas.
+        """
+        with self._lock:
+            ids_origem = []
+            for origem in origens.tolist():
+                id_origem = self._id_por_arquivo.get(origem)
+                if id_origem is None:
+                    id_origem = len(self._arquivos)
+                    self._arquivos.append(origem)
+                    self._id_por_arquivo[origem] = id_origem
+                ids_origem.append(id_origem)
+
+            manter = np.ones(len(ids_origem), dtype=bool)
+            conhecidas = self._origem_por_impressao
+            for i, (impressao, id_origem) in enumerate(zip(impressoes.tolist(), ids_origem)):
+                dono = conhecidas.setdefault(impressao, id_origem)
+                if dono != id_origem:
+                    manter[i] = False
+            return manter
+
+
+def remover_duplicadas(df, historico=None, coluna_origem='origem'):
+    """
+    Remove transações repetidas entre arquivos enviados juntos e, opcionalmente,
+    as que já foram importadas anteriormente por outro arquivo.
+
+    Args:
+        df (pd.DataFrame): Transações normalizadas, com a coluna de origem.
+        historico (HistoricoImpressoes): Histórico persistente (opcional).
+        coluna_origem (str): Coluna com o hash do arquivo de origem.
+
+    Returns:
+        tuple: (DataFrame sem duplicatas, número de linhas removidas)
+    """
+    if df.empty:
+        return df, 0
+
+    impressoes = calcular_impressoes(df, coluna_origem)
+    # Dentro do mesmo arquivo as impressões são únicas (índice de ocorrência),
+    # então repetições aqui só vêm de arquivos diferentes enviados juntos
+    manter = ~impressoes.duplicated(keep='first').to_numpy()
+
+    if historico is not None:
+        if coluna_origem in df.columns:
+            origens = df[coluna_origem]
+        else:
+            origens = pd.Series('', index=df.index)
+        manter_historico = historico.registrar(impressoes[manter], origens[manter])
+        manter[np.flatnonzero(manter)[~manter_historico]] = False
+        historico.salvar()
+
+    removidas = int(len(df) - manter.sum())
+    return df[manter], removidas
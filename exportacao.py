@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Exportação dos resultados da análise para CSV, XLSX e Parquet.
+
+Os arquivos são gravados em disco por blocos de linhas, sem montar o arquivo
+inteiro em memória antes (e sem depender de `to_markdown`/`tabulate`):
+- CSV: escrito em blocos com `to_csv` no mesmo arquivo aberto;
+- XLSX: openpyxl em modo write-only, linha a linha;
+- Parquet: pyarrow ParquetWriter, um row group por bloco, com dicionário nas colunas de texto.
+"""
+
+import os
+import re
+import unicodedata
+
+import pandas as pd
+
+# Linhas por bloco ao gravar os arquivos
+TAMANHO_BLOCO_EXPORTACAO = 100000
+
+FORMATOS_EXPORTACAO = {
+    'CSV': ('.csv', 'text/csv'),
+    'Excel (XLSX)': ('.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'Parquet': ('.parquet', 'application/octet-stream'),
+}
+
+
+def gerar_rollups(df):
+    """
+    Calcula os agrupamentos numéricos (sem formatação "R$") a partir das transações normalizadas.
+
+    Returns:
+        dict: Nome do agrupamento -> DataFrame.
+    """
+    rollups = {}
+    rollups['Transações por Tipo'] = df.groupby('tipo', as_index=False)['valor'].sum()
+    if 'conta_bancaria' in df.columns:
+        rollups['Saldo por Conta Bancária'] = df.groupby('conta_bancaria', as_index=False)['valor'].sum()
+    rollups['Transações por Mês'] = df.groupby(df['data'].dt.to_period('M').astype(str).rename('mes_ano'))['valor'] \
+                                      .sum().reset_index()
+    despesas = df[df['tipo'] == 'Despesa']
+    if 'descricao' in df.columns and not despesas.empty:
+        rollups['Despesas Agrupadas por Descrição'] = despesas.groupby('descricao')['valor'].sum().abs() \
+                                                              .sort_values(ascending=False).reset_index()
+    return rollups
+
+
+def _blocos(df, tamanho_bloco):
+    for inicio in range(0, len(df), tamanho_bloco):
+        yield df.iloc[inicio:inicio + tamanho_bloco]
+
+
+def _preparar_bloco(bloco):
+    # Períodos (ex.: mes_ano) não têm tipo equivalente em Excel/Parquet; exporta como texto
+    for coluna in bloco.columns:
+        if isinstance(bloco[coluna].dtype, pd.PeriodDtype):
+            bloco = bloco.assign(**{coluna: bloco[coluna].astype(str)})
+    return bloco
+
+
+def exportar_csv(df, destino, tamanho_bloco=TAMANHO_BLOCO_EXPORTACAO):
+    """
+    Grava o DataFrame em CSV (separador ';' e vírgula decimal, como nas planilhas de entrada).
+    """
+    with open(destino, 'w', encoding='utf-8', newline='') as f:
+        if df.empty:
+            df.to_csv(f, sep=';', decimal=',', index=False)
+            return destino
+        for i, bloco in enumerate(_blocos(df, tamanho_bloco)):
+            bloco.to_csv(f, sep=';', decimal=',', index=False, header=(i == 0))
+    return destino
+
+
+def _nome_aba(nome, usados):
+    # O Excel limita nomes de abas a 31 caracteres e não aceita alguns símbolos
+    base = re.sub(r'[\[\]:*?/\\]', '', nome)[:31] or 'Planilha'
+    nome_aba = base
+    contador = 1
+    while nome_aba in usados:
+        sufixo = f" ({contador})"
+        nome_aba = base[:31 - len(sufixo)] + sufixo
+        contador += 1
+    usados.add(nome_aba)
+    return nome_aba
+
+
+def exportar_xlsx(tabelas, destino, tamanho_bloco=TAMANHO_BLOCO_EXPORTACAO):
+    """
+    Grava várias tabelas num único XLSX (uma aba por tabela) com openpyxl em modo write-only.
+
+    Args:
+        tabelas (dict): Nome da aba -> DataFrame.
+        destino (str): Caminho do arquivo .xlsx.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    usados = set()
+    for nome, df in tabelas.items():
+        ws = wb.create_sheet(title=_nome_aba(nome, usados))
+        ws.append([str(c) for c in df.columns])
+        for bloco in _blocos(df, tamanho_bloco):
+            bloco = _preparar_bloco(bloco)
+            for linha in bloco.itertuples(index=False, name=None):
+                ws.append([None if pd.isna(v) else v for v in linha])
+    wb.save(destino)
+    return destino
+
+
+def exportar_parquet(df, destino, tamanho_bloco=TAMANHO_BLOCO_EXPORTACAO):
+    """
+    Grava o DataFrame em Parquet, um row group por bloco, com codificação por dicionário.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    escritor = None
+    try:
+        if df.empty:
+            pq.write_table(pa.Table.from_pandas(_preparar_bloco(df), preserve_index=False), destino,
+                           use_dictionary=True)
+            return destino
+        for bloco in _blocos(df, tamanho_bloco):
+            tabela = pa.Table.from_pandas(_preparar_bloco(bloco), preserve_index=False)
+            if escritor is None:
+                schema = tabela.schema
+                escritor = pq.ParquetWriter(destino, schema, use_dictionary=True, compression='snappy')
+            else:
+                tabela = tabela.cast(schema)
+            escritor.write_table(tabela)
+    finally:
+        if escritor is not None:
+            escritor.close()
+    return destino
+
+
+def _nome_arquivo(nome):
+    nome = unicodedata.normalize('NFKD', nome.lower()).encode('ascii', errors='ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '_', nome).strip('_') or 'tabela'
+
+
+def exportar_resultados(transacoes, formato, diretorio):
+    """
+    Exporta as transações normalizadas e todos os agrupamentos no formato escolhido.
+
+    Args:
+        transacoes (pd.DataFrame): Transações normalizadas.
+        formato (str): Uma das chaves de FORMATOS_EXPORTACAO.
+        diretorio (str): Pasta onde os arquivos serão gravados.
+
+    Returns:
+        list: Tuplas (nome do arquivo, caminho, mime type) dos arquivos gerados.
+    """
+    extensao, mime = FORMATOS_EXPORTACAO[formato]
+    tabelas = {'Transações': transacoes}
+    tabelas.update(gerar_rollups(transacoes))
+
+    if formato == 'Excel (XLSX)':
+        caminho = os.path.join(diretorio, 'analise_financeira' + extensao)
+        exportar_xlsx(tabelas, caminho)
+        return [(os.path.basename(caminho), caminho, mime)]
+
+    exportador = exportar_csv if formato == 'CSV' else exportar_parquet
+    arquivos = []
+    for nome, df in tabelas.items():
+        caminho = os.path.join(diretorio, _nome_arquivo(nome) + extensao)
+        exportador(df, caminho)
+        arquivos.append((os.path.basename(caminho), caminho, mime))
+    return arquivos
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Fila de análises em segundo plano para a página do Streamlit.
+
+Cada re-run do Streamlit (qualquer clique num widget) reexecuta o script inteiro;
+se a análise rodasse no próprio script, ela seria abandonada e reiniciada. Aqui a
+análise vira um trabalho numa thread de fundo, registrado no processo e indexado
+pelo hash dos arquivos enviados. A página apenas consulta o progresso (fração,
+etapa e resultados parciais) e, quando o mesmo arquivo é enviado de novo, se liga
+ao trabalho que já está em andamento (ou já terminou) em vez de começar outro.
+
+O que cada thread imprime é separado por um único sys.stdout do processo
+(_SaidaPorThread): os trabalhos e os scripts das sessões usam capturar_saida(),
+que só afeta a thread atual, em vez de trocar sys.stdout para todo o processo.
+"""
+
+import io
+import sys
+import time
+import threading
+import contextlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Trabalhos concluídos mantidos em memória (os mais antigos são descartados)
+MAXIMO_TRABALHOS_CONCLUIDOS = 32
+
+
+class _SaidaPorThread(io.TextIOBase):
+    """
+    Substitui sys.stdout e separa o que cada thread de trabalho imprime.
+    Threads sem buffer registrado escrevem na saída original.
+    """
+
+    def __init__(self, original):
+        self.original = original
+        self.buffers = {}
+
+    def write(self, texto):
+        buffer = self.buffers.get(threading.get_ident())
+        if buffer is not None:
+            return buffer.write(texto)
+        return self.original.write(texto)
+
+    def flush(self):
+        self.original.flush()
+
+
+_saida_lock = threading.Lock()
+
+
+def _saida_por_thread():
+    with _saida_lock:
+        if not isinstance(sys.stdout, _SaidaPorThread):
+            sys.stdout = _SaidaPorThread(sys.stdout)
+        return sys.stdout
+
+
+def saida_original():
+    """
+    Saída padrão do processo (o terminal), sem a separação por thread.
+    """
+    return _saida_por_thread().original
+
+
+@contextlib.contextmanager
+def capturar_saida(buffer):
+    """
+    Direciona para `buffer` o que a thread atual imprimir, sem afetar as demais threads.
+    """
+    saida = _saida_por_thread()
+    ident = threading.get_ident()
+    anterior = saida.buffers.get(ident)
+    saida.buffers[ident] = buffer
+    try:
+        yield buffer
+    finally:
+        if anterior is None:
+            saida.buffers.pop(ident, None)
+        else:
+            saida.buffers[ident] = anterior
+
+
+class TrabalhoAnalise:
+    """
+    Estado de uma análise em segundo plano, lido pela página a cada re-run.
+    """
+
+    def __init__(self, chave):
+        self.chave = chave
+        self.estado = "na_fila" # na_fila, executando, concluido, erro
+        self.progresso = 0.0
+        self.etapa = "Aguardando na fila..."
+        self.parciais = {}
+        self.resultados = None
+        self.erro = None
+        self.log = io.StringIO()
+        self.criado_em = time.time()
+        self.concluido_em = None
+
+    @property
+    def finalizado(self):
+        return self.estado in ("concluido", "erro")
+
+    def atualizar(self, fracao, etapa, parciais=None):
+        self.progresso = fracao
+        self.etapa = etapa
+        if parciais:
+            self.parciais = dict(self.parciais, **parciais)
+
+
+class FilaAnalises:
+    """
+    Registro de trabalhos por chave (hash dos arquivos) com um pool limitado de threads.
+    """
+
+    def __init__(self, workers=2):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analise")
+        self._trabalhos = OrderedDict()
+        self._lock = threading.Lock()
+        _saida_por_thread()
+
+    def obter(self, chave):
+        with self._lock:
+            return self._trabalhos.get(chave)
+
+    def submeter(self, chave, funcao, *args, **kwargs):
+        """
+        Inicia a análise em segundo plano, ou devolve o trabalho já existente para a mesma chave.
+        Um trabalho que terminou com erro é refeito.
+
+        `funcao` recebe os argumentos informados mais `progresso=` (callable).
+        """
+        with self._lock:
+            trabalho = self._trabalhos.get(chave)
+            if trabalho is not None and trabalho.estado != "erro":
+                self._trabalhos.move_to_end(chave)
+                return trabalho
+            trabalho = TrabalhoAnalise(chave)
+            self._trabalhos[chave] = trabalho
+            self._descartar_antigos()
+        self.executor.submit(self._executar, trabalho, funcao, args, kwargs)
+        return trabalho
+
+    def _descartar_antigos(self):
+        concluidos = [c for c, t in self._trabalhos.items() if t.finalizado]
+        for chave in concluidos[:max(0, len(concluidos) - MAXIMO_TRABALHOS_CONCLUIDOS)]:
+            del self._trabalhos[chave]
+
+    def _executar(self, trabalho, funcao, args, kwargs):
+        trabalho.estado = "executando"
+        trabalho.etapa = "Iniciando análise..."
+        with capturar_saida(trabalho.log):
+            try:
+                resultados = funcao(*args, progresso=trabalho.atualizar, **kwargs)
+                trabalho.resultados = resultados
+                if isinstance(resultados, dict) and "error" in resultados:
+                    # Erro devolvido pela análise (ex.: falta de taxa de câmbio): refeito no próximo envio
+                    trabalho.erro = resultados["error"]
+                    trabalho.estado = "erro"
+                else:
+                    trabalho.estado = "concluido"
+                    trabalho.progresso = 1.0
+            except Exception as e:
+                trabalho.erro = str(e)
+                trabalho.log.write(f"Erro inesperado na análise: {e}\n")
+                trabalho.estado = "erro"
+            finally:
+                trabalho.concluido_em = time.time()
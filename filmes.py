@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+Busca de filmes e séries na OMDb com índice local de títulos.
+
+- `pesquisar` usa o endpoint de lista (`s=`), página a página, e tolera títulos
+  parciais; os detalhes dos primeiros resultados são buscados em paralelo num
+  pool limitado.
+- Todo título já visto (na lista ou nos detalhes) fica num índice SQLite local.
+  Uma busca repetida, ou um prefixo de palavra de títulos já indexados, é
+  respondida pelo índice sem consultar a OMDb.
+- Os pôsteres são baixados uma vez, reduzidos a miniaturas e servidos do disco,
+  em vez de carregados direto do servidor de imagens pelo navegador.
+"""
+
+import io
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+from cliente_http import ErroConsulta, obter_json_cacheado, requisitar
+from configuracao import DIRETORIO_DADOS
+
+URL_OMDB = "http://www.omdbapi.com/"
+CAMINHO_INDICE_FILMES = os.path.join(DIRETORIO_DADOS, "filmes.sqlite")
+DIRETORIO_POSTERES = os.path.join(DIRETORIO_DADOS, "posteres")
+
+RESULTADOS_POR_PAGINA = 10 # Fixo na OMDb
+MAXIMO_DETALHES_SIMULTANEOS = 4
+LARGURA_MINIATURA = 300
+# Validade (s) de uma busca já feita: dentro dela, a mesma busca é respondida pelo índice
+VALIDADE_BUSCA = 24 * 3600
+
+
+def normalizar_titulo(texto):
+    """
+    Minúsculas, sem acentos e com espaços simples (chave de comparação dos títulos).
+    """
+    sem_acentos = unicodedata.normalize('NFKD', texto)
+    sem_acentos = "".join(c for c in sem_acentos if not unicodedata.combining(c))
+    return " ".join(sem_acentos.casefold().split())
+
+
+def _consultar(params, api_key):
+    data = obter_json_cacheado('omdb', URL_OMDB, dict(params, apikey=api_key, r="json"))
+    if data.get("Response") != "True":
+        return None
+    return data
+
+
+def buscar_titulo(titulo, api_key):
+    """
+    Título exato (`t=`), com a sinopse completa. Retorna None se não encontrado.
+    """
+    return _consultar({"t": titulo, "plot": "full"}, api_key)
+
+
+def buscar_detalhes(imdb_id, api_key):
+    """
+    Detalhes completos de um título pelo ID do IMDb (`i=`).
+    """
+    return _consultar({"i": imdb_id, "plot": "full"}, api_key)
+
+
+class IndiceFilmes:
+    """
+    Títulos já vistos na OMDb, com os detalhes quando já buscados, e as buscas já feitas.
+    """
+
+    def __init__(self, caminho=CAMINHO_INDICE_FILMES):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with self._conectar() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS titulos ("
+                " imdb_id TEXT PRIMARY KEY, titulo TEXT NOT NULL, titulo_normalizado TEXT NOT NULL,"
+                " ano TEXT, tipo TEXT, poster TEXT, detalhes TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_titulos_normalizado ON titulos (titulo_normalizado)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buscas ("
+                " termo TEXT PRIMARY KEY, total INTEGER NOT NULL, feita_em REAL NOT NULL)"
+            )
+
+    def _conectar(self):
+        conn = sqlite3.connect(self.caminho, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def registrar_lista(self, resultados):
+        linhas = [
+            (r['imdbID'], r['Title'], normalizar_titulo(r['Title']), r.get('Year'), r.get('Type'), r.get('Poster'))
+            for r in resultados
+        ]
+        with self._lock, self._conectar() as conn:
+            conn.executemany(
+                "INSERT INTO titulos (imdb_id, titulo, titulo_normalizado, ano, tipo, poster) VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(imdb_id) DO UPDATE SET titulo = excluded.titulo,"
+                " titulo_normalizado = excluded.titulo_normalizado, ano = excluded.ano,"
+                " tipo = excluded.tipo, poster = excluded.poster",
+                linhas
+            )
+
+    def registrar_detalhes(self, detalhes):
+        self.registrar_lista([detalhes])
+        with self._lock, self._conectar() as conn:
+            conn.execute("UPDATE titulos SET detalhes = ? WHERE imdb_id = ?",
+                         (json.dumps(detalhes, ensure_ascii=False), detalhes['imdbID']))
+
+    def obter_detalhes(self, imdb_ids):
+        """
+        Returns:
+            dict: imdb_id -> detalhes, para os títulos cujos detalhes já estão no índice.
+        """
+        if not imdb_ids:
+            return {}
+        marcadores = ", ".join("?" * len(imdb_ids))
+        with self._conectar() as conn:
+            linhas = conn.execute(
+                f"SELECT imdb_id, detalhes FROM titulos WHERE detalhes IS NOT NULL AND imdb_id IN ({marcadores})",
+                list(imdb_ids)
+            ).fetchall()
+        return {linha['imdb_id']: json.loads(linha['detalhes']) for linha in linhas}
+
+    def registrar_busca(self, termo, total):
+        with self._lock, self._conectar() as conn:
+            conn.execute("INSERT OR REPLACE INTO buscas (termo, total, feita_em) VALUES (?, ?, ?)",
+                         (normalizar_titulo(termo), total, time.time()))
+
+    def busca_recente(self, termo):
+        with self._conectar() as conn:
+            linha = conn.execute("SELECT total, feita_em FROM buscas WHERE termo = ?",
+                                 (normalizar_titulo(termo),)).fetchone()
+        return linha is not None and time.time() - linha['feita_em'] <= VALIDADE_BUSCA
+
+    def pesquisar(self, termo, limite=50):
+        """
+        Títulos cujo nome começa com o termo ou tem uma palavra que começa com ele.
+
+        Returns:
+            list: dicts no formato da lista da OMDb (imdbID, Title, Year, Type, Poster) mais
+                  'detalhes' (dict ou None).
+        """
+        termo = normalizar_titulo(termo)
+        if not termo:
+            return []
+        padrao = termo.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        with self._conectar() as conn:
+            linhas = conn.execute(
+                "SELECT * FROM titulos WHERE titulo_normalizado LIKE ? ESCAPE '\\'"
+                " OR titulo_normalizado LIKE ? ESCAPE '\\'"
+                " ORDER BY titulo_normalizado LIKE ? ESCAPE '\\' DESC, detalhes IS NOT NULL DESC, ano DESC, titulo LIMIT ?",
+                (f"{padrao}%", f"% {padrao}%", f"{padrao}%", limite)
+            ).fetchall()
+        return [{
+            'imdbID': linha['imdb_id'], 'Title': linha['titulo'], 'Year': linha['ano'],
+            'Type': linha['tipo'], 'Poster': linha['poster'],
+            'detalhes': json.loads(linha['detalhes']) if linha['detalhes'] else None,
+        } for linha in linhas]
+
+
+def buscar_lista(termo, api_key, paginas=1):
+    """
+    Resultados do endpoint de lista (`s=`) para as primeiras páginas.
+
+    Returns:
+        tuple: (list de resultados, total informado pela OMDb)
+    """
+    resultados, total = [], 0
+    for pagina in range(1, paginas + 1):
+        data = _consultar({"s": termo, "page": pagina}, api_key)
+        if data is None:
+            break
+        resultados.extend(data.get("Search", []))
+        total = int(data.get("totalResults", 0))
+        if pagina * RESULTADOS_POR_PAGINA >= total:
+            break
+    return resultados, total
+
+
+def pesquisar(termo, api_key, indice, paginas=1, detalhar=5, forcar_consulta=False):
+    """
+    Busca títulos, pelo índice local quando possível ou pela OMDb, e completa os detalhes
+    dos `detalhar` primeiros resultados (em paralelo, só os que ainda não estão no índice).
+
+    Returns:
+        tuple: (list de resultados com 'detalhes', origem: 'indice' ou 'omdb')
+    """
+    limite = paginas * RESULTADOS_POR_PAGINA
+    locais = indice.pesquisar(termo, limite)
+    # Busca já feita, ou o índice já cobre todos os resultados pedidos: não consulta a OMDb
+    if not forcar_consulta and locais and (indice.busca_recente(termo) or len(locais) >= limite):
+        resultados, origem = locais, 'indice'
+    else:
+        lista, total = buscar_lista(termo, api_key, paginas)
+        indice.registrar_lista(lista)
+        indice.registrar_busca(termo, total)
+        detalhes_locais = indice.obter_detalhes([r['imdbID'] for r in lista])
+        resultados = [dict(r, detalhes=detalhes_locais.get(r['imdbID'])) for r in lista]
+        origem = 'omdb'
+
+    faltantes = [r['imdbID'] for r in resultados[:detalhar] if not r.get('detalhes')]
+    if faltantes:
+        with ThreadPoolExecutor(max_workers=MAXIMO_DETALHES_SIMULTANEOS) as executor:
+            buscados = dict(zip(faltantes, executor.map(
+                lambda imdb_id: _detalhes_ou_none(imdb_id, api_key), faltantes)))
+        for resultado in resultados:
+            detalhes = buscados.get(resultado['imdbID'])
+            if detalhes:
+                indice.registrar_detalhes(detalhes)
+                resultado['detalhes'] = detalhes
+    return resultados, origem
+
+
+def _detalhes_ou_none(imdb_id, api_key):
+    try:
+        return buscar_detalhes(imdb_id, api_key)
+    except ErroConsulta:
+        return None # O título aparece na lista, só sem os detalhes
+
+
+def miniatura_poster(url_poster, diretorio=DIRETORIO_POSTERES):
+    """
+    Caminho local da miniatura do pôster (baixada e reduzida na primeira vez).
+
+    Returns:
+        str: Caminho do JPEG, ou None se não houver pôster ou o download falhar.
+    """
+    if not url_poster or url_poster == "N/A":
+        return None
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = os.path.join(diretorio, hashlib.sha1(url_poster.encode('utf-8')).hexdigest() + ".jpg")
+    if os.path.exists(caminho):
+        return caminho
+
+    from PIL import Image
+
+    try:
+        conteudo = requisitar('posteres', url_poster).content
+        imagem = Image.open(io.BytesIO(conteudo)).convert("RGB")
+    except (ErroConsulta, OSError):
+        return None
+    imagem.thumbnail((LARGURA_MINIATURA, LARGURA_MINIATURA * 2))
+    temporario = caminho + ".tmp"
+    imagem.save(temporario, format="JPEG", quality=85)
+    os.replace(temporario, caminho)
+    return caminho
+
+
+_indice = None
+_indice_lock = threading.Lock()
+
+
+def obter_indice_filmes():
+    """
+    Retorna o índice de títulos do processo (criado na primeira chamada).
+    """
+    global _indice
+    with _indice_lock:
+        if _indice is None:
+            _indice = IndiceFilmes()
+        return _indice
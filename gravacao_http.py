@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+Gravação e reprodução das respostas HTTP das consultas externas.
+
+Com um transporte ativo (ver cliente_http.definir_transporte), todas as
+consultas que passam por `cliente_http` (clima, câmbio, filmes, fatos/citações/
+piadas, pôsteres) usam:
+
+- `TransporteGravacao`: faz a requisição real e salva a resposta num arquivo
+  JSON (fixture) no diretório informado;
+- `TransporteReproducao`: responde a partir das fixtures, sem rede nem chaves
+  de API, com latência e taxa de erros configuráveis para simular um upstream
+  lento ou instável.
+
+As chaves de API são removidas da URL e dos parâmetros antes de gerar o nome da
+fixture e de salvá-la, então as fixtures podem ir para o repositório.
+As cotações (yfinance) não passam por aqui; para elas há a `FonteFixture` de
+historico_precos.py.
+
+Ativação na página (env.py):
+    MODO_HTTP = "reproduzir"          # ou "gravar"
+    DIRETORIO_GRAVACOES_HTTP = "fixtures/http"
+"""
+
+import os
+import json
+import time
+import base64
+import random
+import hashlib
+import threading
+from urllib.parse import urlsplit
+
+import requests
+
+# Parâmetros de query que carregam chaves de API
+PARAMETROS_SECRETOS = {'apikey', 'appid', 'api_key', 'key', 'token'}
+MARCADOR_SEGREDO = "__CHAVE__"
+
+
+def _redigir(url, params, segredos):
+    for segredo in segredos:
+        if segredo:
+            url = url.replace(segredo, MARCADOR_SEGREDO)
+    params = {
+        chave: (MARCADOR_SEGREDO if chave.lower() in PARAMETROS_SECRETOS else str(valor))
+        for chave, valor in (params or {}).items()
+    }
+    return url, params
+
+
+def nome_fixture(url, params, segredos=()):
+    """
+    Nome do arquivo da fixture para a requisição (estável e sem as chaves de API).
+    """
+    url, params = _redigir(url, params, segredos)
+    bruto = json.dumps([url, sorted(params.items())], ensure_ascii=False)
+    host = urlsplit(url).hostname or "local"
+    return f"{host}_{hashlib.sha1(bruto.encode('utf-8')).hexdigest()[:16]}.json"
+
+
+class RespostaGravada:
+    """
+    Resposta reproduzida com a mesma interface usada de `requests.Response`.
+    """
+
+    def __init__(self, status_code, content, headers=None, url=""):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.url = url
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class TransporteGravacao:
+    """
+    Requisições reais; cada resposta também é salva como fixture.
+    """
+
+    def __init__(self, diretorio, segredos=()):
+        self.diretorio = diretorio
+        self.segredos = [s for s in segredos if s]
+        os.makedirs(diretorio, exist_ok=True)
+
+    def get(self, url, params=None, timeout=None):
+        from cliente_http import obter_sessao
+
+        response = obter_sessao().get(url, params=params, timeout=timeout)
+        url_redigida, params_redigidos = _redigir(url, params, self.segredos)
+        try:
+            corpo = {'corpo_texto': response.content.decode('utf-8')}
+        except UnicodeDecodeError:
+            corpo = {'corpo_base64': base64.b64encode(response.content).decode('ascii')}
+        fixture = dict({
+            'url': url_redigida,
+            'params': params_redigidos,
+            'status': response.status_code,
+            'content_type': response.headers.get('Content-Type', ''),
+        }, **corpo)
+        caminho = os.path.join(self.diretorio, nome_fixture(url, params, self.segredos))
+        temporario = caminho + ".tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(fixture, f, ensure_ascii=False, indent=1)
+        os.replace(temporario, caminho)
+        return response
+
+
+class TransporteReproducao:
+    """
+    Respostas servidas das fixtures, com latência e erros injetados.
+
+    Args:
+        diretorio (str): Pasta das fixtures gravadas.
+        latencia (tuple): (mínima, máxima) em segundos, sorteada por requisição.
+        taxa_erro (float): Fração das requisições que falham (metade falha de conexão, metade HTTP 503).
+        segredos (list): Chaves usadas nas chamadas, para localizar as fixtures gravadas sem elas.
+        semente (int): Semente do sorteio, para execuções reproduzíveis.
+    """
+
+    def __init__(self, diretorio, latencia=(0.0, 0.0), taxa_erro=0.0, segredos=(), semente=None):
+        self.diretorio = diretorio
+        self.latencia = latencia
+        self.taxa_erro = taxa_erro
+        self.segredos = [s for s in segredos if s]
+        self._aleatorio = random.Random(semente)
+        self._lock = threading.Lock()
+        self._fixtures = {}
+        self.requisicoes = 0
+        self.ausentes = 0
+
+    def _carregar(self, nome):
+        if nome not in self._fixtures:
+            caminho = os.path.join(self.diretorio, nome)
+            if os.path.exists(caminho):
+                with open(caminho, encoding='utf-8') as f:
+                    self._fixtures[nome] = json.load(f)
+            else:
+                self._fixtures[nome] = None
+        return self._fixtures[nome]
+
+    def get(self, url, params=None, timeout=None):
+        with self._lock:
+            self.requisicoes += 1
+            espera = self._aleatorio.uniform(*self.latencia)
+            sorteio = self._aleatorio.random()
+            fixture = self._carregar(nome_fixture(url, params, self.segredos))
+        time.sleep(espera)
+
+        if sorteio < self.taxa_erro / 2:
+            raise requests.exceptions.ConnectionError("Falha de conexão simulada.")
+        if sorteio < self.taxa_erro:
+            return RespostaGravada(503, b'{"erro": "Falha simulada"}', url=url)
+        if fixture is None:
+            with self._lock:
+                self.ausentes += 1
+            return RespostaGravada(404, json.dumps({"Response": "False", "erro": "Fixture ausente"}).encode('utf-8'),
+                                   url=url)
+
+        if 'corpo_base64' in fixture:
+            conteudo = base64.b64decode(fixture['corpo_base64'])
+        else:
+            conteudo = fixture['corpo_texto'].encode('utf-8')
+        return RespostaGravada(fixture['status'], conteudo, {'Content-Type': fixture.get('content_type', '')}, url)
+
+
+def ativar_transporte(modo, diretorio, segredos=(), **opcoes_reproducao):
+    """
+    Ativa a gravação ('gravar') ou reprodução ('reproduzir') para todas as consultas do processo.
+    Qualquer outro modo volta às requisições reais sem gravação.
+
+    Returns:
+        O transporte ativado (ou None).
+    """
+    from cliente_http import definir_transporte
+
+    if modo == "gravar":
+        transporte = TransporteGravacao(diretorio, segredos)
+    elif modo == "reproduzir":
+        transporte = TransporteReproducao(diretorio, segredos=segredos, **opcoes_reproducao)
+    else:
+        transporte = None
+    definir_transporte(transporte)
+    return transporte
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+Histórico local de preços diários (OHLCV) por símbolo.
+
+Cada símbolo fica num arquivo Parquet em `dados/precos/`. Ao consultar, só os
+dias posteriores à última data gravada são baixados (e a última barra é
+regravada, pois pode ser o pregão em andamento); os períodos longos (1M, 1Y, 5Y)
+saem direto do disco. Depois da primeira carga um gráfico de 5 anos custa uma
+leitura local e, no máximo, uma requisição de poucos dias.
+
+A origem dos dados é plugável: `FonteYahoo` (padrão) ou `FonteFixture`, que lê
+CSVs locais e permite usar/testar a ferramenta sem internet. Cada fonte grava
+num diretório próprio, para dados de fixture nunca se misturarem aos reais.
+
+Os downloads acontecem fora de qualquer lock; só a leitura-mescla-gravação de
+cada símbolo é serializada (um lock por símbolo).
+"""
+
+import os
+import re
+import hashlib
+import threading
+
+import pandas as pd
+
+from configuracao import DIRETORIO_DADOS
+from cotacoes import COLUNAS_OHLCV, baixar_historicos
+
+DIRETORIO_PRECOS = os.path.join(DIRETORIO_DADOS, "precos")
+# Históricos montados a partir de fixtures (um subdiretório por diretório de CSVs)
+DIRETORIO_PRECOS_FIXTURE = os.path.join(DIRETORIO_DADOS, "precos_fixture")
+
+# Períodos oferecidos nos gráficos
+PERIODOS = {
+    '7D': pd.DateOffset(days=7),
+    '1M': pd.DateOffset(months=1),
+    '1Y': pd.DateOffset(years=1),
+    '5Y': pd.DateOffset(years=5),
+}
+# Profundidade da primeira carga de um símbolo (o maior período oferecido)
+PROFUNDIDADE_INICIAL = PERIODOS['5Y']
+# Intervalo mínimo (s) entre duas atualizações do mesmo símbolo (o mesmo TTL das cotações)
+INTERVALO_ATUALIZACAO = 600
+
+
+class FonteYahoo:
+    """
+    Barras diárias do Yahoo Finance, vários símbolos por chamada.
+    """
+
+    def baixar(self, simbolos, inicio):
+        return baixar_historicos(simbolos, inicio=inicio.strftime('%Y-%m-%d'))
+
+
+class FonteFixture:
+    """
+    Barras diárias lidas de `<diretorio>/<SIMBOLO>.csv` (colunas Date, Open, High, Low, Close, Volume).
+    Para uso offline e testes.
+    """
+
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+
+    def baixar(self, simbolos, inicio):
+        historicos = {}
+        for simbolo in simbolos:
+            caminho = os.path.join(self.diretorio, f"{simbolo}.csv")
+            if not os.path.exists(caminho):
+                continue
+            hist = pd.read_csv(caminho, parse_dates=['Date'], index_col='Date')
+            hist = hist[hist.index >= inicio]
+            if not hist.empty:
+                historicos[simbolo] = hist
+        return historicos
+
+
+class HistoricoPrecos:
+    """
+    Armazenamento incremental de barras diárias por símbolo.
+    """
+
+    def __init__(self, diretorio=DIRETORIO_PRECOS, fonte=None):
+        self.diretorio = diretorio
+        self.fonte = fonte or FonteYahoo()
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        os.makedirs(diretorio, exist_ok=True)
+
+    def _lock_simbolo(self, simbolo):
+        with self._locks_lock:
+            return self._locks.setdefault(simbolo.upper(), threading.Lock())
+
+    def _caminho(self, simbolo):
+        # Símbolos como ^BVSP ou BRL=X não são nomes de arquivo seguros em todo sistema
+        return os.path.join(self.diretorio, re.sub(r"[^A-Z0-9.\-]", "_", simbolo.upper()) + ".parquet")
+
+    def carregar(self, simbolo):
+        """
+        Returns:
+            pd.DataFrame: Barras gravadas do símbolo (vazio se ainda não houver).
+        """
+        caminho = self._caminho(simbolo)
+        if not os.path.exists(caminho):
+            return pd.DataFrame(columns=COLUNAS_OHLCV, index=pd.DatetimeIndex([], name='Date'))
+        return pd.read_parquet(caminho)
+
+    def _gravar(self, simbolo, hist):
+        caminho = self._caminho(simbolo)
+        temporario = caminho + ".tmp"
+        hist.to_parquet(temporario, compression='snappy')
+        os.replace(temporario, caminho)
+
+    def _precisa_atualizar(self, simbolo, agora):
+        caminho = self._caminho(simbolo)
+        return not os.path.exists(caminho) or agora - os.path.getmtime(caminho) > INTERVALO_ATUALIZACAO
+
+    def atualizar(self, simbolos):
+        """
+        Baixa só os dias que faltam para cada símbolo. Símbolos com a mesma data de início
+        vão juntos numa única chamada à fonte.
+
+        Returns:
+            list: Símbolos sem nenhum dado (nem gravado, nem na fonte).
+        """
+        agora = pd.Timestamp.now().timestamp()
+        hoje = pd.Timestamp.now().normalize()
+        grupos = {}
+        for simbolo in simbolos:
+            if not self._precisa_atualizar(simbolo, agora):
+                continue
+            gravado = self.carregar(simbolo)
+            # A última barra gravada é baixada de novo: pode ter sido gravada com o pregão em andamento
+            inicio = gravado.index.max().normalize() if not gravado.empty else hoje - PROFUNDIDADE_INICIAL
+            grupos.setdefault(inicio, []).append(simbolo)
+
+        for inicio, grupo in grupos.items():
+            novos = self.fonte.baixar(grupo, inicio) # Rede: fora de qualquer lock
+            for simbolo in grupo:
+                with self._lock_simbolo(simbolo):
+                    self._mesclar(simbolo, novos.get(simbolo))
+
+        return [s for s in simbolos if not os.path.exists(self._caminho(s))]
+
+    def _mesclar(self, simbolo, novo):
+        # Relê o gravado: outra thread pode ter gravado o símbolo durante o download
+        gravado = self.carregar(simbolo)
+        if novo is None or novo.empty:
+            if not gravado.empty:
+                os.utime(self._caminho(simbolo)) # Sem dias novos: só marca a verificação
+            return
+        novo = novo[[c for c in COLUNAS_OHLCV if c in novo.columns]]
+        novo.index = pd.DatetimeIndex(novo.index).tz_localize(None).normalize()
+        novo.index.name = 'Date'
+        hist = pd.concat([gravado, novo]) if not gravado.empty else novo
+        hist = hist[~hist.index.duplicated(keep='last')].sort_index()
+        self._gravar(simbolo, hist.astype('float64'))
+
+    def intervalo(self, simbolo, periodo='1M'):
+        """
+        Barras do símbolo no período ('7D', '1M', '1Y', '5Y'), lidas do disco.
+        Chame `atualizar` antes para trazer os dias mais recentes.
+        """
+        hist = self.carregar(simbolo)
+        if hist.empty:
+            return hist
+        inicio = hist.index.max() - PERIODOS[periodo]
+        return hist[hist.index > inicio]
+
+
+_historicos = {}
+_historicos_lock = threading.Lock()
+
+
+def diretorio_historico(fonte):
+    """
+    Diretório onde fica o histórico montado a partir de `fonte`: o padrão para o Yahoo,
+    e um subdiretório de DIRETORIO_PRECOS_FIXTURE para cada diretório de fixtures.
+    """
+    if isinstance(fonte, FonteFixture):
+        origem = os.path.abspath(fonte.diretorio)
+        return os.path.join(DIRETORIO_PRECOS_FIXTURE, hashlib.sha256(origem.encode('utf-8')).hexdigest()[:16])
+    return DIRETORIO_PRECOS
+
+
+def obter_historico_precos(fonte=None):
+    """
+    Retorna o histórico de preços do processo para a fonte informada (um por diretório de
+    histórico, criado na primeira chamada).
+    """
+    fonte = fonte or FonteYahoo()
+    diretorio = diretorio_historico(fonte)
+    with _historicos_lock:
+        if diretorio not in _historicos:
+            _historicos[diretorio] = HistoricoPrecos(diretorio, fonte=fonte)
+        return _historicos[diretorio]
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Métricas das chamadas externas (OpenWeather, ExchangeRate, yfinance, OMDb...).
+
+Registra, por serviço e endpoint: latência (histograma e percentis p50/p95/p99),
+requisições por status, erros por tipo e bytes recebidos; e, por serviço, os
+acertos e faltas do cache persistente de respostas. Os números aparecem na
+página oculta de administração (pages/metricas_admin.py) e podem ser expostos no
+formato texto do Prometheus, por um endpoint HTTP opcional.
+"""
+
+import re
+import threading
+from collections import Counter, defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Limites superiores (s) dos buckets do histograma de latência
+BUCKETS_LATENCIA = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Amostras recentes guardadas por endpoint para o cálculo dos percentis
+AMOSTRAS_PERCENTIS = 2000
+
+
+def percentil(valores_ordenados, p):
+    """
+    Percentil por interpolação linear sobre uma lista já ordenada.
+    """
+    if not valores_ordenados:
+        return float('nan')
+    posicao = (len(valores_ordenados) - 1) * p / 100
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(valores_ordenados) - 1)
+    fracao = posicao - inferior
+    return valores_ordenados[inferior] + (valores_ordenados[superior] - valores_ordenados[inferior]) * fracao
+
+
+def endpoint_da_url(url):
+    """
+    Caminho da URL sem partes variáveis sensíveis (chaves de API no caminho viram {chave}).
+    """
+    caminho = re.sub(r"^[a-z]+://", "", url).split("?", 1)[0]
+    return re.sub(r"/[0-9A-Za-z]{20,}(?=/|$)", "/{chave}", caminho)
+
+
+class _HistoricoLatencia:
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS_LATENCIA)
+        self.soma = 0.0
+        self.contagem = 0
+        self.amostras = deque(maxlen=AMOSTRAS_PERCENTIS)
+
+    def observar(self, duracao):
+        for i, limite in enumerate(BUCKETS_LATENCIA):
+            if duracao <= limite:
+                self.buckets[i] += 1
+        self.soma += duracao
+        self.contagem += 1
+        self.amostras.append(duracao)
+
+    def percentil(self, p):
+        return percentil(sorted(self.amostras), p)
+
+
+class RegistroMetricas:
+    """
+    Contadores e histogramas em memória, seguros entre threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias = defaultdict(_HistoricoLatencia)  # (servico, endpoint) -> histórico
+        self.requisicoes = Counter()                     # (servico, endpoint, status)
+        self.erros = Counter()                           # (servico, tipo)
+        self.bytes = Counter()                           # servico
+        self.cache = Counter()                           # (servico, 'fresco' | 'vencido' | 'ausente')
+
+    def registrar_requisicao(self, servico, endpoint, duracao, status, tamanho=0):
+        """
+        Args:
+            status: Código HTTP, ou o tipo da falha ('timeout', 'conexao'...) quando não houve resposta.
+        """
+        with self._lock:
+            self.latencias[(servico, endpoint)].observar(duracao)
+            self.requisicoes[(servico, endpoint, str(status))] += 1
+            if tamanho: # Serviços sem corpo HTTP medido (ex.: yfinance) ficam fora do volume
+                self.bytes[servico] += tamanho
+
+    def registrar_erro(self, servico, tipo):
+        with self._lock:
+            self.erros[(servico, tipo)] += 1
+
+    def registrar_cache(self, servico, resultado):
+        with self._lock:
+            self.cache[(servico, resultado)] += 1
+
+    def resumo_latencias(self):
+        """
+        Returns:
+            list: dicts com servico, endpoint, requisicoes, p50/p95/p99/media (ms) e bytes do serviço.
+        """
+        with self._lock:
+            linhas = []
+            for (servico, endpoint), hist in sorted(self.latencias.items()):
+                linhas.append({
+                    'servico': servico,
+                    'endpoint': endpoint,
+                    'requisicoes': hist.contagem,
+                    'p50_ms': hist.percentil(50) * 1000,
+                    'p95_ms': hist.percentil(95) * 1000,
+                    'p99_ms': hist.percentil(99) * 1000,
+                    'media_ms': hist.soma / hist.contagem * 1000,
+                })
+            return linhas
+
+    def resumo_erros(self):
+        """
+        Returns:
+            list: dicts com servico, tipo e quantidade.
+        """
+        with self._lock:
+            return [{'servico': s, 'tipo': t, 'quantidade': n} for (s, t), n in sorted(self.erros.items())]
+
+    def resumo_bytes(self):
+        """
+        Returns:
+            list: dicts com servico e bytes recebidos.
+        """
+        with self._lock:
+            return [{'servico': s, 'bytes': n} for s, n in sorted(self.bytes.items())]
+
+    def resumo_cache(self):
+        """
+        Returns:
+            list: dicts com servico, fresco, vencido, ausente e taxa_acerto.
+        """
+        with self._lock:
+            linhas = []
+            for servico in sorted({s for s, _ in self.cache}):
+                fresco, vencido, ausente = (self.cache[(servico, r)] for r in ('fresco', 'vencido', 'ausente'))
+                total = fresco + vencido + ausente
+                linhas.append({'servico': servico, 'fresco': fresco, 'vencido': vencido, 'ausente': ausente,
+                               'taxa_acerto': (fresco + vencido) / total if total else float('nan')})
+            return linhas
+
+    def exportar_prometheus(self):
+        """
+        Métricas no formato texto de exposição do Prometheus.
+        """
+        def rotulos(**valores):
+            return "{" + ",".join(f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                                  for k, v in valores.items()) + "}"
+
+        with self._lock:
+            linhas = [
+                "# HELP consultas_requisicoes_total Requisições a APIs externas por status.",
+                "# TYPE consultas_requisicoes_total counter",
+            ]
+            for (servico, endpoint, status), n in sorted(self.requisicoes.items()):
+                linhas.append(f"consultas_requisicoes_total{rotulos(servico=servico, endpoint=endpoint, status=status)} {n}")
+
+            linhas += ["# HELP consultas_erros_total Consultas que falharam, por tipo de erro.",
+                       "# TYPE consultas_erros_total counter"]
+            for (servico, tipo), n in sorted(self.erros.items()):
+                linhas.append(f"consultas_erros_total{rotulos(servico=servico, tipo=tipo)} {n}")
+
+            linhas += ["# HELP consultas_bytes_recebidos_total Bytes recebidos das APIs externas.",
+                       "# TYPE consultas_bytes_recebidos_total counter"]
+            for servico, n in sorted(self.bytes.items()):
+                linhas.append(f"consultas_bytes_recebidos_total{rotulos(servico=servico)} {n}")
+
+            linhas += ["# HELP consultas_latencia_segundos Latência das requisições a APIs externas.",
+                       "# TYPE consultas_latencia_segundos histogram"]
+            for (servico, endpoint), hist in sorted(self.latencias.items()):
+                for limite, n in zip(BUCKETS_LATENCIA, hist.buckets):
+                    linhas.append("consultas_latencia_segundos_bucket"
+                                  f"{rotulos(servico=servico, endpoint=endpoint, le=limite)} {n}")
+                linhas.append("consultas_latencia_segundos_bucket"
+                              f"{rotulos(servico=servico, endpoint=endpoint, le='+Inf')} {hist.contagem}")
+                linhas.append(f"consultas_latencia_segundos_sum{rotulos(servico=servico, endpoint=endpoint)} {hist.soma}")
+                linhas.append(f"consultas_latencia_segundos_count{rotulos(servico=servico, endpoint=endpoint)} {hist.contagem}")
+
+            linhas += ["# HELP consultas_cache_total Consultas ao cache de respostas por resultado.",
+                       "# TYPE consultas_cache_total counter"]
+            for (servico, resultado), n in sorted(self.cache.items()):
+                linhas.append(f"consultas_cache_total{rotulos(servico=servico, resultado=resultado)} {n}")
+            return "\n".join(linhas) + "\n"
+
+
+_metricas = RegistroMetricas()
+
+
+def obter_metricas():
+    """
+    Retorna o registro de métricas do processo.
+    """
+    return _metricas
+
+
+_servidor = None
+_servidor_lock = threading.Lock()
+
+
+def iniciar_exportador(porta, host="127.0.0.1"):
+    """
+    Serve GET /metrics (formato Prometheus) numa thread de fundo. Chamadas seguintes não fazem nada.
+    """
+    global _servidor
+
+    class HandlerMetricas(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_response(404)
+                self.end_headers()
+                return
+            dados = obter_metricas().exportar_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def log_message(self, formato, *args): # Silencia o log padrão por requisição
+            pass
+
+    with _servidor_lock:
+        if _servidor is None:
+            _servidor = ThreadingHTTPServer((host, porta), HandlerMetricas)
+            _servidor.daemon_threads = True
+            threading.Thread(target=_servidor.serve_forever, name="exportador-metricas", daemon=True).start()
+        return _servidor
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Comparativo Orçamento x Realizado.
+
+Cruza o orçamento mensal (categorias por mês, um ou mais anos) com as transações
+categorizadas através de um merge vetorizado por (mês, tipo, categoria), calculando
+a variação e o percentual consumido de cada categoria em cada mês.
+
+O cálculo é incremental: cada mês guarda uma assinatura das transações que o
+compõem, e ao atualizar o realizado apenas os meses cuja assinatura mudou são
+recalculados.
+"""
+
+import pandas as pd
+
+COLUNAS_COMPARATIVO = ['mes_ano', 'tipo', 'categoria', 'orcado', 'realizado', 'variacao', 'percentual_consumido']
+
+
+def chave_categoria(serie):
+    """
+    Normaliza nomes de categoria para o cruzamento (minúsculas, sem acentos e espaços extras).
+    """
+    return serie.fillna('').astype(str).str.lower() \
+                .str.normalize('NFKD').str.encode('ascii', errors='ignore').str.decode('utf-8') \
+                .str.replace(r'\s+', ' ', regex=True).str.strip()
+
+
+def _agrupar(df, coluna_categoria):
+    # Soma em módulo por (mês, tipo, categoria): despesas entram negativas nas duas planilhas
+    agrupado = pd.DataFrame({
+        'mes_ano': df['data'].dt.to_period('M'),
+        'tipo': df['tipo'],
+        'chave': chave_categoria(df[coluna_categoria]),
+        'categoria': df[coluna_categoria].astype(str).str.strip(),
+        'valor': df['valor'],
+    })
+    return agrupado.groupby(['mes_ano', 'tipo', 'chave'], as_index=False) \
+                   .agg(categoria=('categoria', 'first'), valor=('valor', 'sum')) \
+                   .assign(valor=lambda d: d['valor'].abs())
+
+
+class ComparativoOrcamento:
+    """
+    Mantém o orçamento e o realizado por mês e recalcula só os meses alterados.
+    """
+
+    def __init__(self):
+        self._orcamento = pd.DataFrame({
+            'mes_ano': pd.Series(dtype='period[M]'),
+            'tipo': pd.Series(dtype=object),
+            'chave': pd.Series(dtype=object),
+            'categoria': pd.Series(dtype=object),
+            'valor': pd.Series(dtype=float),
+        })
+        self._realizado_por_mes = {}
+        self._assinatura_por_mes = {}
+        self._comparativo_por_mes = {}
+
+    def definir_orcamento(self, df_orcamento, ano):
+        """
+        Define (ou substitui) o orçamento de um ano.
+
+        Args:
+            df_orcamento (pd.DataFrame): Orçamento em formato longo (colunas 'data', 'tipo',
+                                         'categoria' e 'valor'), como em ler_planilha_orcamento.
+            ano (int): Ano do orçamento.
+
+        Returns:
+            list: Meses recalculados.
+        """
+        novo = _agrupar(df_orcamento, 'categoria')
+        novo = novo[novo['mes_ano'].dt.year == ano]
+        restante = self._orcamento[self._orcamento['mes_ano'].dt.year != ano]
+        self._orcamento = pd.concat([restante, novo], ignore_index=True)
+
+        meses = set(novo['mes_ano']) | {m for m in self._comparativo_por_mes if m.year == ano}
+        for mes in meses:
+            self._recalcular_mes(mes)
+        return sorted(meses)
+
+    def remover_orcamento(self, ano):
+        """
+        Remove o orçamento de um ano (ex.: a planilha daquele ano saiu do upload).
+
+        Returns:
+            list: Meses recalculados.
+        """
+        do_ano = self._orcamento['mes_ano'].dt.year == ano
+        meses = set(self._orcamento.loc[do_ano, 'mes_ano'])
+        self._orcamento = self._orcamento[~do_ano]
+        for mes in meses:
+            self._recalcular_mes(mes)
+        return sorted(meses)
+
+    def atualizar_realizado(self, transacoes):
+        """
+        Atualiza o realizado a partir das transações normalizadas. Apenas os meses cujas
+        transações mudaram (ou deixaram de existir) são recalculados.
+
+        Args:
+            transacoes (pd.DataFrame): Transações normalizadas ('data', 'tipo', 'valor' e
+                                       'categoria' ou 'descricao').
+
+        Returns:
+            list: Meses recalculados.
+        """
+        coluna_categoria = 'categoria' if 'categoria' in transacoes.columns else 'descricao'
+        colunas = ['data', 'tipo', coluna_categoria, 'valor']
+        meses_transacoes = transacoes['data'].dt.to_period('M')
+
+        # Assinatura por mês: soma dos hashes das linhas (independe da ordem)
+        hashes = pd.util.hash_pandas_object(transacoes[colunas], index=False)
+        assinaturas = hashes.groupby(meses_transacoes).sum().to_dict()
+
+        alterados = [m for m, a in assinaturas.items() if self._assinatura_por_mes.get(m) != a]
+        removidos = [m for m in self._assinatura_por_mes if m not in assinaturas]
+
+        if alterados:
+            selecionadas = transacoes[meses_transacoes.isin(alterados)]
+            agrupado = _agrupar(selecionadas, coluna_categoria)
+            for mes, grupo in agrupado.groupby('mes_ano'):
+                self._realizado_por_mes[mes] = grupo
+            for mes in alterados:
+                self._assinatura_por_mes[mes] = assinaturas[mes]
+        for mes in removidos:
+            self._realizado_por_mes.pop(mes, None)
+            self._assinatura_por_mes.pop(mes, None)
+
+        recalculados = alterados + removidos
+        for mes in recalculados:
+            self._recalcular_mes(mes)
+        return sorted(recalculados)
+
+    def _recalcular_mes(self, mes):
+        orcado = self._orcamento[self._orcamento['mes_ano'] == mes]
+        realizado = self._realizado_por_mes.get(mes)
+        if realizado is None:
+            realizado = orcado.iloc[0:0]
+        if orcado.empty and realizado.empty:
+            self._comparativo_por_mes.pop(mes, None)
+            return
+
+        comparativo = orcado.merge(realizado, on=['mes_ano', 'tipo', 'chave'], how='outer',
+                                   suffixes=('_orcado', '_realizado'))
+        comparativo['categoria'] = comparativo['categoria_orcado'].fillna(comparativo['categoria_realizado'])
+        comparativo['orcado'] = comparativo['valor_orcado'].fillna(0.0)
+        comparativo['realizado'] = comparativo['valor_realizado'].fillna(0.0)
+        comparativo['variacao'] = comparativo['realizado'] - comparativo['orcado']
+        comparativo['percentual_consumido'] = (comparativo['realizado'] / comparativo['orcado'] * 100) \
+            .where(comparativo['orcado'] != 0)
+        self._comparativo_por_mes[mes] = comparativo[COLUNAS_COMPARATIVO]
+
+    def comparativo(self):
+        """
+        Retorna o comparativo de todos os meses, ordenado por mês, tipo e categoria.
+        """
+        if not self._comparativo_por_mes:
+            return pd.DataFrame(columns=COLUNAS_COMPARATIVO)
+        return pd.concat([self._comparativo_por_mes[m] for m in sorted(self._comparativo_por_mes)],
+                         ignore_index=True) \
+                 .sort_values(['mes_ano', 'tipo', 'categoria'], ignore_index=True)
@@ -2,11 +2,23 @@ import streamlit as st
 import pandas as pd
 import os
 import io
-import contextlib
-import sys
 import tempfile
-import calendar # Para mapear nomes de meses para números
+import datetime
+import re
+import secrets
 import matplotlib.pyplot as plt
+import env
+from analise_planilhas import analisar_conteudos_transacoes, analisar_planilha_orcamento, ler_planilha_orcamento
+from fila_analises import FilaAnalises, capturar_saida, saida_original
+from deduplicacao import HistoricoImpressoes, caminho_historico, hash_arquivo
+from exportacao import FORMATOS_EXPORTACAO, exportar_resultados
+from orcamento_realizado import ComparativoOrcamento
+from cambio import MOEDA_RELATORIO, TabelaCambio
+from analises_salvas import AnalisesSalvas
+from sessoes import restaurar_sessao # Login restaurado a partir do token da URL
+
+# Chave da ExchangeRate-API (usada para atualizar a tabela local de câmbio)
+EXCHANGERATE_API_KEY = env.EXCHANGERATE_API_KEY if hasattr(env, 'EXCHANGERATE_API_KEY') else "SUA_CHAVE_EXCHANGERATE_AQUI"
 
 # Classe para capturar a saída do console (mantida)
 class StreamlitConsoleCapture(io.StringIO):
@@ -24,292 +36,88 @@ class StreamlitConsoleCapture(io.StringIO):
         if self.target_stream:
             self.target_stream.flush()
 
-# --- FUNÇÃO 1: Análise de Planilha de Transações (seu código atual, refatorado) ---
-# Adicionado num_transacoes_exibir como parâmetro
-def analisar_planilha_transacoes(caminho_arquivo, num_transacoes_exibir=10):
-    print(f"\nTentando ler arquivo de TRANSAÇÕES: {caminho_arquivo}")
-    try:
-        if caminho_arquivo.endswith('.xlsx') or caminho_arquivo.endswith('.xls'):
-            df = pd.read_excel(caminho_arquivo)
-        elif caminho_arquivo.endswith('.csv'):
-            try:
-                # Tentativa de leitura com separador e decimal específicos
-                df = pd.read_csv(caminho_arquivo, sep=';', encoding='utf-8', decimal=',', thousands='.')
-            except Exception as e:
-                print(f"Aviso: Falha na leitura avançada do CSV: {e}. Tentando leitura básica...")
-                # Tentativa de leitura básica para CSV
-                df = pd.read_csv(caminho_arquivo, sep=';', encoding='utf-8')
-        else:
-            return {"error": "Formato de arquivo não suportado. Por favor, use .xlsx, .xls ou .csv."}
-
-        print("Arquivo de transações lido com sucesso!")
-
-        # Normaliza os nomes das colunas
-        df.columns = df.columns.str.lower().str.replace(' ', '_').str.normalize('NFKD').str.encode('ascii', errors='ignore').str.decode('utf-8')
-
-        # --- AJUSTE: Adicionado 'descricao' como coluna esperada separada ---
-        colunas_esperadas = {
-            'valor': ['valor', 'quantia', 'montante'],
-            'data': ['data', 'data_transacao', 'data_pagamento', 'data_recebimento'],
-            'tipo': ['tipo', 'categoria', 'natureza'],
-            'conta_bancaria': ['conta', 'conta_bancaria', 'banco'],
-            'descricao': ['descricao', 'item', 'detalhe', 'observacao', 'finalidade'] # Mais nomes para descrição
-        }
-
-        colunas_encontradas = {}
-        for esperado, possiveis in colunas_esperadas.items():
-            for possivel in possiveis:
-                if possivel in df.columns:
-                    colunas_encontradas[esperado] = possivel
-                    break
-            if esperado not in colunas_encontradas:
-                print(f"Aviso: Não foi possível encontrar a coluna '{esperado}' (tentou: {', '.join(possiveis)}).")
-                if esperado in ['valor', 'data']: # Colunas essenciais
-                    return {"error": f"Coluna essencial '{esperado}' não encontrada. Verifique os nomes das colunas na sua planilha."}
-
-        df = df.rename(columns={v: k for k, v in colunas_encontradas.items()})
-
-        # Processamento da coluna 'valor'
-        if 'valor' in df.columns:
-            df['valor'] = df['valor'].astype(str)
-            df['valor'] = df['valor'].str.replace('R$', '', regex=False) \
-                                     .str.replace('.', '', regex=False) \
-                                     .str.replace(',', '.', regex=False) \
-                                     .str.strip()
-            df['valor'] = pd.to_numeric(df['valor'], errors='coerce')
-            df.dropna(subset=['valor'], inplace=True)
-        else:
-            return {"error": "Coluna 'valor' não encontrada ou inválida após normalização."}
-
-        # Processamento da coluna 'data'
-        if 'data' in df.columns:
-            df['data'] = pd.to_datetime(df['data'], format='%d/%m/%Y', errors='coerce')
-            df.dropna(subset=['data'], inplace=True)
-            df['data_br'] = df['data'].dt.strftime('%d/%m/%Y')
-        else:
-            return {"error": "Coluna 'data' não encontrada ou inválida após normalização."}
-
-        # Processamento da coluna 'descricao' (garante que seja string e trata nulos)
-        if 'descricao' in df.columns:
-            df['descricao'] = df['descricao'].astype(str).fillna('').str.strip()
-        else:
-            # Se 'descricao' não for encontrada, cria uma coluna vazia para evitar erros posteriores
-            df['descricao'] = '' 
-
-        # Padroniza a coluna 'tipo' ou infere
-        if 'tipo' in df.columns:
-            df['tipo_original'] = df['tipo'].astype(str).str.lower().str.strip()
-            df['tipo_original'] = df['tipo_original'].str.replace(r'[^a-z\s]', '', regex=True).str.strip()
-
-            mapeamento_tipo = {
-                'receita': 'Receita', 'entrada': 'Receita', 'ganho': 'Receita',
-                'pagamento': 'Despesa', 'despesa': 'Despesa', 'saida': 'Despesa', 'gasto': 'Despesa'
-            }
-            df['tipo_categorizado'] = df['tipo_original'].map(mapeamento_tipo).fillna('Outros')
-            df['tipo'] = df.apply(lambda row: 'Despesa' if row['valor'] < 0 else row['tipo_categorizado'], axis=1)
-        else:
-            print("Aviso: Coluna 'tipo' não encontrada. Inferindo tipo pelo sinal do 'valor'.")
-            df['tipo'] = df['valor'].apply(lambda x: 'Receita' if x >= 0 else 'Despesa')
-
-        if 'tipo_original' in df.columns:
-            df.drop(columns=['tipo_original'], inplace=True)
-        if 'tipo_categorizado' in df.columns:
-            df.drop(columns=['tipo_categorizado'], inplace=True)
-
-        transacoes_receitas = df[df['tipo'] == 'Receita'].copy()
-        transacoes_despesas = df[df['tipo'] == 'Despesa'].copy()
-
-        # Selecionar e reordenar colunas para exibição, usando 'data_br'
-        colunas_exibicao = ['data_br', 'valor', 'tipo']
-        if 'conta_bancaria' in df.columns:
-            colunas_exibicao.append('conta_bancaria')
-        if 'descricao' in df.columns:
-            colunas_exibicao.append('descricao')
-        
-        # Garante que as colunas existam no dataframe antes de selecionar
-        colunas_exibicao_receitas = [col for col in colunas_exibicao if col in transacoes_receitas.columns]
-        colunas_exibicao_despesas = [col for col in colunas_exibicao if col in transacoes_despesas.columns]
-
-        transacoes_receitas = transacoes_receitas[colunas_exibicao_receitas].rename(columns={'data_br': 'data'})
-        transacoes_despesas = transacoes_despesas[colunas_exibicao_despesas].rename(columns={'data_br': 'data'})
-
-
-        resultados = {}
-        total_receber = transacoes_receitas['valor'].sum()
-        total_pagar = transacoes_despesas['valor'].sum()
-        saldo_total = total_receber + total_pagar
-
-        resultados['Resumo Geral'] = {
-            'Total a Receber': f"R$ {total_receber:,.2f}",
-            'Total a Pagar': f"R$ {abs(total_pagar):,.2f}",
-            'Saldo Total': f"R$ {saldo_total:,.2f}"
-        }
-        resultados['Transações por Tipo'] = df.groupby('tipo')['valor'].sum().apply(lambda x: f"R$ {x:,.2f}").to_dict()
-        
-        if 'conta_bancaria' in df.columns:
-            resultados['Saldo por Conta Bancária'] = df.groupby('conta_bancaria')['valor'].sum().apply(lambda x: f"R$ {x:,.2f}").to_dict()
-        else:
-            resultados['Saldo por Conta Bancária'] = "Coluna 'conta_bancaria' não encontrada para agrupamento."
-
-        # --- AJUSTE: Retorna DataFrame completo ou head(num_transacoes_exibir) ---
-        if num_transacoes_exibir == 0: # Se 0, exibe todas
-            resultados['Detalhes das Transações (Receitas)'] = transacoes_receitas
-            resultados['Detalhes das Transações (Despesas)'] = transacoes_despesas
-        else:
-            resultados['Detalhes das Transações (Receitas)'] = transacoes_receitas.head(num_transacoes_exibir)
-            resultados['Detalhes das Transações (Despesas)'] = transacoes_despesas.head(num_transacoes_exibir)
-
-        # --- NOVO: Agrupamento de Despesas por Descrição ---
-        if 'descricao' in df.columns and not transacoes_despesas.empty:
-            despesas_por_descricao = transacoes_despesas.groupby('descricao')['valor'].sum().abs().sort_values(ascending=False).reset_index()
-            despesas_por_descricao['valor'] = despesas_por_descricao['valor'].apply(lambda x: f"R$ {x:,.2f}")
-            resultados['Despesas Agrupadas por Descrição'] = despesas_por_descricao
-        else:
-            resultados['Despesas Agrupadas por Descrição'] = "Coluna 'descricao' não encontrada ou nenhuma despesa para agrupar."
-
-
-        if 'data' in df.columns:
-            df['mes_ano'] = df['data'].dt.to_period('M')
-            resultados['Transações por Mês'] = df.groupby('mes_ano')['valor'].sum().apply(lambda x: f"R$ {x:,.2f}").to_dict()
-        else:
-            resultados['Transações por Mês'] = "Coluna 'data' não encontrada para agrupamento mensal."
-
-        return resultados
-
-    except Exception as e:
-        erro_msg = f"Ocorreu um erro ao processar a planilha de transações: {e}"
-        print(erro_msg)
-        return {"error": erro_msg}
-
-# --- FUNÇÃO 2: Análise de Planilha de Orçamento (Mantida como estava) ---
-def analisar_planilha_orcamento(caminho_arquivo):
-    print(f"\nTentando ler arquivo de ORÇAMENTO: {caminho_arquivo}")
-
-    if not (caminho_arquivo.endswith('.xlsx') or caminho_arquivo.endswith('.xls')):
-        return {"error": "A Planilha de Orçamento (Mensal) deve ser um arquivo Excel (.xlsx ou .xls). Arquivos CSV não são suportados para este tipo de planilha devido à sua estrutura complexa."}
-
-    try:
-        nome_para_numero_mes = {name.lower(): num for num, name in enumerate(calendar.month_name) if num}
-        
-        df_despesas_raw = pd.read_excel(caminho_arquivo, header=1, skiprows=[0], usecols="A:M")
-        df_despesas_raw = df_despesas_raw.rename(columns={df_despesas_raw.columns[0]: 'categoria'})
-        df_despesas_raw = df_despesas_raw.dropna(subset=['categoria'])
-        df_despesas_raw = df_despesas_raw[~df_despesas_raw['categoria'].str.contains('Total', na=False, case=False)]
-
-        meses_colunas_despesas = df_despesas_raw.columns[1:13].tolist()
-
-        for col in meses_colunas_despesas:
-            temp_series = df_despesas_raw[col].astype(str)
-            temp_series = temp_series.str.replace('R$', '', regex=False) \
-                                     .str.replace('.', '', regex=False) \
-                                     .str.replace(',', '.', regex=False) \
-                                     .str.strip()
-            df_despesas_raw[col] = pd.to_numeric(temp_series, errors='coerce').fillna(0)
-
-        df_despesas_melted = df_despesas_raw.melt(
-            id_vars=['categoria'],
-            value_vars=meses_colunas_despesas,
-            var_name='mes',
-            value_name='valor'
-        )
-        df_despesas_melted['tipo'] = 'Despesa'
-        df_despesas_melted['valor'] = df_despesas_melted['valor'] * -1 
-
-        df_receitas_raw = pd.read_excel(caminho_arquivo, header=17, skiprows=range(17), usecols="A:M")
-        df_receitas_raw = df_receitas_raw.rename(columns={df_receitas_raw.columns[0]: 'categoria'})
-        df_receitas_raw = df_receitas_raw.dropna(subset=['categoria'])
-        df_receitas_raw = df_receitas_raw[~df_receitas_raw['categoria'].str.contains('Total', na=False, case=False)]
-        
-        meses_colunas_receitas = df_receitas_raw.columns[1:13].tolist()
-
-        for col in meses_colunas_receitas:
-            temp_series = df_receitas_raw[col].astype(str)
-            temp_series = temp_series.str.replace('R$', '', regex=False) \
-                                     .str.replace('.', '', regex=False) \
-                                     .str.replace(',', '.', regex=False) \
-                                     .str.strip()
-            df_receitas_raw[col] = pd.to_numeric(temp_series, errors='coerce').fillna(0)
-
-        df_receitas_melted = df_receitas_raw.melt(
-            id_vars=['categoria'],
-            value_vars=meses_colunas_receitas,
-            var_name='mes',
-            value_name='valor'
-        )
-        df_receitas_melted['tipo'] = 'Receita'
-
-        df_final = pd.concat([df_despesas_melted, df_receitas_melted], ignore_index=True)
-        df_final.dropna(subset=['valor'], inplace=True) 
-
-        df_final['num_mes'] = df_final['mes'].str.lower().map(nome_para_numero_mes)
-        df_final = df_final.dropna(subset=['num_mes'])
-        df_final['data'] = pd.to_datetime(df_final['num_mes'].astype(int).astype(str) + '/1/2025', format='%m/%d/%Y')
-        df_final['data_br'] = df_final['data'].dt.strftime('%d/%m/%Y')
-        df_final['mes_ano'] = df_final['data'].dt.to_period('M')
-
-        transacoes_receitas = df_final[df_final['tipo'] == 'Receita'].copy()
-        transacoes_despesas = df_final[df_final['tipo'] == 'Despesa'].copy()
-
-        colunas_exibicao_orcamento = ['data_br', 'categoria', 'valor', 'tipo']
-        
-        transacoes_receitas_display = transacoes_receitas[colunas_exibicao_orcamento].rename(columns={'data_br': 'data'})
-        transacoes_despesas_display = transacoes_despesas[colunas_exibicao_orcamento].rename(columns={'data_br': 'data'})
-
-        resultados = {}
-        total_receber = transacoes_receitas['valor'].sum()
-        total_pagar = transacoes_despesas['valor'].sum()
-        saldo_total = total_receber + total_pagar
-
-        resultados['Resumo Geral'] = {
-            'Total a Receber': f"R$ {total_receber:,.2f}",
-            'Total a Pagar': f"R$ {abs(total_pagar):,.2f}",
-            'Saldo Total': f"R$ {saldo_total:,.2f}"
-        }
-        
-        resultados['Transações por Tipo'] = df_final.groupby('tipo')['valor'].sum().apply(lambda x: f"R$ {x:,.2f}").to_dict()
-
-        resultados['Saldo por Conta Bancária'] = "Não aplicável para Planilha de Orçamento (sem coluna 'conta_bancaria')."
-
-        resultados['Detalhes das Transações (Receitas)'] = transacoes_receitas_display.head(10) # Manter 10 para o orçamento por ser uma "simulação"
-        resultados['Detalhes das Transações (Despesas)'] = transacoes_despesas_display.head(10)
-        
-        resultados['Transações por Mês'] = df_final.groupby('mes_ano')['valor'].sum().apply(lambda x: f"R$ {x:,.2f}").to_dict()
-        
-        return resultados
-
-    except Exception as e:
-        erro_msg = f"Ocorreu um erro ao processar a planilha de orçamento: {e}"
-        print(erro_msg)
-        return {"error": erro_msg}
-
-
 # --- Streamlit UI ---
 st.set_page_config(layout="wide")
+restaurar_sessao() # Mantém o login ao recarregar, abrir em outra aba ou trocar de página
 
 st.title("📊 Analisador de Finanças")
 st.write("Faça upload de sua planilha financeira para obter um resumo detalhado.")
 
 tipo_planilha_selecionado = st.radio(
     "Qual o tipo de planilha você vai enviar?",
-    ("Planilha de Transações")
+    ("Planilha de Transações", "Planilha de Orçamento (Mensal)")
 )
 
-uploaded_file = st.file_uploader("Escolha um arquivo Excel ou CSV", type=["xlsx", "xls", "csv"])
-
-if uploaded_file is not None:
-    file_details = {"FileName": uploaded_file.name, "FileType": uploaded_file.type, "FileSize": uploaded_file.size}
-    st.write(file_details)
-
-    with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_file.name)[1]) as tmp_file:
-        tmp_file.write(uploaded_file.getvalue())
-        temp_path = tmp_file.name
-
-    console_output = StreamlitConsoleCapture(sys.stdout)
+# --- NOVO: Aceita vários extratos; períodos sobrepostos não são somados duas vezes ---
+uploaded_files = st.file_uploader("Escolha um ou mais arquivos Excel ou CSV", type=["xlsx", "xls", "csv"], accept_multiple_files=True)
+
+@st.cache_resource # Um histórico de impressões por usuário, compartilhado entre re-runs
+def carregar_historico_impressoes(caminho):
+    return HistoricoImpressoes(caminho)
+
+@st.cache_resource
+def carregar_tabela_cambio():
+    return TabelaCambio()
+
+@st.cache_resource # Fila de análises do processo: os trabalhos sobrevivem aos re-runs da página
+def carregar_fila_analises():
+    return FilaAnalises(workers=2)
+
+@st.fragment(run_every=0.5) # Só este trecho é atualizado enquanto a análise roda, não a página inteira
+def acompanhar_trabalho(trabalho):
+    if trabalho.finalizado:
+        st.rerun() # Re-executa a página inteira para exibir os resultados
+    st.progress(trabalho.progresso, text=trabalho.etapa)
+    if trabalho.parciais:
+        colunas_parciais = st.columns(len(trabalho.parciais))
+        for coluna_parcial, (rotulo, valor_parcial) in zip(colunas_parciais, trabalho.parciais.items()):
+            coluna_parcial.metric(rotulo, f"{valor_parcial:,}" if isinstance(valor_parcial, int) else valor_parcial)
+    st.caption("A análise continua em segundo plano; você pode alterar as opções da página sem perdê-la.")
+
+def limpar_exportacao(chave):
+    """
+    Apaga os arquivos exportados da sessão e associa a lista (vazia) à análise `chave`.
+    """
+    for _, caminho_exportado, _ in st.session_state.get('arquivos_exportados', []):
+        if os.path.exists(caminho_exportado):
+            os.remove(caminho_exportado)
+    st.session_state.arquivos_exportados = []
+    st.session_state.chave_exportacao = chave
+
+@st.cache_resource # Análises salvas por usuário (dados/analises)
+def carregar_analises_salvas():
+    return AnalisesSalvas()
+
+@st.cache_data(show_spinner=False, max_entries=8) # Re-runs (ex.: mover o slider) não releem os arquivos salvos
+def _ler_analise_salva(username, chave):
+    return carregar_analises_salvas().carregar(username, chave)
+
+def carregar_analise_salva(username, chave):
+    # Confere se existe antes de ir ao cache: uma ausência não fica guardada como None
+    # (a análise salva logo depois não seria encontrada nos próximos re-runs)
+    if not carregar_analises_salvas().existe(username, chave):
+        return None
+    return _ler_analise_salva(username, chave)
+
+# --- NOVO: Usuário logado tem as análises de transações salvas e reabertas nas próximas visitas ---
+username = st.session_state.get('username')
+analises_salvas = carregar_analises_salvas()
+resultados = None
+captured_text = ""
+num_transacoes_exibir = 0
+chave_analise = None # Identifica a análise exibida (arquivos + opções); usada para descartar exportações antigas
+
+if uploaded_files:
+    conteudos_transacoes = [] # (nome, conteúdo, hash do conteúdo)
+    for uploaded_file in uploaded_files:
+        file_details = {"FileName": uploaded_file.name, "FileType": uploaded_file.type, "FileSize": uploaded_file.size}
+        st.write(file_details)
+        conteudos_transacoes.append((uploaded_file.name, uploaded_file.getvalue(), hash_arquivo(uploaded_file.getvalue())))
+
+    console_output = StreamlitConsoleCapture(saida_original())
+    fila_analises = carregar_fila_analises()
     
-    # Variável para controlar o número de transações a exibir, inicializada
-    num_transacoes_exibir = 0 # Valor padrão para o slider
-
-    with contextlib.redirect_stdout(console_output):
+    with capturar_saida(console_output): # Só a thread desta sessão; os trabalhos em segundo plano têm o próprio log
         if tipo_planilha_selecionado == "Planilha de Transações":
             # --- MOVIDO: Slider para o corpo principal, acima dos detalhes das transações ---
             st.subheader("Opções de Visualização de Transações Detalhadas")
@@ -318,111 +126,308 @@ if uploaded_file is not None:
                 0, 500, 10, step=10, # Max 500 para evitar carregar demais, ajuste se precisar
                 key='slider_transacoes'
             )
-            # Passa o valor do slider para a função de análise
-            resultados = analisar_planilha_transacoes(temp_path, num_transacoes_exibir=num_transacoes_exibir)
+            # Desligado por padrão: as linhas já vistas saem do relatório atual e nada do histórico é somado de volta
+            ignorar_importadas = st.checkbox(
+                "Ignorar transações já importadas em uploads anteriores",
+                value=False,
+                key='checkbox_historico_impressoes',
+                help="Remove deste relatório as transações que já apareceram em extratos enviados antes. "
+                     "Os totais passam a refletir só as transações novas."
+            )
+            historico = None
+            if ignorar_importadas:
+                caminho = caminho_historico(username)
+                if caminho is not None:
+                    historico = carregar_historico_impressoes(caminho)
+                else:
+                    # Visitante sem login: histórico só desta sessão, nunca compartilhado em disco
+                    if 'historico_impressoes_sessao' not in st.session_state:
+                        st.session_state.historico_impressoes_sessao = HistoricoImpressoes(None)
+                    historico = st.session_state.historico_impressoes_sessao
+            # Taxas de câmbio locais, usadas quando houver coluna de moeda com valores fora de BRL
+            tabela_cambio = carregar_tabela_cambio()
+            with st.expander("Taxas de Câmbio"):
+                st.write(f"As transações em outras moedas são convertidas para {MOEDA_RELATORIO} pela taxa registrada na data da transação (ou a mais próxima anterior). Transações anteriores à primeira taxa registrada da moeda não são convertidas com taxas posteriores: a análise aponta as datas sem câmbio para que você importe o histórico.")
+                if st.button("Atualizar taxas do dia (ExchangeRate-API)", key='botao_atualizar_cambio'):
+                    try:
+                        total_taxas = tabela_cambio.atualizar_da_api(EXCHANGERATE_API_KEY)
+                        st.success(f"{total_taxas} taxas atualizadas.")
+                    except Exception as e:
+                        st.error(f"Não foi possível atualizar as taxas: {e}")
+                arquivo_taxas = st.file_uploader(f"Importar histórico de taxas (CSV com colunas data;moeda;taxa, 1 {tabela_cambio.base} = taxa moeda):", type=["csv"], key='uploader_taxas')
+                if arquivo_taxas is not None and st.button("Importar taxas", key='botao_importar_cambio'):
+                    try:
+                        st.success(f"{tabela_cambio.importar_arquivo(arquivo_taxas)} taxas importadas.")
+                    except Exception as e:
+                        st.error(f"Não foi possível importar as taxas: {e}")
         else: # "Planilha de Orçamento (Mensal)"
-            resultados = analisar_planilha_orcamento(temp_path)
+            ano_orcamento = st.number_input("Ano do orçamento:", min_value=2000, max_value=2100,
+                                            value=datetime.date.today().year, step=1, key='ano_orcamento')
+            # A planilha de orçamento usa apenas o primeiro arquivo
+            nome_orcamento, conteudo_orcamento, _ = conteudos_transacoes[0]
+            with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(nome_orcamento)[1]) as tmp_file:
+                tmp_file.write(conteudo_orcamento)
+            resultados = analisar_planilha_orcamento(tmp_file.name, ano=int(ano_orcamento))
+            os.unlink(tmp_file.name)
     
     captured_text = console_output.getvalue()
-    
-    if resultados and "error" in resultados:
-        st.error(f"**Ocorreu um erro ao processar a planilha:**\n{resultados['error']}")
-        if captured_text:
-            st.subheader("Detalhes do Console (para depuração):")
-            st.code(captured_text)
-    elif resultados:
-        st.success("Análise concluída com sucesso!")
-        
-        st.header("Sumário Geral")
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Total a Receber", resultados['Resumo Geral']['Total a Receber'])
-        with col2:
-            st.metric("Total a Pagar", resultados['Resumo Geral']['Total a Pagar'])
-        with col3:
-            st.metric("Saldo Total", resultados['Resumo Geral']['Saldo Total'])
-
-        st.header("Transações por Tipo")
-        df_tipo = pd.DataFrame(list(resultados['Transações por Tipo'].items()), columns=['Tipo', 'Total'])
-        st.table(df_tipo)
-
-        if isinstance(resultados['Saldo por Conta Bancária'], dict):
-            st.header("Saldo por Conta Bancária")
-            df_contas = pd.DataFrame(list(resultados['Saldo por Conta Bancária'].items()), columns=['Conta', 'Saldo'])
-            st.table(df_contas)
-        else:
-            st.info(resultados['Saldo por Conta Bancária'])
 
-        st.header("Transações por Mês")
-        if isinstance(resultados['Transações por Mês'], dict):
-            df_mes = pd.DataFrame(list(resultados['Transações por Mês'].items()), columns=['Mês/Ano', 'Total'])
-            st.table(df_mes)
+    # --- NOVO: A análise de transações roda em segundo plano, indexada pelo hash dos arquivos ---
+    # Enviar de novo os mesmos arquivos (ou qualquer re-run) reaproveita o trabalho existente.
+    # O resultado completo é calculado uma vez (0 = todas) e o slider só recorta a exibição.
+    if tipo_planilha_selecionado == "Planilha de Transações":
+        # O histórico de impressões é de cada usuário (ou sessão) e as taxas mudam com o tempo: os dois
+        # entram na chave, para um trabalho nunca ser entregue a outro usuário nem usar taxas antigas
+        if 'id_visitante' not in st.session_state:
+            st.session_state.id_visitante = secrets.token_hex(8)
+        dono_trabalho = f"usuario={username}" if username else f"visitante={st.session_state.id_visitante}"
+        chave_trabalho = hash_arquivo("|".join(
+            [h for _, _, h in conteudos_transacoes]
+            + [f"historico={ignorar_importadas}", dono_trabalho, f"cambio={tabela_cambio.versao()}"]
+        ).encode('utf-8'))
+        chave_analise = chave_trabalho
+        # Os mesmos arquivos já analisados por este usuário abrem da cópia salva, sem reler as planilhas
+        resultados_salvos = carregar_analise_salva(username, chave_trabalho) if username else None
+        trabalho = None
+        if resultados_salvos is None:
+            trabalho = fila_analises.submeter(
+                chave_trabalho, analisar_conteudos_transacoes, conteudos_transacoes,
+                historico=historico, tabela_cambio=tabela_cambio
+            )
+        if trabalho is not None and not trabalho.finalizado:
+            acompanhar_trabalho(trabalho)
+            st.stop() # Os resultados aparecem quando o fragmento detecta o fim do trabalho
+
+        if trabalho is None:
+            resultados = dict(resultados_salvos)
+            st.caption("Estes arquivos já tinham sido analisados: resultado carregado da análise salva.")
         else:
-            st.info(resultados['Transações por Mês'])
-
-        if isinstance(resultados["Transações por Mês"], dict):
-            st.subheader("Gráfico: Saldo por Mês")
-            df_grafico = pd.DataFrame({
-                "Mês": list(resultados["Transações por Mês"].keys()),
-                "Valor": [float(v.replace("R$", "").replace(".", "").replace(",", ".")) for v in resultados["Transações por Mês"].values()]
-            })
-
-            fig, ax = plt.subplots()
-            df_grafico.plot(x="Mês", y="Valor", kind="bar", ax=ax, color="skyblue", legend=False)
-            ax.set_ylabel("Valor (R$)")
-            ax.set_title("Evolução Financeira Mensal")
-            plt.xticks(rotation=45)
-            st.pyplot(fig)
-
-        st.header("Detalhes das Transações")
-        st.write("As tabelas abaixo mostram as transações detalhadas, limitadas ao número selecionado no slider no começo da página.")
-        # --- AJUSTE: Novas abas e título dinâmico para o dataframe ---
-        # Adicionado uma terceira aba para "Despesas por Descrição"
-        tab1, tab2, tab3 = st.tabs(["Receitas Detalhadas", "Despesas Detalhadas", "Despesas por Descrição"])
-
-        with tab1:
-            # Título dinâmico baseado na seleção do slider
-            st.subheader(f"Receitas ({'Todas' if (tipo_planilha_selecionado == 'Planilha de Transações' and num_transacoes_exibir == 0) else f'Primeiras {num_transacoes_exibir}' if tipo_planilha_selecionado == 'Planilha de Transações' else 'Primeiras 10'})")
-            if not resultados['Detalhes das Transações (Receitas)'].empty:
-                st.dataframe(resultados['Detalhes das Transações (Receitas)'])
-            else:
-                st.info("Nenhuma receita encontrada.")
-        with tab2:
-            # Título dinâmico baseado na seleção do slider
-            st.subheader(f"Despesas ({'Todas' if (tipo_planilha_selecionado == 'Planilha de Transações' and num_transacoes_exibir == 0) else f'Primeiras {num_transacoes_exibir}' if tipo_planilha_selecionado == 'Planilha de Transações' else 'Primeiras 10'})")
-            if not resultados['Detalhes das Transações (Despesas)'].empty:
-                st.dataframe(resultados['Detalhes das Transações (Despesas)'])
+            captured_text += trabalho.log.getvalue()
+            if trabalho.estado == "erro":
+                resultados = {"error": trabalho.erro}
             else:
-                st.info("Nenhuma despesa encontrada.")
-        with tab3:
-            st.subheader("Despesas Agrupadas por Descrição")
-            # --- NOVO: Exibe o agrupamento por descrição ---
-            if isinstance(resultados['Despesas Agrupadas por Descrição'], pd.DataFrame):
-                if not resultados['Despesas Agrupadas por Descrição'].empty:
-                    st.dataframe(resultados['Despesas Agrupadas por Descrição'])
-                else:
-                    st.info("Nenhuma despesa com descrição encontrada para agrupar.")
-            else:
-                st.info(resultados['Despesas Agrupadas por Descrição']) # Mensagem se 'descricao' não foi encontrada
-        
-        if captured_text:
-            st.subheader("Logs da Análise:")
-            st.code(captured_text)
-    else:
-        st.error("Ocorreu um erro desconhecido durante a análise da planilha.")
-        if captured_text:
-            st.subheader("Detalhes do Console (para depuração):")
-            st.code(captured_text)
+                resultados = dict(trabalho.resultados) # Cópia: o resultado é compartilhado entre re-runs
+                if username and "error" not in resultados:
+                    try:
+                        analises_salvas.salvar(username, chave_trabalho, resultados,
+                                               arquivos=[nome for nome, _, _ in conteudos_transacoes])
+                    except Exception as e:
+                        st.warning(f"Não foi possível salvar a análise para as próximas visitas: {e}")
+        if "error" not in resultados and num_transacoes_exibir != 0:
+            for chave_detalhes in ('Detalhes das Transações (Receitas)', 'Detalhes das Transações (Despesas)'):
+                resultados[chave_detalhes] = resultados[chave_detalhes].head(num_transacoes_exibir)
+
+elif tipo_planilha_selecionado == "Planilha de Transações" and username:
+    # Sem upload: reabre a análise salva mais recente do usuário (ou outra escolhida)
+    analises_usuario = analises_salvas.listar(username)
+    if analises_usuario:
+        st.subheader("Análises Salvas")
+        analise_escolhida = st.selectbox(
+            "Reabrir análise:", analises_usuario, key='analise_salva',
+            format_func=lambda a: f"{datetime.datetime.fromtimestamp(a['salvo_em']):%d/%m/%Y %H:%M} - "
+                                  f"{', '.join(a['arquivos'])} ({a['transacoes']:,} transações)"
+        )
+        num_transacoes_exibir = st.slider(
+            "Número de transações a exibir (0 = Todas):",
+            0, 500, 10, step=10,
+            key='slider_transacoes'
+        )
+        chave_analise = analise_escolhida['chave']
+        resultados_salvos = carregar_analise_salva(username, analise_escolhida['chave'])
+        if resultados_salvos is not None:
+            resultados = dict(resultados_salvos)
+            if num_transacoes_exibir != 0:
+                for chave_detalhes in ('Detalhes das Transações (Receitas)', 'Detalhes das Transações (Despesas)'):
+                    resultados[chave_detalhes] = resultados[chave_detalhes].head(num_transacoes_exibir)
+
+if resultados and "error" in resultados:
+    st.error(f"**Ocorreu um erro ao processar a planilha:**\n{resultados['error']}")
+    if captured_text:
+        st.subheader("Detalhes do Console (para depuração):")
+        st.code(captured_text)
+elif resultados:
+    st.success("Análise concluída com sucesso!")
     
-    os.unlink(temp_path)
+    st.header("Sumário Geral")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total a Receber", resultados['Resumo Geral']['Total a Receber'])
+    with col2:
+        st.metric("Total a Pagar", resultados['Resumo Geral']['Total a Pagar'])
+    with col3:
+        st.metric("Saldo Total", resultados['Resumo Geral']['Saldo Total'])
+
+    if resultados.get('Duplicatas Removidas'):
+        st.info(f"{resultados['Duplicatas Removidas']} transação(ões) duplicada(s) entre extratos foram ignoradas no cálculo.")
+
+    st.header("Transações por Tipo")
+    df_tipo = pd.DataFrame(list(resultados['Transações por Tipo'].items()), columns=['Tipo', 'Total'])
+    st.table(df_tipo)
+
+    if isinstance(resultados['Saldo por Conta Bancária'], dict):
+        st.header("Saldo por Conta Bancária")
+        df_contas = pd.DataFrame(list(resultados['Saldo por Conta Bancária'].items()), columns=['Conta', 'Saldo'])
+        st.table(df_contas)
+    else:
+        st.info(resultados['Saldo por Conta Bancária'])
+
+    st.header("Transações por Mês")
+    if isinstance(resultados['Transações por Mês'], dict):
+        df_mes = pd.DataFrame(list(resultados['Transações por Mês'].items()), columns=['Mês/Ano', 'Total'])
+        st.table(df_mes)
+    else:
+        st.info(resultados['Transações por Mês'])
+
+    if isinstance(resultados["Transações por Mês"], dict):
+        st.subheader("Gráfico: Saldo por Mês")
+        df_grafico = pd.DataFrame({
+            "Mês": list(resultados["Transações por Mês"].keys()),
+            "Valor": [float(v.replace("R$", "").replace(".", "").replace(",", ".")) for v in resultados["Transações por Mês"].values()]
+        })
+
+        fig, ax = plt.subplots()
+        df_grafico.plot(x="Mês", y="Valor", kind="bar", ax=ax, color="skyblue", legend=False)
+        ax.set_ylabel("Valor (R$)")
+        ax.set_title("Evolução Financeira Mensal")
+        plt.xticks(rotation=45)
+        st.pyplot(fig)
+
+    st.header("Detalhes das Transações")
+    st.write("As tabelas abaixo mostram as transações detalhadas, limitadas ao número selecionado no slider no começo da página.")
+    # --- AJUSTE: Novas abas e título dinâmico para o dataframe ---
+    # Adicionado uma terceira aba para "Despesas por Descrição"
+    tab1, tab2, tab3 = st.tabs(["Receitas Detalhadas", "Despesas Detalhadas", "Despesas por Descrição"])
+
+    with tab1:
+        # Título dinâmico baseado na seleção do slider
+        st.subheader(f"Receitas ({'Todas' if (tipo_planilha_selecionado == 'Planilha de Transações' and num_transacoes_exibir == 0) else f'Primeiras {num_transacoes_exibir}' if tipo_planilha_selecionado == 'Planilha de Transações' else 'Primeiras 10'})")
+        if not resultados['Detalhes das Transações (Receitas)'].empty:
+            st.dataframe(resultados['Detalhes das Transações (Receitas)'])
+        else:
+            st.info("Nenhuma receita encontrada.")
+    with tab2:
+        # Título dinâmico baseado na seleção do slider
+        st.subheader(f"Despesas ({'Todas' if (tipo_planilha_selecionado == 'Planilha de Transações' and num_transacoes_exibir == 0) else f'Primeiras {num_transacoes_exibir}' if tipo_planilha_selecionado == 'Planilha de Transações' else 'Primeiras 10'})")
+        if not resultados['Detalhes das Transações (Despesas)'].empty:
+            st.dataframe(resultados['Detalhes das Transações (Despesas)'])
+        else:
+            st.info("Nenhuma despesa encontrada.")
+    with tab3:
+        st.subheader("Despesas Agrupadas por Descrição")
+        # --- NOVO: Exibe o agrupamento por descrição ---
+        if isinstance(resultados['Despesas Agrupadas por Descrição'], pd.DataFrame):
+            if not resultados['Despesas Agrupadas por Descrição'].empty:
+                st.dataframe(resultados['Despesas Agrupadas por Descrição'])
+            else:
+                st.info("Nenhuma despesa com descrição encontrada para agrupar.")
+        else:
+            st.info(resultados['Despesas Agrupadas por Descrição']) # Mensagem se 'descricao' não foi encontrada
     
+    # --- NOVO: Comparativo Orçamento x Realizado ---
+    if isinstance(resultados.get('Transações Normalizadas'), pd.DataFrame):
+        st.header("Orçamento x Realizado")
+        arquivos_orcamento = st.file_uploader(
+            "Planilhas de Orçamento (Mensal) para comparar (uma por ano):",
+            type=["xlsx", "xls"], accept_multiple_files=True, key='uploader_orcamento'
+        )
+        if arquivos_orcamento:
+            # O comparativo vive na sessão: re-runs só recalculam os meses que mudaram
+            if 'comparativo_orcamento' not in st.session_state:
+                st.session_state.comparativo_orcamento = ComparativoOrcamento()
+                st.session_state.orcamentos_definidos = {} # ano -> hash da planilha que definiu o orçamento
+            comparativo = st.session_state.comparativo_orcamento
+            orcamentos_definidos = st.session_state.orcamentos_definidos
+
+            orcamentos_atuais = {} # ano -> (hash, arquivo) das planilhas enviadas agora
+            arquivos_por_ano = {} # ano -> nomes das planilhas que indicam esse ano
+            for arquivo_orcamento in arquivos_orcamento:
+                ano_no_nome = re.search(r'(19|20)\d{2}', arquivo_orcamento.name)
+                ano_arquivo = st.number_input(
+                    f"Ano do orçamento '{arquivo_orcamento.name}':", min_value=2000, max_value=2100,
+                    value=int(ano_no_nome.group(0)) if ano_no_nome else datetime.date.today().year,
+                    step=1, key=f"ano_{arquivo_orcamento.name}"
+                )
+                orcamentos_atuais[int(ano_arquivo)] = (hash_arquivo(arquivo_orcamento.getvalue()), arquivo_orcamento)
+                arquivos_por_ano.setdefault(int(ano_arquivo), []).append(arquivo_orcamento.name)
+
+            # Duas planilhas para o mesmo ano: nenhuma é aplicada (não há como saber qual vale)
+            for ano_repetido, nomes_repetidos in arquivos_por_ano.items():
+                if len(nomes_repetidos) > 1:
+                    del orcamentos_atuais[ano_repetido]
+                    st.error(f"As planilhas {', '.join(nomes_repetidos)} indicam o mesmo ano ({ano_repetido}). "
+                             "Altere o ano de uma delas ou remova uma do envio; até lá o ano fica sem orçamento.")
+
+            # Anos cuja planilha saiu do upload (ou teve o ano alterado) deixam de ter orçamento
+            for ano_definido in [a for a in orcamentos_definidos if a not in orcamentos_atuais]:
+                comparativo.remover_orcamento(ano_definido)
+                del orcamentos_definidos[ano_definido]
+
+            for ano_orcamento_atual, (hash_orcamento, arquivo_orcamento) in orcamentos_atuais.items():
+                if orcamentos_definidos.get(ano_orcamento_atual) == hash_orcamento:
+                    continue
+                with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(arquivo_orcamento.name)[1]) as tmp_orcamento:
+                    tmp_orcamento.write(arquivo_orcamento.getvalue())
+                df_orcamento = ler_planilha_orcamento(tmp_orcamento.name, ano_orcamento_atual)
+                os.unlink(tmp_orcamento.name)
+                if isinstance(df_orcamento, dict):
+                    st.error(df_orcamento['error'])
+                    if orcamentos_definidos.pop(ano_orcamento_atual, None) is not None:
+                        comparativo.remover_orcamento(ano_orcamento_atual) # Não mantém o orçamento da planilha anterior
+                    continue
+                comparativo.definir_orcamento(df_orcamento, ano_orcamento_atual)
+                orcamentos_definidos[ano_orcamento_atual] = hash_orcamento
+
+            meses_recalculados = comparativo.atualizar_realizado(resultados['Transações Normalizadas'])
+            if meses_recalculados:
+                st.caption(f"Meses recalculados: {', '.join(str(m) for m in meses_recalculados)}")
+
+            df_comparativo = comparativo.comparativo()
+            if df_comparativo.empty:
+                st.info("Nenhum mês em comum entre o orçamento e as transações.")
+            else:
+                df_comparativo = df_comparativo.assign(mes_ano=df_comparativo['mes_ano'].astype(str))
+                st.dataframe(df_comparativo.style.format({
+                    'orcado': "R$ {:,.2f}", 'realizado': "R$ {:,.2f}", 'variacao': "R$ {:,.2f}",
+                    'percentual_consumido': "{:.1f}%"
+                }, na_rep="-"))
+
+    # --- NOVO: Exportação das transações normalizadas e dos agrupamentos ---
+    if isinstance(resultados.get('Transações Normalizadas'), pd.DataFrame):
+        st.header("Exportar Resultados")
+        formato_exportacao = st.selectbox("Formato:", list(FORMATOS_EXPORTACAO.keys()), key='formato_exportacao')
+        # Uma pasta temporária por sessão, apagada quando a sessão termina (TemporaryDirectory)
+        if 'pasta_exportacao' not in st.session_state:
+            st.session_state.pasta_exportacao = tempfile.TemporaryDirectory(prefix="exportacao_")
+        if st.session_state.get('chave_exportacao') != chave_analise:
+            limpar_exportacao(chave_analise) # Outra análise: os arquivos da anterior não são mais oferecidos
+        if st.button("Preparar arquivos para download", key='botao_exportar'):
+            # Os arquivos são gravados em disco por blocos e só então oferecidos para download
+            limpar_exportacao(chave_analise)
+            st.session_state.arquivos_exportados = exportar_resultados(
+                resultados['Transações Normalizadas'], formato_exportacao, st.session_state.pasta_exportacao.name
+            )
+        for nome_arquivo, caminho_exportado, mime in st.session_state.get('arquivos_exportados', []):
+            if os.path.exists(caminho_exportado):
+                with open(caminho_exportado, 'rb') as arquivo_exportado:
+                    st.download_button(f"⬇️ {nome_arquivo}", arquivo_exportado, file_name=nome_arquivo,
+                                       mime=mime, key=f"download_{nome_arquivo}")
+
+    if captured_text:
+        st.subheader("Logs da Análise:")
+        st.code(captured_text)
+elif uploaded_files:
+    st.error("Ocorreu um erro desconhecido durante a análise da planilha.")
+    if captured_text:
+        st.subheader("Detalhes do Console (para depuração):")
+        st.code(captured_text)
+
 st.sidebar.markdown("### Créditos")
 st.sidebar.write("Este aplicativo foi desenvolvido por Danillo Wozniak Soares.")
 st.sidebar.markdown("---")
 st.sidebar.markdown("### Sobre o Aplicativo")
 st.sidebar.write("Este aplicativo permite analisar suas finanças pessoais a partir de uma planilha de transações financeiras.")
 st.sidebar.markdown("### Como Usar")
-st.sidebar.write("1. Faça upload de uma planilha no formato Excel (.xlsx, .xls) ou CSV (.csv).")
+st.sidebar.write("1. Faça upload de uma ou mais planilhas no formato Excel (.xlsx, .xls) ou CSV (.csv).")
 st.sidebar.write("2. **Selecione o tipo de planilha que você está enviando** (Transações ou Orçamento).")
 st.sidebar.write("3. O aplicativo irá gerar um resumo detalhado das suas finanças.")
 st.sidebar.markdown("### Requisitos da planilha de Transações:")
@@ -432,6 +437,7 @@ st.sidebar.write("- **Data**: Data da transação (pode ser chamado de 'data_tra
 st.sidebar.write("- **Tipo**: Tipo da transação (pode ser chamado de 'categoria', 'natureza', etc.)")
 st.sidebar.write("- **Conta Bancária**: (opcional) Conta bancária associada à transação (pode ser chamado de 'conta', 'conta_bancaria', etc.)")
 st.sidebar.write("- **Descrição**: Uma breve descrição da transação.")
+st.sidebar.write("- **Moeda**: (opcional) Código da moeda da transação (ex.: BRL, USD, EUR). Valores em outras moedas são convertidos para BRL.")
 st.sidebar.markdown("### Requisitos da planilha de Orçamento (Mensal):")
 st.sidebar.write("A planilha **deve ser um arquivo Excel (.xlsx ou .xls)** e seguir o formato de orçamento mensal (categorias em linhas, meses em colunas), com as seções de Despesas e Receitas bem definidas. A coluna dos meses deve conter os nomes dos meses em português.")
 st.sidebar.markdown("### Recursos")
@@ -441,6 +447,10 @@ st.sidebar.write("- Saldo por Conta Bancária (se disponível e aplicável)")
 st.sidebar.write("- Detalhes das Transações (número de linhas configurável)") # Ajustado
 st.sidebar.write("- Despesas Agrupadas por Descrição") # Novo
 st.sidebar.write("- Transações por Mês")
+st.sidebar.write("- Remoção de transações duplicadas entre extratos com períodos sobrepostos") # Novo
+st.sidebar.write("- Exportação em CSV, Excel (XLSX) ou Parquet") # Novo
+st.sidebar.write("- Orçamento x Realizado por categoria e mês (vários anos)") # Novo
+st.sidebar.write("- Análises salvas por usuário, reabertas na próxima visita sem reenviar a planilha") # Novo
 st.sidebar.markdown("### Contato") 
 st.sidebar.write("Para feedback ou sugestões, entre em contato com o desenvolvedor.")
 st.sidebar.markdown("### Licença")
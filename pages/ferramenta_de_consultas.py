@@ -1,14 +1,22 @@
 import streamlit as st
-import requests
 import json
 import pandas as pd
-import yfinance as yf
 import plotly.express as px
 import io
 import env # Para manipulação de imagens (ícones do clima, pôsteres)
-import random # Importado para gerar números aleatórios
+from cliente_http import ErroConsulta # Sessão HTTP compartilhada com timeouts e novas tentativas
+from cotacoes import buscar_cotacoes, normalizar_simbolos # Cotações de vários símbolos em um único download
+from clima import buscar_clima, buscar_clima_cidades, mensagem_erro_clima, tabela_comparativa_clima # Clima de uma ou várias cidades
+from conteudo_aleatorio import TIPOS_CONTEUDO, obter_reserva # Fatos/citações/piadas buscados antecipadamente
+from filmes import buscar_titulo, miniatura_poster, obter_indice_filmes, pesquisar as pesquisar_filmes # Busca na OMDb com índice local
+from gravacao_http import ativar_transporte # Gravação/reprodução das respostas HTTP para testes offline
+from carteira import avaliar_arquivo_carteira # Avaliação de carteira com cotações em lote
+from cambio import TabelaCambio, matriz_cambio, obter_taxas_atuais, taxas_mais_recentes # Taxas cruzadas a partir de uma única tabela de câmbio
+from historico_precos import PERIODOS, FonteFixture, obter_historico_precos # Histórico local de preços (OHLCV)
+from sessoes import restaurar_sessao # Login restaurado a partir do token da URL
 
 st.set_page_config(page_title="Meu Portfólio de APIs", layout="wide")
+restaurar_sessao() # Mantém o login ao recarregar, abrir em outra aba ou trocar de página
 
 st.title("🚀 Meu Portfólio de Aplicativos de API")
 st.markdown("Explore diferentes ferramentas de consulta de dados em tempo real.")
@@ -28,6 +36,15 @@ EXCHANGERATE_API_KEY = env.EXCHANGERATE_API_KEY if hasattr(env, 'EXCHANGERATE_AP
 # 3. OMDb API Key (para Buscador de Filmes/Séries)
 OMDB_API_KEY = env.OMDB_API_KEY if hasattr(env, 'OMDB_API_KEY') else "SUA_CHAVE_OMDB_AQUI"
 
+# 4. Gravação/reprodução das respostas (opcional, ver gravacao_http.py)
+#    MODO_HTTP = "gravar" salva as respostas reais como fixtures; "reproduzir" responde a partir delas, sem rede.
+@st.cache_resource
+def configurar_transporte_http(modo, diretorio):
+    return ativar_transporte(modo, diretorio, segredos=[OPENWEATHER_API_KEY, EXCHANGERATE_API_KEY, OMDB_API_KEY])
+
+if hasattr(env, 'MODO_HTTP'):
+    configurar_transporte_http(env.MODO_HTTP, getattr(env, 'DIRETORIO_GRAVACOES_HTTP', "fixtures/http"))
+
 # --- Navegação na Barra Lateral ---
 st.sidebar.title("Escolha uma Ferramenta")
 app_mode = st.sidebar.radio(
@@ -44,46 +61,61 @@ if app_mode == "☀️ Consulta de Clima":
     st.header("☀️ Consulta de Clima")
     st.markdown("Obtenha informações do clima em tempo real para qualquer cidade do mundo.")
 
-    city = st.text_input("Nome da Cidade:", "São Paulo", key="weather_city_input")
+    weather_mode = st.radio("Modo:", ("Uma Cidade", "Painel de Cidades"), horizontal=True, key="weather_mode")
 
-    @st.cache_data(ttl=3600) # Cache por 1 hora para dados de clima
+    # Cache persistente por 1 hora para dados de clima (ver clima.py e cache_respostas.py)
     def get_weather_data(city_name, api_key):
-        BASE_URL = "http://api.openweathermap.org/data/2.5/weather"
-        params = {
-            "q": city_name,
-            "appid": api_key,
-            "units": "metric", # Celsius
-            "lang": "pt_br"   # Português
-        }
         try:
-            response = requests.get(BASE_URL, params=params)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.HTTPError as http_err:
-            if response.status_code == 401: st.error("Erro na API: Chave de API OpenWeatherMap inválida ou ausente.")
-            elif response.status_code == 404: st.error(f"Erro: Cidade '{city_name}' não encontrada.")
-            else: st.error(f"Erro HTTP inesperado: {http_err}")
+            return buscar_clima(city_name, api_key)
+        except ErroConsulta as e:
+            st.error(mensagem_erro_clima(e, city_name))
             return None
-        except requests.exceptions.RequestException as e: st.error(f"Ocorreu um erro na requisição: {e}"); return None
-
-    if st.button("Consultar Clima", key="weather_button"):
-        if OPENWEATHER_API_KEY == "SUA_CHAVE_OPENWEATHER_AQUI" or not OPENWEATHER_API_KEY:
-            st.warning("Por favor, insira sua chave de API do OpenWeatherMap no código.")
-        elif city:
-            with st.spinner(f"Buscando clima para {city}..."):
-                weather_data = get_weather_data(city, OPENWEATHER_API_KEY)
-                if weather_data:
-                    st.subheader(f"Clima em {weather_data['name']}, {weather_data['sys']['country']}")
-                    col1, col2, col3 = st.columns(3)
-                    with col1: st.metric("Temperatura", f"{weather_data['main']['temp']:.1f}°C")
-                    with col2: st.metric("Sensação Térmica", f"{weather_data['main']['feels_like']:.1f}°C")
-                    with col3: st.metric("Umidade", f"{weather_data['main']['humidity']}%")
-                    st.write(f"**Condição:** {weather_data['weather'][0]['description'].capitalize()}")
-                    st.write(f"**Velocidade do Vento:** {weather_data['wind']['speed']:.1f} m/s")
-                    icon_code = weather_data['weather'][0]['icon']
-                    icon_url = f"http://openweathermap.org/img/wn/{icon_code}@2x.png"
-                    st.image(icon_url, width=100)
-        else: st.warning("Por favor, digite o nome de uma cidade.")
+
+    if weather_mode == "Uma Cidade":
+        city = st.text_input("Nome da Cidade:", "São Paulo", key="weather_city_input")
+
+        if st.button("Consultar Clima", key="weather_button"):
+            if OPENWEATHER_API_KEY == "SUA_CHAVE_OPENWEATHER_AQUI" or not OPENWEATHER_API_KEY:
+                st.warning("Por favor, insira sua chave de API do OpenWeatherMap no código.")
+            elif city:
+                with st.spinner(f"Buscando clima para {city}..."):
+                    weather_data = get_weather_data(city, OPENWEATHER_API_KEY)
+                    if weather_data:
+                        st.subheader(f"Clima em {weather_data['name']}, {weather_data['sys']['country']}")
+                        col1, col2, col3 = st.columns(3)
+                        with col1: st.metric("Temperatura", f"{weather_data['main']['temp']:.1f}°C")
+                        with col2: st.metric("Sensação Térmica", f"{weather_data['main']['feels_like']:.1f}°C")
+                        with col3: st.metric("Umidade", f"{weather_data['main']['humidity']}%")
+                        st.write(f"**Condição:** {weather_data['weather'][0]['description'].capitalize()}")
+                        st.write(f"**Velocidade do Vento:** {weather_data['wind']['speed']:.1f} m/s")
+                        icon_code = weather_data['weather'][0]['icon']
+                        icon_url = f"http://openweathermap.org/img/wn/{icon_code}@2x.png"
+                        st.image(icon_url, width=100)
+            else: st.warning("Por favor, digite o nome de uma cidade.")
+
+    else:
+        cities_text = st.text_area("Cidades (uma por linha):", "São Paulo\nRio de Janeiro\nCuritiba\nLisboa",
+                                   key="weather_cities_input")
+
+        if st.button("Consultar Painel", key="weather_dashboard_button"):
+            cities = [c for c in cities_text.splitlines() if c.strip()]
+            if OPENWEATHER_API_KEY == "SUA_CHAVE_OPENWEATHER_AQUI" or not OPENWEATHER_API_KEY:
+                st.warning("Por favor, insira sua chave de API do OpenWeatherMap no código.")
+            elif cities:
+                # Todas as cidades em paralelo, com concorrência limitada (ver clima.py)
+                with st.spinner(f"Buscando clima para {len(cities)} cidade(s)..."):
+                    results = buscar_clima_cidades(cities, OPENWEATHER_API_KEY)
+                comparison = tabela_comparativa_clima(results)
+                if not comparison.empty:
+                    st.subheader("Comparativo entre Cidades")
+                    st.dataframe(comparison.set_index("Cidade"), use_container_width=True)
+                    fig = px.bar(comparison, x="Cidade", y=["Temperatura (°C)", "Sensação Térmica (°C)"],
+                                 barmode="group", title="Temperatura por Cidade")
+                    st.plotly_chart(fig, use_container_width=True)
+                for _city, _data, error in results:
+                    if error:
+                        st.error(error)
+            else: st.warning("Por favor, digite ao menos uma cidade.")
 
 # --- Seção: Conversor de Moedas ---
 elif app_mode == "💱 Conversor de Moedas":
@@ -91,101 +123,202 @@ elif app_mode == "💱 Conversor de Moedas":
     st.markdown("Converta valores entre diferentes moedas com taxas de câmbio atualizadas.")
 
     # Lista de moedas comuns (pode ser expandida)
-    common_currencies = ["USD", "EUR", "BRL", "GBP", "JPY", "CAD", "AUD", "CHF"]
+    common_currencies = ["USD", "EUR", "BRL", "GBP", "JPY", "CAD", "AUD", "CHF", "CNY", "ARS", "MXN"]
     
     amount = st.number_input("Valor a Converter:", min_value=0.01, value=1.0, step=0.01, key="currency_amount")
     from_currency = st.selectbox("De:", options=common_currencies, index=0, key="from_currency") # USD
     to_currency = st.selectbox("Para:", options=common_currencies, index=2, key="to_currency") # BRL
 
-    @st.cache_data(ttl=3600) # Cache por 1 hora para taxas de câmbio
-    def get_exchange_rate(from_curr, to_curr, api_key):
+    # Uma única tabela latest/{base} (cache persistente de 1 hora) alimenta todas as taxas cruzadas
+    def get_rate_matrix(api_key):
         if not api_key or api_key == "SUA_CHAVE_EXCHANGERATE_AQUI":
             st.error("Chave de API ExchangeRate-API inválida ou ausente.")
             return None
-        API_URL = f"https://v6.exchangerate-api.com/v6/{api_key}/pair/{from_curr}/{to_curr}"
         try:
-            response = requests.get(API_URL)
-            response.raise_for_status()
-            data = response.json()
-            if data["result"] == "success":
-                return data["conversion_rate"]
-            else:
-                st.error(f"Erro na API de Câmbio: {data.get('error-type', 'Erro desconhecido')}")
-                return None
-        except requests.exceptions.RequestException as e:
-            st.error(f"Ocorreu um erro na requisição de câmbio: {e}")
+            return matriz_cambio(obter_taxas_atuais(api_key), common_currencies)
+        except ValueError as e:
+            st.error(str(e))
             return None
+        except ErroConsulta as e:
+            st.error(e.mensagem)
+            return None
+
+    col_convert, col_convert_all = st.columns(2)
+    with col_convert:
+        convert_pair = st.button("Converter", key="convert_button")
+    with col_convert_all:
+        convert_all = st.button("Converter para Todas as Moedas", key="convert_all_button")
 
-    if st.button("Converter", key="convert_button"):
+    if convert_pair or convert_all:
         if EXCHANGERATE_API_KEY == "SUA_CHAVE_EXCHANGERATE_AQUI" or not EXCHANGERATE_API_KEY:
             st.warning("Por favor, insira sua chave de API do ExchangeRate-API no código.")
         else:
             with st.spinner("Convertendo..."):
-                rate = get_exchange_rate(from_currency, to_currency, EXCHANGERATE_API_KEY)
-                if rate:
+                matrix = get_rate_matrix(EXCHANGERATE_API_KEY)
+            if matrix is not None:
+                if convert_pair:
+                    rate = matrix.loc[from_currency, to_currency]
                     converted_amount = amount * rate
                     st.success(f"{amount:.2f} {from_currency} = **{converted_amount:.2f} {to_currency}**")
                     st.info(f"Taxa de Câmbio: 1 {from_currency} = {rate:.4f} {to_currency}")
+                else:
+                    # A linha da moeda de origem já traz a taxa para todas as outras
+                    all_rates = matrix.loc[from_currency].drop(from_currency)
+                    st.subheader(f"{amount:.2f} {from_currency} em todas as moedas")
+                    st.dataframe(
+                        pd.DataFrame({"Taxa": all_rates, "Valor Convertido": all_rates * amount}),
+                        use_container_width=True
+                    )
+
+                with st.expander("Matriz de taxas cruzadas (linha = de, coluna = para)"):
+                    st.dataframe(matrix.style.format("{:.4f}"), use_container_width=True)
 
 # --- Seção: Cotação de Ações/Criptomoedas ---
 elif app_mode == "📈 Cotação de Ações/Criptomoedas":
     st.header("📈 Cotação de Ações e Criptomoedas")
     st.markdown("Obtenha cotações em tempo real e gráficos de histórico de preços.")
 
-    symbol = st.text_input("Símbolo (Ex: AAPL, PETR4.SA, BTC-USD):", "AAPL", key="stock_symbol")
+    stock_mode = st.radio("Modo:", ("Cotações", "Carteira"), horizontal=True, key="stock_mode")
 
-    @st.cache_data(ttl=600) # Cache por 10 minutos para cotações
-    def get_stock_data(symbol_name):
-        try:
-            ticker = yf.Ticker(symbol_name)
-            info = ticker.info
-            if not info or 'regularMarketPrice' not in info:
-                return None, None # Retorna None se não encontrar dados
-            hist = ticker.history(period="7d")
-            return info, hist
-        except Exception as e:
-            st.error(f"Erro ao buscar dados para '{symbol_name}': {e}")
-            return None, None
-
-    if st.button("Consultar Cotação", key="stock_button"):
-        if symbol:
-            with st.spinner(f"Buscando dados para {symbol}..."):
-                info, hist = get_stock_data(symbol)
-                
-                if info:
-                    st.subheader(f"Cotação de {info.get('longName', symbol)}")
-                    
-                    price = info.get('regularMarketPrice')
-                    previous_close = info.get('previousClose')
-                    
-                    if price and previous_close:
-                        change = price - previous_close
-                        change_percent = (change / previous_close) * 100
-                        
+    # Fonte offline opcional: defina DIRETORIO_FIXTURE_PRECOS no env.py com CSVs <SIMBOLO>.csv
+    price_source = FonteFixture(env.DIRETORIO_FIXTURE_PRECOS) if hasattr(env, 'DIRETORIO_FIXTURE_PRECOS') else None
+
+    if stock_mode == "Cotações":
+        symbols_text = st.text_input("Símbolos separados por vírgula (Ex: AAPL, PETR4.SA, BTC-USD):", "AAPL", key="stock_symbol")
+
+        period = st.radio("Período do gráfico:", list(PERIODOS), index=0, horizontal=True, key="stock_period")
+
+        # Todos os símbolos em um único download em lote (ver cotacoes.py); o histórico fica salvo
+        # localmente e só os dias que faltam são baixados (ver historico_precos.py)
+        def get_stock_data(symbols):
+            try:
+                return buscar_cotacoes(symbols, historico=obter_historico_precos(price_source), periodo=period)
+            except Exception as e:
+                st.error(f"Erro ao buscar dados para '{', '.join(symbols)}': {e}")
+                return pd.DataFrame(), {}, list(symbols)
+
+        if st.button("Consultar Cotação", key="stock_button"):
+            symbols = normalizar_simbolos(symbols_text)
+            if symbols:
+                with st.spinner(f"Buscando dados para {', '.join(symbols)}..."):
+                    quotes, histories, not_found = get_stock_data(symbols)
+
+                if len(quotes) == 1:
+                    quote = quotes.iloc[0]
+                    symbol = quote['simbolo']
+                    st.subheader(f"Cotação de {symbol}")
+
+                    if pd.notna(quote['variacao']):
                         st.metric(
                             label="Preço Atual",
-                            value=f"{price:.2f}",
-                            delta=f"{change:.2f} ({change_percent:.2f}%)"
+                            value=f"{quote['preco']:.2f}",
+                            delta=f"{quote['variacao']:.2f} ({quote['variacao_percentual']:.2f}%)"
                         )
                     else:
-                        st.write(f"Preço Atual: {price:.2f}")
-
-                    st.write(f"**Volume:** {info.get('regularMarketVolume', 'N/A'):,}")
-                    st.write(f"**Máxima do Dia:** {info.get('regularMarketDayHigh', 'N/A'):.2f}")
-                    st.write(f"**Mínima do Dia:** {info.get('regularMarketDayLow', 'N/A'):.2f}")
-                    
-                    # Gráfico de histórico (últimos 7 dias)
-                    if hist is not None and not hist.empty:
-                        st.subheader("Histórico de Preços (Últimos 7 Dias)")
-                        fig = px.line(hist, y="Close", title=f"Preço de Fechamento de {symbol}")
-                        st.plotly_chart(fig, use_container_width=True)
-                    else:
-                        st.info("Histórico de preços não disponível para o símbolo selecionado.")
+                        st.write(f"Preço Atual: {quote['preco']:.2f}")
 
-                else:
-                    st.error(f"Símbolo '{symbol}' não encontrado ou dados indisponíveis.")
+                    st.write(f"**Volume:** {quote['volume']:,.0f}" if pd.notna(quote['volume']) else "**Volume:** N/A")
+                    st.write(f"**Máxima do Dia:** {quote['maxima_dia']:.2f}")
+                    st.write(f"**Mínima do Dia:** {quote['minima_dia']:.2f}")
+
+                    # Gráfico de histórico no período escolhido
+                    st.subheader(f"Histórico de Preços ({period})")
+                    fig = px.line(histories[symbol], y="Close", title=f"Preço de Fechamento de {symbol}")
+                    st.plotly_chart(fig, use_container_width=True)
+
+                elif len(quotes) > 1:
+                    st.subheader("Cotações")
+                    st.dataframe(
+                        quotes.set_index('simbolo').rename(columns={
+                            'moeda': "Moeda", 'preco': "Preço", 'fechamento_anterior': "Fech. Anterior", 'variacao': "Variação",
+                            'variacao_percentual': "Variação (%)", 'maxima_dia': "Máxima do Dia",
+                            'minima_dia': "Mínima do Dia", 'volume': "Volume", 'data': "Data"
+                        }),
+                        use_container_width=True
+                    )
+                    # Símbolos com preços em escalas diferentes: compara a evolução em base 100
+                    st.subheader(f"Desempenho no Período ({period}, base 100)")
+                    comparison = pd.DataFrame({
+                        s: h['Close'] / h['Close'].iloc[0] * 100 for s, h in histories.items()
+                    })
+                    fig = px.line(comparison, labels={'value': "Base 100", 'variable': "Símbolo"})
+                    st.plotly_chart(fig, use_container_width=True)
+
+                if not_found:
+                    st.error(f"Símbolo(s) não encontrado(s) ou dados indisponíveis: {', '.join(not_found)}.")
                     st.info("Verifique o símbolo (ex: AAPL, PETR4.SA para B3, BTC-USD para cripto).")
-        else: st.warning("Por favor, digite um símbolo de ação ou criptomoeda.")
+            else: st.warning("Por favor, digite um símbolo de ação ou criptomoeda.")
+
+    else:
+        st.markdown("Envie um arquivo (CSV ou Excel) com as colunas **simbolo**, **quantidade**, **custo_medio** "
+                    "e, opcionalmente, **moeda** (moeda do custo médio). O preço é convertido pela moeda da cotação "
+                    "(ex.: USD para AAPL, BRL para PETR4.SA); sem a coluna, o custo é considerado na mesma moeda.")
+        holdings_file = st.file_uploader("Arquivo de posições:", type=["csv", "xlsx", "xls"], key="portfolio_file")
+        decimal_separators = {"Automático": None, "Vírgula (1.234,56)": ',', "Ponto (1,234.56)": '.'}
+        decimal_separator = st.radio(
+            "Separador decimal dos números do arquivo:", list(decimal_separators), horizontal=True,
+            key="portfolio_decimal_separator",
+            help="No modo automático, valores como 1.500 (1,5 ou 1.500?) são recusados para você escolher o formato."
+        )
+
+        # Taxas para converter tudo em BRL: a tabela latest/USD da ExchangeRate-API (uma chamada, em cache)
+        # ou, sem chave de API, as últimas taxas da tabela local de câmbio
+        def get_portfolio_rates():
+            if EXCHANGERATE_API_KEY and EXCHANGERATE_API_KEY != "SUA_CHAVE_EXCHANGERATE_AQUI":
+                try:
+                    return obter_taxas_atuais(EXCHANGERATE_API_KEY)
+                except (ErroConsulta, ValueError) as e:
+                    st.warning(f"Usando a tabela local de câmbio: {e}")
+            return taxas_mais_recentes(TabelaCambio())
+
+        if holdings_file is not None and st.button("Avaliar Carteira", key="portfolio_button"):
+            with st.spinner("Buscando cotações e avaliando a carteira..."):
+                try:
+                    positions, totals, missing_quotes, missing_rates, mismatched_currencies = avaliar_arquivo_carteira(
+                        holdings_file, get_portfolio_rates(), nome_arquivo=holdings_file.name,
+                        historico=obter_historico_precos(price_source),
+                        separador_decimal=decimal_separators[decimal_separator]
+                    )
+                except ValueError as e:
+                    st.error(str(e))
+                    positions = None
+                except Exception as e:
+                    st.error(f"Erro ao avaliar a carteira: {e}")
+                    positions = None
+
+            if positions is not None:
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Valor de Mercado (BRL)", f"R$ {totals['valor_mercado']:,.2f}")
+                with col2:
+                    st.metric("Resultado (BRL)", f"R$ {totals['resultado']:,.2f}",
+                              delta=f"{totals['resultado_percentual']:.2f}%" if totals['resultado_percentual'] is not None else None)
+                with col3:
+                    st.metric("Variação do Dia (BRL)", f"R$ {totals['variacao_dia']:,.2f}",
+                              delta=f"{totals['variacao_dia_percentual']:.2f}%" if totals['variacao_dia_percentual'] is not None else None)
+
+                st.subheader(f"Posições ({totals['posicoes']})")
+                st.dataframe(
+                    positions.rename(columns={
+                        'simbolo': "Símbolo", 'quantidade': "Quantidade", 'custo_medio': "Custo Médio",
+                        'moeda': "Moeda (Custo)", 'moeda_cotacao': "Moeda (Cotação)",
+                        'preco': "Preço", 'fechamento_anterior': "Fech. Anterior", 'valor_mercado': "Valor (BRL)",
+                        'custo_total': "Custo (BRL)", 'resultado': "Resultado (BRL)", 'resultado_percentual': "Resultado (%)",
+                        'variacao_dia': "Variação Dia (BRL)", 'variacao_dia_percentual': "Variação Dia (%)", 'peso': "Peso (%)"
+                    }),
+                    use_container_width=True, hide_index=True
+                )
+                weights = positions.dropna(subset=['valor_mercado'])
+                if not weights.empty:
+                    fig = px.pie(weights, names='simbolo', values='valor_mercado', title="Composição da Carteira (BRL)")
+                    st.plotly_chart(fig, use_container_width=True)
+                if missing_quotes:
+                    st.warning(f"Sem cotação para: {', '.join(missing_quotes)}.")
+                if missing_rates:
+                    st.warning(f"Sem taxa de câmbio para: {', '.join(missing_rates)}.")
+                if mismatched_currencies:
+                    st.warning("Moeda do arquivo diferente da moeda da cotação (o preço foi convertido pela moeda "
+                               f"da cotação e o custo pela do arquivo; confira): {', '.join(mismatched_currencies)}.")
 
 # --- Seção: Fatos/Citações/Piadas Aleatórias ---
 elif app_mode == "💡 Fatos/Citações/Piadas Aleatórias":
@@ -194,132 +327,125 @@ elif app_mode == "💡 Fatos/Citações/Piadas Aleatórias":
 
     content_type = st.radio(
         "O que você quer gerar?",
-        ("Fato Aleatório", "Citação Aleatória", "Piada Aleatória"),
+        TIPOS_CONTEUDO,
         key="random_content_type"
     )
 
-    # ATENÇÃO: Usamos um argumento de "sal" aleatório para forçar a invalidação do cache.
-    @st.cache_data(ttl=None) # ttl=None significa que ele não expira automaticamente
-    def get_random_content(content_type_selected, cache_buster): # Adiciona cache_buster como um argumento
-        if content_type_selected == "Fato Aleatório":
-            API_URL = "http://numbersapi.com/random/trivia"
-            try:
-                response = requests.get(API_URL)
-                response.raise_for_status()
-                return response.text # Numbers API retorna texto puro (em inglês)
-            except requests.exceptions.RequestException as e: 
-                st.error(f"Erro ao buscar fato: {e}")
-                st.info("Verifique sua conexão com a internet. O conteúdo de fatos é em inglês e não há uma alternativa simples e gratuita em português para esta API.")
-                return None
-        
-        elif content_type_selected == "Citação Aleatória":
-            API_URL = "https://api.quotable.io/random"
-            try:
-                response = requests.get(API_URL)
-                response.raise_for_status()
-                data = response.json()
-                return f"“{data['content']}” — {data['author']}"
-            except requests.exceptions.ConnectionError:
-                st.error("Erro de conexão: Não foi possível conectar ao servidor de citações. Verifique sua conexão com a internet ou tente novamente mais tarde.")
-                return None
-            except requests.exceptions.Timeout:
-                st.error("Tempo limite da requisição excedido ao buscar citação. Tente novamente.")
-                return None
-            except requests.exceptions.RequestException as e: 
-                st.error(f"Erro ao buscar citação: {e}")
-                st.info("Ocorreu um problema ao buscar a citação. Verifique sua conexão com a internet ou tente novamente mais tarde.")
-                return None
-        
-        elif content_type_selected == "Piada Aleatória":
-            # Nova API para piadas que suporta português
-            API_URL = "https://v2.jokeapi.dev/joke/Any"
-            params = {"lang": "pt", "blacklistFlags": "nsfw,religious,political,racist,sexist,explicit"}
-            try:
-                response = requests.get(API_URL, params=params)
-                response.raise_for_status()
-                data = response.json()
-                if data["type"] == "single":
-                    return data["joke"]
-                elif data["type"] == "twopart":
-                    return f"{data['setup']}\n\n{data['delivery']}"
-                else:
-                    return "Não foi possível obter uma piada."
-            except requests.exceptions.RequestException as e: 
-                st.error(f"Erro ao buscar piada: {e}")
-                st.info("Verifique sua conexão com a internet ou tente novamente mais tarde.")
-                return None
-        return None
+    # Reserva de itens já buscados, reposta em segundo plano (ver conteudo_aleatorio.py).
+    # Obtida já ao abrir a seção, para que a reposição comece antes do primeiro clique.
+    content_pool = obter_reserva(content_type)
 
     if st.button("Gerar Conteúdo", key="generate_random_content"):
-        # Gera um número aleatório para ser o 'cache_buster'.
-        # Isso garante que a função 'get_random_content' seja sempre chamada com um argumento diferente,
-        # forçando o Streamlit a re-executar a função e buscar um novo conteúdo.
-        random_salt = random.random() 
-        with st.spinner("Gerando..."):
-            content = get_random_content(content_type, random_salt) # Passa o 'sal' aleatório
-            if content:
-                st.info(content)
-                if content_type == "Fato Aleatório":
-                    st.caption("Nota: Fatos aleatórios são fornecidos em inglês pela API (Numbers API) e não há uma alternativa simples e gratuita em português para esta funcionalidade.")
+        content, source = content_pool.obter()
+        st.info(content)
+        if source == 'offline':
+            st.caption("Não foi possível acessar a API agora; este conteúdo veio do acervo offline do aplicativo.")
+        if content_type == "Fato Aleatório":
+            st.caption("Nota: Fatos aleatórios são fornecidos em inglês pela API (Numbers API) e não há uma alternativa simples e gratuita em português para esta funcionalidade.")
 
 # --- Seção: Buscador de Filmes/Séries ---
 elif app_mode == "🎬 Buscador de Filmes/Séries":
     st.header("🎬 Buscador de Filmes e Séries")
     st.markdown("Encontre informações detalhadas sobre seus filmes e séries favoritos.")
 
+    movie_mode = st.radio("Modo:", ("Título Exato", "Pesquisar Títulos"), horizontal=True, key="movie_mode")
     search_query = st.text_input("Nome do Filme/Série:", "Inception", key="movie_search_query")
+    movie_index = obter_indice_filmes() # Índice local dos títulos já vistos (ver filmes.py)
+
+    def show_poster(movie_data):
+        # Miniatura baixada uma vez e servida do disco
+        poster_path = miniatura_poster(movie_data.get('Poster'))
+        if poster_path:
+            st.image(poster_path, caption=movie_data.get('Title'), use_container_width=True)
+        else:
+            st.info("Pôster não disponível.")
 
-    @st.cache_data(ttl=86400) # Cache por 24 horas para dados de filmes
+    def show_movie_details(movie_data):
+        st.write(f"**Gênero:** {movie_data.get('Genre')}")
+        st.write(f"**Diretor:** {movie_data.get('Director')}")
+        st.write(f"**Atores:** {movie_data.get('Actors')}")
+        st.write(f"**Avaliação IMDb:** {movie_data.get('imdbRating')}")
+        st.write(f"**Enredo:** {movie_data.get('Plot')}")
+        st.write(f"**Prêmios:** {movie_data.get('Awards')}")
+
+    # Cache persistente por 24 horas para dados de filmes
     def search_movie_omdb(query, api_key):
         if not api_key or api_key == "SUA_CHAVE_OMDB_AQUI":
             st.error("Chave de API OMDb inválida ou ausente.")
             return None
-        BASE_URL = "http://www.omdbapi.com/"
-        params = {
-            "apikey": api_key,
-            "t": query, # Busca por título exato
-            "plot": "full", # Traz a sinopse completa
-            "r": "json" # Retorna em JSON
-        }
         try:
-            response = requests.get(BASE_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
-            if data.get("Response") == "True":
-                return data
-            else:
-                st.error(f"Filme/Série '{query}' não encontrado(a).")
-                return None
-        except requests.exceptions.RequestException as e:
-            st.error(f"Ocorreu um erro na requisição: {e}")
+            data = buscar_titulo(query, api_key) # Busca por título exato
+        except ErroConsulta as e:
+            st.error(e.mensagem)
+            return None
+        if data is None:
+            st.error(f"Filme/Série '{query}' não encontrado(a).")
             return None
+        movie_index.registrar_detalhes(data)
+        return data
 
-    if st.button("Buscar", key="movie_search_button"):
-        if OMDB_API_KEY == "SUA_CHAVE_OMDB_AQUI" or not OMDB_API_KEY:
-            st.warning("Por favor, insira sua chave de API do OMDb no código.")
-        elif search_query:
-            with st.spinner(f"Buscando {search_query}..."):
-                movie_data = search_movie_omdb(search_query, OMDB_API_KEY)
-                if movie_data:
-                    st.subheader(f"{movie_data.get('Title')} ({movie_data.get('Year')})")
-                    
-                    col_img, col_details = st.columns([1, 2])
-                    
-                    with col_img:
-                        poster_url = movie_data.get('Poster')
-                        if poster_url and poster_url != "N/A":
-                            st.image(poster_url, caption=movie_data.get('Title'), use_container_width=True)
-                        else:
-                            st.info("Pôster não disponível.")
-                    
-                    with col_details:
-                        st.write(f"**Gênero:** {movie_data.get('Genre')}")
-                        st.write(f"**Diretor:** {movie_data.get('Director')}")
-                        st.write(f"**Atores:** {movie_data.get('Actors')}")
-                        st.write(f"**Avaliação IMDb:** {movie_data.get('imdbRating')}")
-                        st.write(f"**Enredo:** {movie_data.get('Plot')}")
-                        st.write(f"**Prêmios:** {movie_data.get('Awards')}")
-        else: st.warning("Por favor, digite o nome de um filme ou série.")
+    if movie_mode == "Título Exato":
+        if st.button("Buscar", key="movie_search_button"):
+            if OMDB_API_KEY == "SUA_CHAVE_OMDB_AQUI" or not OMDB_API_KEY:
+                st.warning("Por favor, insira sua chave de API do OMDb no código.")
+            elif search_query:
+                with st.spinner(f"Buscando {search_query}..."):
+                    movie_data = search_movie_omdb(search_query, OMDB_API_KEY)
+                    if movie_data:
+                        st.subheader(f"{movie_data.get('Title')} ({movie_data.get('Year')})")
+
+                        col_img, col_details = st.columns([1, 2])
+                        with col_img:
+                            show_poster(movie_data)
+                        with col_details:
+                            show_movie_details(movie_data)
+            else: st.warning("Por favor, digite o nome de um filme ou série.")
+
+    else:
+        col_pages, col_details_count = st.columns(2)
+        with col_pages:
+            pages = st.slider("Páginas de resultados (10 por página):", 1, 5, 1, key="movie_search_pages")
+        with col_details_count:
+            details_count = st.slider("Títulos com detalhes completos:", 0, 10, 5, key="movie_details_count")
+        force_upstream = st.checkbox("Consultar a OMDb mesmo se o índice local tiver resultados",
+                                     key="movie_force_upstream")
+
+        if st.button("Pesquisar", key="movie_list_search_button"):
+            if OMDB_API_KEY == "SUA_CHAVE_OMDB_AQUI" or not OMDB_API_KEY:
+                st.warning("Por favor, insira sua chave de API do OMDb no código.")
+            elif search_query:
+                with st.spinner(f"Pesquisando {search_query}..."):
+                    try:
+                        results, origin = pesquisar_filmes(search_query, OMDB_API_KEY, movie_index, pages,
+                                                           details_count, force_upstream)
+                    except ErroConsulta as e:
+                        st.error(e.mensagem)
+                        results, origin = [], None
+
+                if results:
+                    st.caption("Resultados do índice local (sem consulta à OMDb)." if origin == 'indice'
+                               else "Resultados da OMDb (agora também no índice local).")
+                    for movie in results[:details_count]:
+                        details = movie.get('detalhes') or movie
+                        with st.expander(f"{movie['Title']} ({movie.get('Year')})", expanded=False):
+                            col_img, col_details = st.columns([1, 2])
+                            with col_img:
+                                show_poster(details)
+                            with col_details:
+                                if movie.get('detalhes'):
+                                    show_movie_details(details)
+                                else:
+                                    st.info("Detalhes indisponíveis no momento.")
+                    if len(results) > details_count:
+                        st.subheader("Demais Resultados")
+                        st.dataframe(
+                            pd.DataFrame(results[details_count:])[['Title', 'Year', 'Type', 'imdbID']]
+                            .rename(columns={'Title': "Título", 'Year': "Ano", 'Type': "Tipo", 'imdbID': "IMDb"}),
+                            use_container_width=True, hide_index=True
+                        )
+                elif origin is not None:
+                    st.error(f"Nenhum título encontrado para '{search_query}'.")
+            else: st.warning("Por favor, digite o nome de um filme ou série.")
 
 st.markdown("---")
 st.markdown("Este portfólio demonstra a integração com diversas APIs externas.")
@@ -1,7 +1,9 @@
 import streamlit as st
 import random
+from sessoes import restaurar_sessao # Login restaurado a partir do token da URL
 
 st.set_page_config(page_title="Gerador de CPF e CNPJ", layout="centered")
+restaurar_sessao() # Mantém o login ao recarregar, abrir em outra aba ou trocar de página
 
 st.title("🔢 Gerador de CPF e CNPJ Válidos")
 st.markdown("Gere números de CPF e CNPJ sintéticos e válidos para testes ou demonstrações.")
@@ -2,8 +2,10 @@ import streamlit as st
 import qrcode
 from PIL import Image
 import io
+from sessoes import restaurar_sessao # Login restaurado a partir do token da URL
 
 st.set_page_config(page_title="Gerador de QR Code Personalizado", layout="centered")
+restaurar_sessao() # Mantém o login ao recarregar, abrir em outra aba ou trocar de página
 
 st.title("📸 Gerador de QR Code Personalizado")
 st.markdown("Insira qualquer texto ou URL para gerar seu QR Code.")
@@ -1,8 +1,10 @@
 import streamlit as st
 import random
 import string
+from sessoes import restaurar_sessao # Login restaurado a partir do token da URL
 
 st.set_page_config(page_title="Gerador de Senha Forte", layout="centered")
+restaurar_sessao() # Mantém o login ao recarregar, abrir em outra aba ou trocar de página
 
 st.title("🔒 Gerador de Senha Forte")
 st.markdown("Crie senhas seguras e aleatórias para proteger suas contas online.")
@@ -0,0 +1,85 @@
+import streamlit as st
+import pandas as pd
+import hmac
+import env # Token de administração e porta do exportador
+from metricas import obter_metricas # Registro de métricas das chamadas externas
+from sessoes import restaurar_sessao # Login restaurado a partir do token da URL
+
+st.set_page_config(page_title="Métricas (Admin)", layout="wide")
+restaurar_sessao() # Mantém o login ao recarregar, abrir em outra aba ou trocar de página
+
+# Página oculta: o link não aparece na barra lateral e o conteúdo exige o token de administração.
+# Acesse pela URL: /metricas_admin?token=<METRICAS_ADMIN_TOKEN definido no env.py>
+ocultar_link_css = """
+    <style>
+        [data-testid="stSidebarNav"] a[href$="metricas_admin"] {
+            display: none !important;
+        }
+    </style>
+"""
+st.markdown(ocultar_link_css, unsafe_allow_html=True)
+
+ADMIN_TOKEN = env.METRICAS_ADMIN_TOKEN if hasattr(env, 'METRICAS_ADMIN_TOKEN') else None
+
+# Comparação em tempo constante, para o token não ser descoberto pelo tempo de resposta
+if not ADMIN_TOKEN or not hmac.compare_digest(st.query_params.get("token", "").encode('utf-8'),
+                                              str(ADMIN_TOKEN).encode('utf-8')):
+    st.error("Página não encontrada.")
+    st.stop()
+
+st.title("📊 Métricas das Chamadas Externas")
+st.markdown("Latência, erros, volume e cache das APIs usadas pelas ferramentas (desde o início do processo).")
+
+metrics = obter_metricas()
+
+# --- Latência por endpoint ---
+st.subheader("Latência por Endpoint")
+latencies = pd.DataFrame(metrics.resumo_latencias())
+if latencies.empty:
+    st.info("Nenhuma chamada externa registrada ainda.")
+else:
+    st.dataframe(
+        latencies.rename(columns={
+            'servico': "Serviço", 'endpoint': "Endpoint", 'requisicoes': "Requisições",
+            'p50_ms': "p50 (ms)", 'p95_ms': "p95 (ms)", 'p99_ms': "p99 (ms)", 'media_ms': "Média (ms)"
+        }).style.format({"p50 (ms)": "{:.1f}", "p95 (ms)": "{:.1f}", "p99 (ms)": "{:.1f}", "Média (ms)": "{:.1f}"}),
+        use_container_width=True, hide_index=True
+    )
+
+# --- Erros e volume ---
+col_errors, col_bytes = st.columns(2)
+with col_errors:
+    st.subheader("Erros")
+    errors = pd.DataFrame(metrics.resumo_erros()).rename(columns={'servico': "Serviço", 'tipo': "Tipo", 'quantidade': "Quantidade"})
+    if errors.empty:
+        st.success("Nenhum erro registrado.")
+    else:
+        st.dataframe(errors, use_container_width=True, hide_index=True)
+with col_bytes:
+    st.subheader("Bytes Recebidos")
+    received = pd.DataFrame([{"Serviço": linha['servico'], "KiB": linha['bytes'] / 1024} for linha in metrics.resumo_bytes()])
+    if not received.empty:
+        st.dataframe(received.style.format({"KiB": "{:,.1f}"}), use_container_width=True, hide_index=True)
+
+# --- Cache de respostas ---
+st.subheader("Cache de Respostas")
+cache = pd.DataFrame(metrics.resumo_cache())
+if cache.empty:
+    st.info("O cache de respostas ainda não foi consultado.")
+else:
+    st.dataframe(
+        cache.rename(columns={
+            'servico': "Serviço", 'fresco': "Acerto (fresco)", 'vencido': "Acerto (revalidando)",
+            'ausente': "Falta", 'taxa_acerto': "Taxa de Acerto"
+        }).style.format({"Taxa de Acerto": "{:.1%}"}),
+        use_container_width=True, hide_index=True
+    )
+
+# --- Exportação ---
+st.subheader("Formato Prometheus")
+if hasattr(env, 'METRICAS_PORTA'):
+    st.write(f"Exportador ativo em `http://127.0.0.1:{env.METRICAS_PORTA}/metrics`.")
+else:
+    st.write("Defina `METRICAS_PORTA` no env.py para expor `/metrics` a um servidor Prometheus.")
+st.download_button("Baixar métricas (texto Prometheus)", metrics.exportar_prometheus(),
+                   file_name="metricas.prom", mime="text/plain")
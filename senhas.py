@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Hash e verificação de senhas (bcrypt) num pool limitado de threads.
+
+O bcrypt é caro de propósito. Rodando na thread do script do Streamlit, uma
+rajada de logins enfileira esse trabalho e trava as demais sessões atendidas
+pelo mesmo processo. Aqui o trabalho vai para um pool com número fixo de
+threads (o bcrypt libera o GIL enquanto calcula) e uma fila limitada: acima do
+limite a tentativa é recusada na hora com `SistemaOcupado`, em vez de acumular
+espera sem fim.
+
+O custo do bcrypt vem da configuração (BCRYPT_CUSTO no env.py). No login, um
+hash gravado com custo diferente do configurado é refeito com o custo atual e
+devolvido para ser salvo (rehash transparente).
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as TempoEsgotado
+
+import bcrypt
+
+CUSTO_PADRAO = 12
+# Tempo máximo (s) de espera por um hash/verificação já aceito no pool
+TIMEOUT_OPERACAO = 30.0
+
+
+class SistemaOcupado(Exception):
+    """A fila de hash/verificação de senhas está cheia."""
+
+
+def custo_do_hash(hash_senha):
+    """
+    Custo (log2 das rodadas) gravado num hash bcrypt ($2b$<custo>$...).
+    """
+    if isinstance(hash_senha, str):
+        hash_senha = hash_senha.encode('utf-8')
+    return int(hash_senha.split(b'$')[2])
+
+
+class PoolSenhas:
+    """
+    Executa bcrypt em `workers` threads, com até `tamanho_fila` operações aguardando.
+    """
+
+    def __init__(self, workers=None, tamanho_fila=32, custo=CUSTO_PADRAO):
+        self.workers = workers or os.cpu_count() or 2
+        self.tamanho_fila = tamanho_fila
+        self.custo = custo
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        self._vagas = threading.BoundedSemaphore(self.workers + tamanho_fila)
+
+    def _executar(self, funcao, *args):
+        if not self._vagas.acquire(blocking=False):
+            raise SistemaOcupado("Muitas tentativas de login ao mesmo tempo. Tente novamente em instantes.")
+        futuro = self._executor.submit(funcao, *args)
+        futuro.add_done_callback(lambda _f: self._vagas.release())
+        try:
+            return futuro.result(timeout=TIMEOUT_OPERACAO)
+        except TempoEsgotado:
+            # A operação continua no pool e libera a vaga ao terminar; quem espera recebe a mesma recusa
+            raise SistemaOcupado("O login está demorando mais que o normal. Tente novamente em instantes.") from None
+
+    def gerar_hash(self, senha):
+        """
+        Returns:
+            bytes: Hash bcrypt da senha com o custo configurado.
+
+        Raises:
+            SistemaOcupado: Se a fila estiver cheia ou a operação passar de TIMEOUT_OPERACAO.
+        """
+        return self._executar(self._gerar_hash, senha)
+
+    def _gerar_hash(self, senha):
+        return bcrypt.hashpw(senha.encode('utf-8'), bcrypt.gensalt(rounds=self.custo))
+
+    def verificar(self, senha, hash_senha):
+        """
+        Confere a senha e, se ela estiver correta mas o hash usar outro custo, gera um novo hash.
+
+        Returns:
+            tuple: (senha_correta, novo_hash ou None). Quando houver novo hash, ele deve ser salvo.
+
+        Raises:
+            SistemaOcupado: Se a fila estiver cheia ou a operação passar de TIMEOUT_OPERACAO.
+        """
+        return self._executar(self._verificar, senha, hash_senha)
+
+    def _verificar(self, senha, hash_senha):
+        if isinstance(hash_senha, str):
+            hash_senha = hash_senha.encode('utf-8')
+        if not bcrypt.checkpw(senha.encode('utf-8'), hash_senha):
+            return False, None
+        if custo_do_hash(hash_senha) != self.custo:
+            return True, self._gerar_hash(senha)
+        return True, None
+
+    def encerrar(self):
+        self._executor.shutdown(wait=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def obter_pool_senhas():
+    """
+    Retorna o pool de senhas do processo, configurado pelo env.py (BCRYPT_CUSTO,
+    BCRYPT_WORKERS, BCRYPT_FILA) quando presentes.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            import env
+            _pool = PoolSenhas(
+                workers=getattr(env, 'BCRYPT_WORKERS', None),
+                tamanho_fila=getattr(env, 'BCRYPT_FILA', 32),
+                custo=getattr(env, 'BCRYPT_CUSTO', CUSTO_PADRAO),
+            )
+        return _pool
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Serviço HTTP local para análise de planilhas de transações.
+
+Executa as mesmas funções da página do Streamlit (analise_planilhas.py), mas fora
+de uma sessão do navegador: o upload é recebido por HTTP, a análise roda num pool
+limitado de processos e o resultado volta em JSON.
+
+Controle de carga:
+- no máximo `--workers` análises simultâneas (uma por processo);
+- até `--fila` uploads aguardando na fila;
+- além disso o serviço responde 503 com Retry-After (backpressure), em vez de
+  acumular trabalho sem limite.
+
+Uso:
+    python servico_analise.py --porta 8600 --workers 4 --fila 16
+
+    curl -X POST --data-binary @extrato.csv "http://localhost:8600/analisar?nome=extrato.csv&num=10"
+"""
+
+import os
+import io
+import json
+import argparse
+import tempfile
+import threading
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+
+# Tamanho máximo aceito para uma planilha enviada (bytes)
+TAMANHO_MAXIMO_UPLOAD = 50 * 1024 * 1024
+EXTENSOES_SUPORTADAS = ('.xlsx', '.xls', '.csv')
+
+
+def _para_json(valor):
+    """
+    Converte os resultados da análise (dicts, DataFrames, Periods) em tipos serializáveis.
+    """
+    if isinstance(valor, pd.DataFrame):
+        return json.loads(valor.to_json(orient='records', date_format='iso', force_ascii=False))
+    if isinstance(valor, dict):
+        return {str(chave): _para_json(v) for chave, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_para_json(v) for v in valor]
+    if hasattr(valor, 'item'): # Escalares do numpy
+        return valor.item()
+    return valor
+
+
+def analisar_upload(conteudo, nome_arquivo, num_transacoes_exibir=10):
+    """
+    Analisa o conteúdo de uma planilha enviada. Executada dentro de um processo do pool.
+
+    Returns:
+        dict: Resultados serializáveis em JSON (ou {"error": ...}) e o log da análise.
+    """
+    # Importado aqui para que cada processo do pool carregue o módulo uma única vez
+    from analise_planilhas import analisar_extratos_transacoes
+    from cambio import TabelaCambio
+    from deduplicacao import hash_arquivo
+
+    sufixo = os.path.splitext(nome_arquivo)[1].lower()
+    with tempfile.NamedTemporaryFile(delete=False, suffix=sufixo) as tmp_file:
+        tmp_file.write(conteudo)
+        temp_path = tmp_file.name
+
+    log = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(log):
+            resultados = analisar_extratos_transacoes(
+                [(temp_path, hash_arquivo(conteudo))],
+                num_transacoes_exibir=num_transacoes_exibir,
+                tabela_cambio=TabelaCambio()
+            )
+        resultados = dict(resultados)
+        # As transações normalizadas completas podem ser enormes; o JSON leva só os resumos
+        resultados.pop('Transações Normalizadas', None)
+        return {"resultados": _para_json(resultados), "log": log.getvalue()}
+    finally:
+        os.unlink(temp_path)
+
+
+class ServicoAnalise:
+    """
+    Pool de processos com fila limitada. `submeter` devolve None quando a fila está cheia.
+    """
+
+    def __init__(self, workers, tamanho_fila):
+        self.workers = workers
+        self.tamanho_fila = tamanho_fila
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self._vagas = threading.BoundedSemaphore(workers + tamanho_fila)
+        self._lock = threading.Lock()
+        self.em_andamento = 0
+        self.rejeitadas = 0
+        self.concluidas = 0
+
+    def submeter(self, conteudo, nome_arquivo, num_transacoes_exibir):
+        if not self._vagas.acquire(blocking=False):
+            with self._lock:
+                self.rejeitadas += 1
+            return None
+        with self._lock:
+            self.em_andamento += 1
+        futuro = self.executor.submit(analisar_upload, conteudo, nome_arquivo, num_transacoes_exibir)
+        futuro.add_done_callback(self._liberar)
+        return futuro
+
+    def _liberar(self, _futuro):
+        with self._lock:
+            self.em_andamento -= 1
+            self.concluidas += 1
+        self._vagas.release()
+
+    def status(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "tamanho_fila": self.tamanho_fila,
+                "em_andamento": self.em_andamento,
+                "concluidas": self.concluidas,
+                "rejeitadas": self.rejeitadas,
+            }
+
+    def encerrar(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+def criar_handler(servico, timeout_analise):
+    class HandlerAnalise(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _responder(self, status, corpo, cabecalhos=None):
+            dados = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(dados)))
+            for chave, valor in (cabecalhos or {}).items():
+                self.send_header(chave, valor)
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def do_GET(self):
+            if urlparse(self.path).path == "/saude":
+                self._responder(200, servico.status())
+            else:
+                self._responder(404, {"error": "Rota não encontrada."})
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path != "/analisar":
+                self._responder(404, {"error": "Rota não encontrada."})
+                return
+
+            parametros = parse_qs(url.query)
+            nome_arquivo = parametros.get("nome", [self.headers.get("X-Nome-Arquivo", "")])[0]
+            if not nome_arquivo.lower().endswith(EXTENSOES_SUPORTADAS):
+                self._responder(400, {"error": "Informe ?nome= com extensão .xlsx, .xls ou .csv."})
+                return
+            try:
+                num_transacoes_exibir = int(parametros.get("num", ["10"])[0])
+            except ValueError:
+                self._responder(400, {"error": "Parâmetro 'num' deve ser um número inteiro."})
+                return
+
+            try:
+                tamanho = int(self.headers.get("Content-Length", 0))
+            except ValueError:
+                self.close_connection = True # Sem um tamanho válido não dá para saber onde o corpo termina
+                self._responder(400, {"error": "Cabeçalho Content-Length inválido."})
+                return
+            if tamanho <= 0:
+                self._responder(400, {"error": "Corpo da requisição vazio: envie o conteúdo da planilha."})
+                return
+            if tamanho > TAMANHO_MAXIMO_UPLOAD:
+                self.close_connection = True
+                self._responder(413, {"error": "Arquivo maior que o limite aceito pelo serviço."})
+                return
+            conteudo = self.rfile.read(tamanho)
+
+            futuro = servico.submeter(conteudo, nome_arquivo, num_transacoes_exibir)
+            if futuro is None:
+                self._responder(503, {"error": "Serviço ocupado. Tente novamente em instantes."},
+                                {"Retry-After": "1"})
+                return
+            try:
+                resposta = futuro.result(timeout=timeout_analise)
+            except Exception as e:
+                self._responder(500, {"error": f"Falha na análise: {e}"})
+                return
+
+            status = 422 if "error" in resposta["resultados"] else 200
+            self._responder(status, resposta)
+
+        def log_message(self, formato, *args): # Silencia o log padrão por requisição
+            pass
+
+    return HandlerAnalise
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serviço HTTP de análise de planilhas financeiras.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8600)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2,
+                        help="Processos de análise simultâneos.")
+    parser.add_argument("--fila", type=int, default=16,
+                        help="Uploads aguardando além dos que estão em análise; acima disso responde 503.")
+    parser.add_argument("--timeout", type=float, default=120.0,
+                        help="Tempo máximo (s) de espera por uma análise.")
+    args = parser.parse_args()
+
+    servico = ServicoAnalise(args.workers, args.fila)
+    servidor = ThreadingHTTPServer((args.host, args.porta), criar_handler(servico, args.timeout))
+    servidor.daemon_threads = True
+    print(f"Serviço de análise em http://{args.host}:{args.porta} "
+          f"({args.workers} workers, fila de {args.fila})")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\nEncerrando...")
+    finally:
+        servidor.server_close()
+        servico.encerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+Tokens de sessão assinados (HMAC-SHA256) e com validade.
+
+Depois do login o app emite um token com o nome do usuário e a expiração,
+assinado com um segredo do servidor. Ao recarregar a página ou abrir outra aba,
+o token (guardado no parâmetro `sessao` da URL) é conferido localmente, sem
+bcrypt e sem ida ao banco de usuários: só um HMAC e uma consulta à lista de
+revogação. O logout revoga o token até ele expirar.
+
+Cada script do Streamlit (o app principal e todas as páginas em pages/) chama
+restaurar_sessao() no início: recarregar ou abrir uma página numa aba nova
+começa uma sessão vazia, e a troca de página descarta os parâmetros da URL.
+
+A lista de revogação fica num SQLite na pasta de dados (`sessoes_revogadas.sqlite`),
+compartilhada pelos processos e mantida entre reinícios: com um SESSAO_SEGREDO
+fixo, um token revogado não volta a valer depois de um restart.
+
+O segredo vem de SESSAO_SEGREDO no env.py. Sem ele, um segredo aleatório é
+gerado por processo, e os tokens deixam de valer quando o app reinicia.
+
+Atenção: por ficar na URL, o token aparece no histórico do navegador, em links
+copiados/compartilhados, em logs de proxies e servidores e pode seguir no
+cabeçalho Referer para sites externos. Quem obtiver a URL entra como o usuário
+até o logout ou a expiração. Por isso a validade é curta (SESSAO_DURACAO) e o
+logout revoga o token; não compartilhe a URL de uma sessão logada.
+"""
+
+import os
+import hmac
+import json
+import time
+import base64
+import sqlite3
+import hashlib
+import secrets
+import threading
+
+from configuracao import DIRETORIO_DADOS
+
+DURACAO_SESSAO = 8 * 3600 # segundos
+CAMINHO_REVOGADOS = os.path.join(DIRETORIO_DADOS, "sessoes_revogadas.sqlite")
+PARAMETRO_SESSAO = "sessao" # nome do parâmetro da URL que carrega o token
+
+
+def _b64(dados):
+    return base64.urlsafe_b64encode(dados).rstrip(b'=').decode('ascii')
+
+
+def _de_b64(texto):
+    return base64.urlsafe_b64decode(texto + '=' * (-len(texto) % 4))
+
+
+class GerenciadorSessoes:
+    """
+    Emite, valida e revoga tokens de sessão assinados com `segredo`.
+    Com `caminho_revogados`, a lista de revogação é gravada nesse SQLite; sem ele, fica só em memória.
+    """
+
+    def __init__(self, segredo, duracao=DURACAO_SESSAO, caminho_revogados=None):
+        self._segredo = segredo.encode('utf-8') if isinstance(segredo, str) else segredo
+        self.duracao = duracao
+        self.caminho_revogados = caminho_revogados
+        self._revogados = {} # id do token -> expiração (revogações já conhecidas por este processo)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if caminho_revogados:
+            os.makedirs(os.path.dirname(caminho_revogados) or ".", exist_ok=True)
+            with self._conexao() as conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS revogados (id TEXT PRIMARY KEY, expira REAL NOT NULL)")
+
+    def _conexao(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.caminho_revogados, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _revogado(self, id_token):
+        if id_token in self._revogados:
+            return True
+        if not self.caminho_revogados:
+            return False
+        # Revogado por outro processo ou antes de um reinício
+        linha = self._conexao().execute("SELECT expira FROM revogados WHERE id = ?", (id_token,)).fetchone()
+        if linha is None:
+            return False
+        with self._lock:
+            self._revogados[id_token] = linha[0]
+        return True
+
+    def _assinar(self, conteudo):
+        return hmac.new(self._segredo, conteudo, hashlib.sha256).digest()
+
+    def emitir(self, usuario):
+        """
+        Returns:
+            str: Token de sessão do usuário, válido por `duracao` segundos.
+        """
+        dados = {'u': usuario, 'exp': int(time.time()) + self.duracao, 'id': secrets.token_hex(8)}
+        conteudo = _b64(json.dumps(dados, separators=(',', ':')).encode('utf-8'))
+        return f"{conteudo}.{_b64(self._assinar(conteudo.encode('ascii')))}"
+
+    def _ler(self, token):
+        """
+        Confere assinatura e validade. Retorna os dados do token ou None.
+        """
+        try:
+            conteudo, assinatura = token.split('.')
+            if not hmac.compare_digest(_de_b64(assinatura), self._assinar(conteudo.encode('ascii'))):
+                return None
+            dados = json.loads(_de_b64(conteudo))
+        except (ValueError, AttributeError):
+            return None
+        if dados.get('exp', 0) <= time.time():
+            return None
+        return dados
+
+    def validar(self, token):
+        """
+        Returns:
+            str ou None: Nome do usuário se o token for autêntico, não expirado e não revogado.
+        """
+        dados = self._ler(token) if token else None
+        if dados is None or self._revogado(dados.get('id')):
+            return None
+        return dados.get('u')
+
+    def revogar(self, token):
+        """
+        Invalida o token até a expiração dele (logout). Tokens inválidos são ignorados.
+        """
+        dados = self._ler(token) if token else None
+        if dados is None:
+            return
+        agora = time.time()
+        with self._lock:
+            # A lista só guarda tokens ainda não expirados
+            for id_token in [i for i, expira in self._revogados.items() if expira <= agora]:
+                del self._revogados[id_token]
+            self._revogados[dados['id']] = dados['exp']
+        if self.caminho_revogados:
+            with self._conexao() as conn:
+                conn.execute("DELETE FROM revogados WHERE expira <= ?", (agora,))
+                conn.execute("INSERT OR REPLACE INTO revogados (id, expira) VALUES (?, ?)", (dados['id'], dados['exp']))
+
+
+_gerenciador = None
+_gerenciador_lock = threading.Lock()
+
+
+def restaurar_sessao():
+    """
+    Restaura o login da sessão do Streamlit a partir do token da URL e mantém o token na URL.
+    Um login cujo token foi revogado (logout em outra aba) ou expirou é encerrado.
+
+    Returns:
+        str ou None: Nome do usuário logado.
+    """
+    import streamlit as st
+
+    if 'logged_in' not in st.session_state:
+        st.session_state.logged_in = False
+    if 'username' not in st.session_state:
+        st.session_state.username = ""
+
+    token = st.session_state.get('session_token') if st.session_state.logged_in else st.query_params.get(PARAMETRO_SESSAO)
+    usuario = obter_sessoes().validar(token) # Só HMAC e lista de revogação, sem bcrypt nem banco
+    if usuario:
+        st.session_state.logged_in = True
+        st.session_state.username = usuario
+        st.session_state.session_token = token
+        if st.query_params.get(PARAMETRO_SESSAO) != token:
+            st.query_params[PARAMETRO_SESSAO] = token # Mantém o token na URL após trocar de página
+        return usuario
+    if st.session_state.logged_in:
+        st.session_state.logged_in = False
+        st.session_state.username = ""
+        st.session_state.session_token = None
+        if PARAMETRO_SESSAO in st.query_params:
+            del st.query_params[PARAMETRO_SESSAO]
+    return None
+
+
+def obter_sessoes():
+    """
+    Retorna o gerenciador de sessões do processo, com SESSAO_SEGREDO e
+    SESSAO_DURACAO do env.py quando presentes e a lista de revogação em CAMINHO_REVOGADOS.
+    """
+    global _gerenciador
+    with _gerenciador_lock:
+        if _gerenciador is None:
+            import env
+            _gerenciador = GerenciadorSessoes(
+                getattr(env, 'SESSAO_SEGREDO', None) or secrets.token_bytes(32),
+                duracao=getattr(env, 'SESSAO_DURACAO', DURACAO_SESSAO),
+                caminho_revogados=CAMINHO_REVOGADOS,
+            )
+        return _gerenciador
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Leitura dos números do arquivo de posições (carteira.py): separadores decimal e de milhar.
+"""
+
+import io
+
+import pytest
+
+from carteira import ler_carteira
+
+
+def _ler(custos, separador_decimal=None):
+    linhas = "\n".join(f"S{i};1;{custo}" for i, custo in enumerate(custos))
+    return ler_carteira(io.StringIO(f"simbolo;quantidade;custo_medio\n{linhas}\n"), "posicoes.csv",
+                        separador_decimal)['custo_medio'].tolist()
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("0.123", 0.123),         # Zero à esquerda: decimal, não milhar
+    ("0.500", 0.5),
+    ("150.25", 150.25),
+    ("1,5", 1.5),
+    ("1.234,56", 1234.56),    # Formato brasileiro
+    ("1,234.56", 1234.56),    # Formato americano
+    ("1.234.567", 1234567.0), # Separador repetido é de milhar
+    ("1,234,567", 1234567.0),
+    ("1.234.567,89", 1234567.89),
+    ("42", 42.0),
+])
+def test_modo_automatico(texto, esperado):
+    assert _ler([texto]) == [pytest.approx(esperado)]
+
+
+@pytest.mark.parametrize("texto", ["1.500", "1,500", "12.345", "-1.000"])
+def test_valores_ambiguos_sao_recusados(texto):
+    with pytest.raises(ValueError, match="ambíguo"):
+        _ler([texto])
+
+
+@pytest.mark.parametrize("texto, separador, esperado", [
+    ("1.500", '.', 1.5),
+    ("1.500", ',', 1500.0),
+    ("1,500", ',', 1.5),
+    ("1,500", '.', 1500.0),
+    ("1.234,56", ',', 1234.56),
+    ("1,234.56", '.', 1234.56),
+])
+def test_separador_informado(texto, separador, esperado):
+    assert _ler([texto], separador) == [pytest.approx(esperado)]
+
+
+def test_separador_invalido():
+    with pytest.raises(ValueError, match="Separador decimal"):
+        _ler(["1"], ';')
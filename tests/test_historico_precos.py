@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Testes offline do histórico local de preços (historico_precos.py), com FonteFixture.
+"""
+
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+import historico_precos
+from historico_precos import FonteFixture, HistoricoPrecos, diretorio_historico, obter_historico_precos
+
+
+def _gravar_csv(diretorio, simbolo, dias, inicio=None):
+    inicio = inicio or pd.Timestamp.now().normalize() - pd.Timedelta(days=dias - 1)
+    datas = pd.date_range(inicio, periods=dias, freq='D')
+    valores = [float(i + 1) for i in range(dias)]
+    pd.DataFrame({'Date': datas, 'Open': valores, 'High': valores, 'Low': valores,
+                  'Close': valores, 'Volume': valores}).to_csv(os.path.join(diretorio, f"{simbolo}.csv"), index=False)
+
+
+class FonteContada(FonteFixture):
+    """
+    FonteFixture que registra cada chamada (símbolos e data de início).
+    """
+
+    def __init__(self, diretorio):
+        super().__init__(diretorio)
+        self.chamadas = []
+
+    def baixar(self, simbolos, inicio):
+        self.chamadas.append((tuple(simbolos), inicio))
+        return super().baixar(simbolos, inicio)
+
+
+@pytest.fixture
+def fixtures(tmp_path):
+    diretorio = tmp_path / "csv"
+    diretorio.mkdir()
+    return str(diretorio)
+
+
+def test_primeira_carga_grava_e_le_do_disco(tmp_path, fixtures):
+    _gravar_csv(fixtures, "AAA", 40)
+    historico = HistoricoPrecos(str(tmp_path / "precos"), fonte=FonteFixture(fixtures))
+
+    assert historico.atualizar(["AAA", "ZZZ"]) == ["ZZZ"]
+    assert len(historico.carregar("AAA")) == 40
+    assert len(historico.intervalo("AAA", '7D')) == 7
+
+
+def test_atualizacao_baixa_so_os_dias_que_faltam(tmp_path, fixtures, monkeypatch):
+    _gravar_csv(fixtures, "AAA", 10)
+    fonte = FonteContada(fixtures)
+    historico = HistoricoPrecos(str(tmp_path / "precos"), fonte=fonte)
+    historico.atualizar(["AAA"])
+    ultima = historico.carregar("AAA").index.max()
+
+    monkeypatch.setattr(historico_precos, "INTERVALO_ATUALIZACAO", -1)
+    historico.atualizar(["AAA"])
+
+    assert fonte.chamadas[-1] == (("AAA",), ultima.normalize())
+    assert len(historico.carregar("AAA")) == 10
+
+
+def test_download_nao_bloqueia_outros_simbolos(tmp_path, fixtures):
+    _gravar_csv(fixtures, "LENTO", 5)
+    _gravar_csv(fixtures, "RAPIDO", 5)
+    liberar = threading.Event()
+
+    class FonteLenta(FonteFixture):
+        def baixar(self, simbolos, inicio):
+            if "LENTO" in simbolos:
+                liberar.wait(5)
+            return super().baixar(simbolos, inicio)
+
+    historico = HistoricoPrecos(str(tmp_path / "precos"), fonte=FonteLenta(fixtures))
+    lenta = threading.Thread(target=historico.atualizar, args=(["LENTO"],))
+    lenta.start()
+    try:
+        assert historico.atualizar(["RAPIDO"]) == []
+        assert not liberar.is_set()
+    finally:
+        liberar.set()
+        lenta.join()
+    assert len(historico.carregar("LENTO")) == 5
+
+
+def test_fixture_nao_usa_o_historico_real(tmp_path, fixtures, monkeypatch):
+    monkeypatch.setattr(historico_precos, "_historicos", {})
+    monkeypatch.setattr(historico_precos, "DIRETORIO_PRECOS_FIXTURE", str(tmp_path / "precos_fixture"))
+    fixture = obter_historico_precos(FonteFixture(fixtures))
+
+    assert fixture.diretorio == diretorio_historico(FonteFixture(fixtures))
+    assert fixture.diretorio != historico_precos.DIRETORIO_PRECOS
+    assert obter_historico_precos(FonteFixture(fixtures)) is fixture
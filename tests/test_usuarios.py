@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Conformidade dos backends de usuários (usuarios.py): o mesmo contrato de
+preparar/cadastrar/hash_senha/atualizar_hash em cada um.
+
+O MongoDB é o mongomock (requirements-dev.txt); sem ele, os casos do MongoDB são pulados.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from usuarios import NomesDuplicados, UsuariosMongo, UsuariosSQLite
+
+
+class ColecaoSerializada:
+    """
+    Envolve uma coleção do mongomock serializando as chamadas: ele não é seguro para várias threads.
+    """
+
+    def __init__(self, colecao):
+        self._colecao = colecao
+        self._lock = threading.Lock()
+
+    def __getattr__(self, nome):
+        metodo = getattr(self._colecao, nome)
+
+        def chamar(*args, **kwargs):
+            with self._lock:
+                return metodo(*args, **kwargs)
+        return chamar
+
+
+@pytest.fixture(params=["mongo", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "mongo":
+        mongomock = pytest.importorskip("mongomock")
+        armazenamento = UsuariosMongo(ColecaoSerializada(mongomock.MongoClient()["teste_usuarios"]["usuarios"]))
+    else:
+        armazenamento = UsuariosSQLite(str(tmp_path / "usuarios.sqlite"))
+    armazenamento.preparar()
+    return armazenamento
+
+
+def test_cadastro_e_busca(store):
+    assert store.cadastrar("ana", b"hash-ana") is True
+    assert store.hash_senha("ana") == b"hash-ana"
+
+
+def test_usuario_inexistente(store):
+    assert store.hash_senha("ninguem") is None
+
+
+def test_nome_repetido(store):
+    assert store.cadastrar("bia", b"hash-1") is True
+    assert store.cadastrar("bia", b"hash-2") is False
+    assert store.hash_senha("bia") == b"hash-1"
+
+
+def test_atualizacao_do_hash(store):
+    store.cadastrar("caio", b"hash-antigo")
+    store.atualizar_hash("caio", b"hash-novo")
+    assert store.hash_senha("caio") == b"hash-novo"
+
+
+def test_nomes_diferenciam_maiusculas(store):
+    assert store.cadastrar("Davi", b"hash-maiusculo") is True
+    assert store.cadastrar("davi", b"hash-minusculo") is True
+    assert store.hash_senha("Davi") == b"hash-maiusculo"
+
+
+def test_preparar_duas_vezes(store):
+    store.cadastrar("eva", b"hash-eva")
+    store.preparar()
+    assert store.hash_senha("eva") == b"hash-eva"
+
+
+def test_cadastros_simultaneos(store):
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        resultados = list(executor.map(lambda i: store.cadastrar("disputado", f"hash-{i}".encode()), range(16)))
+    assert resultados.count(True) == 1, resultados
+
+
+def test_mongo_com_nomes_repetidos_informa_os_duplicados():
+    mongomock = pytest.importorskip("mongomock")
+    colecao = mongomock.MongoClient()["teste_usuarios"]["repetidos"]
+    colecao.insert_many([{"username": "ana"}, {"username": "ana"}, {"username": "bia"}])
+
+    with pytest.raises(NomesDuplicados) as erro:
+        UsuariosMongo(colecao).preparar()
+    assert erro.value.nomes == ["ana"]
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Armazenamento de usuários (nome e hash da senha), com dois backends:
+
+- UsuariosMongo: MongoDB (ex.: Atlas), para várias instâncias compartilharem os usuários.
+- UsuariosSQLite: arquivo SQLite local em modo WAL. Numa instalação de um único
+  servidor o login não sai da máquina (sem latência de rede) e funciona offline.
+
+Os dois oferecem as mesmas operações: preparar(), cadastrar(usuario, hash_senha)
+-> bool (False se o nome já existir), hash_senha(usuario) -> bytes ou None e
+atualizar_hash(usuario, hash_senha). O backend é escolhido pela configuração
+(USUARIOS_BACKEND no env.py) em criar_usuarios().
+
+No MongoDB:
+- Índice único em `username`, criado na inicialização: o próprio banco impede
+  nomes repetidos, mesmo com cadastros simultâneos. Numa coleção que já tem
+  nomes repetidos o índice não pode ser criado: preparar() lança
+  NomesDuplicados com os nomes a corrigir.
+- Cadastro com um único insert; nome repetido chega como DuplicateKeyError,
+  sem o find_one prévio (uma ida ao banco a menos).
+- O login busca só o hash da senha (projeção), não o documento inteiro.
+- Tamanho do pool e timeouts do MongoClient definidos explicitamente, para uma
+  falha de rede virar erro rápido em vez de travar a página.
+"""
+
+import os
+import sqlite3
+import threading
+
+from configuracao import DIRETORIO_DADOS
+
+BACKENDS_USUARIOS = ("mongo", "sqlite")
+CAMINHO_USUARIOS = os.path.join(DIRETORIO_DADOS, "usuarios.sqlite")
+
+# Opções do MongoClient
+TAMANHO_MAXIMO_POOL = 20
+TAMANHO_MINIMO_POOL = 1
+TIMEOUT_SELECAO_SERVIDOR_MS = 5000
+TIMEOUT_CONEXAO_MS = 5000
+TIMEOUT_OPERACAO_MS = 10000
+# Nomes repetidos listados quando o índice único não pode ser criado
+MAXIMO_DUPLICADOS_RELATADOS = 20
+# Código de erro do MongoDB para chave duplicada
+CODIGO_CHAVE_DUPLICADA = 11000
+
+
+class NomesDuplicados(Exception):
+    """
+    A coleção já tem nomes de usuário repetidos, e o índice único não pode ser criado.
+    """
+
+    def __init__(self, nomes):
+        self.nomes = nomes
+        super().__init__(
+            "Há usuários com o mesmo nome na coleção, e o índice único em 'username' não pode ser criado. "
+            f"Remova ou renomeie os repetidos: {', '.join(map(str, nomes))}."
+        )
+
+
+def criar_cliente_mongo(uri, **opcoes):
+    """
+    Cria o MongoClient com pool e timeouts explícitos (podem ser sobrescritos em `opcoes`).
+    """
+    from pymongo import MongoClient
+    configuracao = {
+        'maxPoolSize': TAMANHO_MAXIMO_POOL,
+        'minPoolSize': TAMANHO_MINIMO_POOL,
+        'serverSelectionTimeoutMS': TIMEOUT_SELECAO_SERVIDOR_MS,
+        'connectTimeoutMS': TIMEOUT_CONEXAO_MS,
+        'socketTimeoutMS': TIMEOUT_OPERACAO_MS,
+        'retryWrites': True,
+    }
+    configuracao.update(opcoes)
+    return MongoClient(uri, **configuracao)
+
+
+class UsuariosMongo:
+    """
+    Operações de usuário sobre uma coleção do MongoDB.
+    """
+
+    def __init__(self, colecao):
+        self.colecao = colecao
+
+    def preparar(self):
+        """
+        Cria o índice único em `username` (não faz nada se ele já existir).
+
+        Raises:
+            NomesDuplicados: Se a coleção já tiver nomes de usuário repetidos.
+        """
+        from pymongo.errors import OperationFailure # DuplicateKeyError é uma subclasse
+        try:
+            self.colecao.create_index("username", unique=True, name="username_unico")
+        except OperationFailure as e:
+            if e.code != CODIGO_CHAVE_DUPLICADA:
+                raise
+            raise NomesDuplicados(self._nomes_duplicados()) from e
+
+    def _nomes_duplicados(self):
+        repetidos = self.colecao.aggregate([
+            {'$group': {'_id': '$username', 'n': {'$sum': 1}}},
+            {'$match': {'n': {'$gt': 1}}},
+            {'$sort': {'_id': 1}},
+            {'$limit': MAXIMO_DUPLICADOS_RELATADOS},
+        ])
+        return [documento['_id'] for documento in repetidos]
+
+    def cadastrar(self, usuario, hash_senha):
+        """
+        Returns:
+            bool: False se o nome de usuário já existir.
+        """
+        from pymongo.errors import DuplicateKeyError
+        try:
+            self.colecao.insert_one({"username": usuario, "password": hash_senha})
+        except DuplicateKeyError:
+            return False
+        return True
+
+    def hash_senha(self, usuario):
+        """
+        Returns:
+            bytes ou None: Hash da senha gravado, ou None se o usuário não existir.
+        """
+        documento = self.colecao.find_one({"username": usuario}, {"password": 1, "_id": 0})
+        return documento["password"] if documento else None
+
+    def atualizar_hash(self, usuario, hash_senha):
+        self.colecao.update_one({"username": usuario}, {"$set": {"password": hash_senha}})
+
+
+class UsuariosSQLite:
+    """
+    Operações de usuário num arquivo SQLite local (WAL, uma conexão por thread).
+    """
+
+    def __init__(self, caminho=CAMINHO_USUARIOS):
+        self.caminho = caminho
+        self._local = threading.local()
+
+    def _conexao(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.caminho, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def preparar(self):
+        os.makedirs(os.path.dirname(self.caminho) or ".", exist_ok=True)
+        with self._conexao() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS usuarios (username TEXT PRIMARY KEY, password BLOB NOT NULL)")
+
+    def cadastrar(self, usuario, hash_senha):
+        try:
+            with self._conexao() as conn:
+                conn.execute("INSERT INTO usuarios (username, password) VALUES (?, ?)", (usuario, hash_senha))
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def hash_senha(self, usuario):
+        linha = self._conexao().execute("SELECT password FROM usuarios WHERE username = ?", (usuario,)).fetchone()
+        return bytes(linha[0]) if linha else None
+
+    def atualizar_hash(self, usuario, hash_senha):
+        with self._conexao() as conn:
+            conn.execute("UPDATE usuarios SET password = ? WHERE username = ?", (hash_senha, usuario))
+
+
+def criar_usuarios(backend, mongo_uri=None, banco=None, colecao=None, caminho_sqlite=CAMINHO_USUARIOS):
+    """
+    Cria o armazenamento de usuários do backend escolhido ('mongo' ou 'sqlite'), já preparado.
+
+    Raises:
+        ValueError: Se o backend não for conhecido.
+        NomesDuplicados: Se a coleção do MongoDB já tiver nomes de usuário repetidos.
+    """
+    if backend == "mongo":
+        store = UsuariosMongo(criar_cliente_mongo(mongo_uri)[banco][colecao])
+    elif backend == "sqlite":
+        store = UsuariosSQLite(caminho_sqlite)
+    else:
+        raise ValueError(f"Backend de usuários desconhecido: {backend!r} (use {' ou '.join(BACKENDS_USUARIOS)}).")
+    store.preparar()
+    return store